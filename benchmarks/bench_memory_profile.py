@@ -0,0 +1,157 @@
+"""
+Speicher-Benchmark für die Profile des Gateway-Clients (BOT_MEMORY_PROFILE).
+
+Füllt den Cache eines nicht verbundenen Clients mit simulierten GUILD_CREATE- und MESSAGE_CREATE-Events
+(wie sie die Intents des Profils zulassen) und misst den RSS des Prozesses. Jedes Profil läuft in einem
+eigenen Prozess, damit sich die Messungen nicht beeinflussen.
+Aufruf: python -m benchmarks.bench_memory_profile [server] [nachrichten_pro_server]
+"""
+import gc
+import sys
+import asyncio
+import subprocess
+
+import discord
+from discord.ext import commands
+
+from bot.bot import client_options
+
+PROFILES = ("default", "low")
+
+def rss_mb() -> float:
+    """Aktueller RSS in MB (Linux), sonst der bisherige Höchstwert"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def user_payload(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"benutzer{user_id}", "discriminator": "0", "avatar": None, "global_name": None}
+
+def member_payload(user_id: int) -> dict:
+    return {"user": user_payload(user_id), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+def guild_payload(guild_id: int, intents: discord.Intents) -> dict:
+    """Server mit 3 Kategorien, 25 Text-, 2 Sprachkanälen, 15 Rollen und 10 Mitgliedern im Sprachkanal"""
+    base = guild_id * 1000
+    categories = [{"id": str(base + i), "type": 4, "name": f"Kategorie {i}", "position": i, "permission_overwrites": []} for i in range(3)]
+    text_channels = [
+        {
+            "id": str(base + 10 + i),
+            "type": 0,
+            "name": f"kanal-{i}",
+            "position": i,
+            "parent_id": str(base + i % 3),
+            "topic": "Ein Kanal",
+            "permission_overwrites": [{"id": str(guild_id), "type": 0, "allow": "0", "deny": "1024"}]
+        }
+        for i in range(25)
+    ]
+    voice_channels = [{"id": str(base + 50 + i), "type": 2, "name": f"Sprache {i}", "position": i, "bitrate": 64000, "user_limit": 0, "permission_overwrites": []} for i in range(2)]
+    roles = [
+        {"id": str(guild_id if i == 0 else base + 100 + i), "name": "@everyone" if i == 0 else f"Rolle {i}", "permissions": "0", "position": i,
+         "color": 0, "hoist": False, "managed": False, "mentionable": False}
+        for i in range(15)
+    ]
+    voice_members = [base + 500 + i for i in range(10)]
+    
+    data = {
+        "id": str(guild_id),
+        "name": f"Server {guild_id}",
+        "owner_id": str(voice_members[0]),
+        "member_count": 5000,
+        "large": True,
+        "features": [],
+        "roles": roles,
+        "channels": categories + text_channels + voice_channels,
+        "members": [member_payload(user_id) for user_id in voice_members],
+        "emojis": [],
+        "stickers": []
+    }
+    # Discord sendet Sprachstatus nur mit dem voice_states-Intent
+    if intents.voice_states:
+        data["voice_states"] = [
+            {"channel_id": voice_channels[0]["id"], "user_id": str(user_id), "session_id": "x", "deaf": False, "mute": False,
+             "self_deaf": False, "self_mute": False, "self_video": False, "suppress": False}
+            for user_id in voice_members
+        ]
+    return data
+
+def message_payload(guild_id: int, message_id: int) -> dict:
+    channel_id = guild_id * 1000 + 10 + message_id % 25
+    author_id = guild_id * 1000 + 900 + message_id % 20
+    return {
+        "id": str((guild_id << 22) + message_id),
+        "channel_id": str(channel_id),
+        "guild_id": str(guild_id),
+        "author": user_payload(author_id),
+        "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0},
+        "content": "Hallo, ich brauche Hilfe bei meinem Problem " + "x" * 120,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0
+    }
+
+async def fill_cache(profile: str, guilds: int, messages: int) -> dict:
+    intents, options = client_options(profile)
+    client = commands.Bot(command_prefix="!", intents=intents, **options)
+    state = client._connection
+    # Setzt den Event-Loop des Clients wie beim Login (ohne Verbindung)
+    await client._async_setup_hook()
+    
+    gc.collect()
+    before = rss_mb()
+    
+    for index in range(guilds):
+        state._add_guild_from_data(guild_payload(100000 + index, intents))
+    gc.collect()
+    after_guilds = rss_mb()
+    
+    # Nachrichten kommen nur mit dem guild_messages-Intent an
+    if intents.guild_messages:
+        for message_id in range(messages):
+            for index in range(guilds):
+                state.parse_message_create(message_payload(100000 + index, message_id))
+            # Geplante Event-Handler abarbeiten lassen
+            await asyncio.sleep(0)
+    gc.collect()
+    after_messages = rss_mb()
+    
+    return {
+        "guilds": after_guilds - before,
+        "total": after_messages - before,
+        "cached_members": sum(len(guild._members) for guild in client.guilds),
+        "cached_messages": len(state._messages) if state._messages is not None else 0
+    }
+
+def run_child(profile: str, guilds: int, messages: int) -> None:
+    result = asyncio.run(fill_cache(profile, guilds, messages))
+    print(f"{profile:>8}: Server-Cache {result['guilds']:7.1f} MB, gesamt {result['total']:7.1f} MB, "
+          f"{result['cached_members']} Mitglieder, {result['cached_messages']} Nachrichten im Cache, "
+          f"RSS {rss_mb():.1f} MB")
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        run_child(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+    
+    guilds = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"{guilds} Server, {messages} Nachricht(en) pro Server")
+    for profile in PROFILES:
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_memory_profile", "--child", profile, str(guilds), str(messages)], check=True)
+
+if __name__ == "__main__":
+    main()
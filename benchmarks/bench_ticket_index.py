@@ -0,0 +1,54 @@
+"""
+Micro-Benchmark für die Ticket-Lookups in create_ticket und close_ticket.
+
+Vergleicht den früheren linearen Scan über alle Tickets mit den Indizes des ConfigManagers.
+Aufruf: python -m benchmarks.bench_ticket_index
+"""
+import tempfile
+import timeit
+
+from utils.config import ConfigManager
+
+SIZES = [100, 10_000, 100_000, 1_000_000]
+LOOKUPS = 1000
+
+def build_manager(data_dir: str, ticket_count: int) -> ConfigManager:
+    """Erstellt einen ConfigManager mit ticket_count historischen (geschlossenen) Tickets"""
+    manager = ConfigManager(data_dir, backend="json")
+    tickets = {}
+    for i in range(1, ticket_count + 1):
+        tickets[str(i)] = {
+            "user_id": str(i % 5000),
+            "channel_id": str(10_000_000 + i),
+            "category": "Support",
+            "status": "closed",
+            "created_at": "2024-01-01T00:00:00",
+            "closed_at": "2024-01-02T00:00:00"
+        }
+    # Das neueste Ticket ist noch offen
+    tickets[str(ticket_count)]["status"] = "open"
+    manager.config["guilds"]["1"] = {"tickets": tickets}
+    manager.rebuild_indexes()
+    return manager
+
+def scan_user(tickets: dict, user_id: str):
+    for ticket_id, ticket in tickets.items():
+        if ticket["user_id"] == user_id and ticket["status"] == "open":
+            return ticket_id
+    return None
+
+def main():
+    with tempfile.TemporaryDirectory() as data_dir:
+        print(f"{'Tickets':>10} {'Scan (µs)':>12} {'Index (µs)':>12}")
+        for size in SIZES:
+            manager = build_manager(data_dir, size)
+            tickets = manager.config["guilds"]["1"]["tickets"]
+            user_id = tickets[str(size)]["user_id"]
+            
+            scan_loops = max(1, LOOKUPS // max(1, size // 1000))
+            scan = timeit.timeit(lambda: scan_user(tickets, user_id), number=scan_loops) / scan_loops
+            index = timeit.timeit(lambda: manager.get_open_ticket_id("1", user_id), number=LOOKUPS) / LOOKUPS
+            print(f"{size:>10} {scan * 1e6:>12.2f} {index * 1e6:>12.3f}")
+
+if __name__ == "__main__":
+    main()
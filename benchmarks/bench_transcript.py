@@ -0,0 +1,75 @@
+"""
+Benchmark für das Blockieren des Event-Loops beim Erstellen von Transkripten.
+
+Vergleicht das frühere Vorgehen (alles im Speicher sammeln, synchron schreiben) mit dem
+TranscriptWriter (blockweise im Thread-Pool). Gemessen wird die längste Verzögerung eines
+Ticker-Tasks, der alle 1 ms aufwachen möchte.
+Aufruf: python -m benchmarks.bench_transcript [nachrichten]
+"""
+import os
+import sys
+import time
+import asyncio
+import datetime
+import tempfile
+from types import SimpleNamespace
+
+from utils.transcripts import TranscriptWriter, format_transcript_line
+
+async def fake_history(count: int):
+    """Simuliert channel.history(); nach jeder 100er-Seite ein kurzer REST-Aufruf"""
+    author = SimpleNamespace(name="benutzer")
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(count):
+        if i % 100 == 0:
+            await asyncio.sleep(0.001)
+        yield SimpleNamespace(
+            created_at=start + datetime.timedelta(seconds=i),
+            content=f"Nachricht {i} " + "x" * 200,
+            author=author
+        )
+
+async def monitor_lag(stop: asyncio.Event, result: dict) -> None:
+    """Misst die maximale Verspätung eines 1-ms-Tickers"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - start - 0.001)
+    result["max_lag"] = worst
+
+async def legacy_transcript(file_path: str, count: int) -> None:
+    messages = []
+    async for msg in fake_history(count):
+        messages.append(format_transcript_line(msg))
+    transcript = "\n".join(messages)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(transcript)
+        f.flush()
+        os.fsync(f.fileno())
+
+async def streaming_transcript(file_path: str, count: int, compress: bool) -> None:
+    async with TranscriptWriter(file_path, compress=compress) as writer:
+        async for msg in fake_history(count):
+            await writer.write_line(format_transcript_line(msg))
+
+async def measure(name: str, coro) -> None:
+    stop = asyncio.Event()
+    result = {}
+    monitor = asyncio.create_task(monitor_lag(stop, result))
+    start = time.perf_counter()
+    await coro
+    duration = time.perf_counter() - start
+    stop.set()
+    await monitor
+    print(f"{name:<22} Dauer {duration * 1000:8.1f} ms   max. Loop-Verzögerung {result['max_lag'] * 1000:7.2f} ms")
+
+async def main(count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{count} Nachrichten")
+        await measure("vorher (im Speicher)", legacy_transcript(os.path.join(tmp, "legacy.txt"), count))
+        await measure("TranscriptWriter", streaming_transcript(os.path.join(tmp, "stream.txt"), count, False))
+        await measure("TranscriptWriter gzip", streaming_transcript(os.path.join(tmp, "stream.txt.gz"), count, True))
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
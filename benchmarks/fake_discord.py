@@ -0,0 +1,395 @@
+"""
+Lokaler Ersatz für die Discord-REST-API und das Gateway (für Lasttests ohne Discord).
+
+Beantwortet die Endpunkte, die TicketBot (über discord.py) und DiscordOAuth2 aufrufen, mit
+einfachen, aber gültigen Payloads. Latenz und 429-Antworten lassen sich einstellen; jeder Aufruf
+wird pro Route gezählt. Angelegte und gelöschte Kanäle landen als Gateway-Events in einer Queue,
+die der Lastgenerator an den Cache des Clients weitergibt (es gibt keine echte Gateway-Verbindung).
+Der Server läuft in einem Hintergrund-Thread; gestartet wird er über benchmarks.load_test.
+"""
+import re
+import json
+import time
+import queue
+import random
+import hashlib
+import itertools
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from typing import Dict, Any, List, Optional, Tuple
+
+APPLICATION_ID = "900000000000000001"
+BOT_USER_ID = "900000000000000002"
+TIMESTAMP = "2024-01-01T00:00:00+00:00"
+
+def user_payload(user_id: str, name: Optional[str] = None, bot: bool = False) -> dict:
+    return {
+        "id": str(user_id),
+        "username": name or f"benutzer{user_id}",
+        "discriminator": "0",
+        "avatar": None,
+        "global_name": None,
+        "bot": bot
+    }
+
+def member_payload(user_id: str, roles: Optional[List[str]] = None) -> dict:
+    return {
+        "user": user_payload(user_id),
+        "roles": roles or [],
+        "joined_at": TIMESTAMP,
+        "deaf": False,
+        "mute": False,
+        "flags": 0
+    }
+
+def guild_payload(guild_id: str, name: str, channels: List[dict]) -> dict:
+    """Server mit @everyone, einer Support-Rolle und dem Bot als Mitglied (wie im GUILD_CREATE-Event)"""
+    roles = [
+        {"id": guild_id, "name": "@everyone", "permissions": "0", "position": 0,
+         "color": 0, "hoist": False, "managed": False, "mentionable": False},
+        {"id": str(int(guild_id) + 1), "name": "Support", "permissions": "8", "position": 1,
+         "color": 0, "hoist": False, "managed": False, "mentionable": False}
+    ]
+    return {
+        "id": guild_id,
+        "name": name,
+        "owner_id": BOT_USER_ID,
+        "member_count": 2,
+        "features": [],
+        "roles": roles,
+        "channels": channels,
+        "members": [member_payload(BOT_USER_ID, roles=[roles[1]["id"]])],
+        "emojis": [],
+        "stickers": []
+    }
+
+class FakeDiscord:
+    """
+    Fake-Discord-Server mit einstellbarer Latenz, 429-Injektion und Aufrufzählern
+    """
+    # (Methode, Pfad ohne /api und Versionspräfix, Handler-Methode)
+    ROUTES = [
+        ("GET", "/users/@me", "_get_me"),
+        ("GET", "/users/@me/guilds", "_get_my_guilds"),
+        ("POST", "/oauth2/token", "_post_token"),
+        ("GET", "/oauth2/applications/@me", "_get_application"),
+        ("GET", "/applications/{app_id}/commands", "_list_commands"),
+        ("GET", "/applications/{app_id}/guilds/{guild_id}/commands", "_list_commands"),
+        ("PUT", "/applications/{app_id}/commands", "_put_commands"),
+        ("PUT", "/applications/{app_id}/guilds/{guild_id}/commands", "_put_commands"),
+        ("POST", "/interactions/{interaction_id}/{token}/callback", "_interaction_callback"),
+        ("POST", "/guilds/{guild_id}/channels", "_create_channel"),
+        ("PATCH", "/channels/{channel_id}", "_edit_channel"),
+        ("DELETE", "/channels/{channel_id}", "_delete_channel"),
+        ("GET", "/channels/{channel_id}/messages", "_get_messages"),
+        ("POST", "/channels/{channel_id}/messages", "_create_message"),
+        ("PUT", "/channels/{channel_id}/messages/pins/{message_id}", "_pin_message"),
+        ("POST", "/webhooks/{app_id}/{token}", "_create_followup"),
+        ("PATCH", "/webhooks/{app_id}/{token}/messages/{message_id}", "_edit_followup")
+    ]
+    
+    def __init__(self, guild_ids: List[str], latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit_ratio: float = 0.0, retry_after: float = 0.05, host: str = "127.0.0.1", port: int = 0):
+        self.guild_ids = list(guild_ids)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        
+        self._routes = [
+            (method, template, re.compile(re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(template)) + "/?$"), getattr(self, name))
+            for method, template, name in self.ROUTES
+        ]
+        self._ids = itertools.count(int(time.time() * 1000 - 1420070400000) << 22)
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._random = random.Random(0)
+        
+        # Zustand, den echte Discord-Server halten würden
+        self.channels: Dict[str, dict] = {}
+        self.messages: Dict[str, List[dict]] = {}
+        # (Event-Name, Payload) für den Gateway-Ersatz
+        self.events: "queue.SimpleQueue[Tuple[str, dict]]" = queue.SimpleQueue()
+        
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-Alive wie bei Discord, damit Connection-Pools wirken
+            protocol_version = "HTTP/1.1"
+            
+            def do_GET(self):
+                fake._handle(self)
+            
+            do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def api_base(self) -> str:
+        """Wert für DISCORD_API"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+    
+    def start(self) -> "FakeDiscord":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-discord", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def guild_create_payloads(self) -> List[dict]:
+        """GUILD_CREATE-Payloads aller Server mit einem allgemeinen Textkanal"""
+        payloads = []
+        for guild_id in self.guild_ids:
+            channel = self._channel(guild_id, {"name": "allgemein", "type": 0})
+            payloads.append(guild_payload(guild_id, f"Server {guild_id}", [channel]))
+        return payloads
+    
+    def call_counts(self) -> Dict[str, Dict[int, int]]:
+        """Aufrufe pro Route und Statuscode"""
+        result: Dict[str, Dict[int, int]] = {}
+        with self._lock:
+            for (route, status), count in self._counts.items():
+                result.setdefault(route, {})[status] = count
+        return result
+    
+    def component_interaction(self, guild_id: str, channel_id: str, user_id: str, custom_id: str) -> dict:
+        """INTERACTION_CREATE-Payload eines Button-Klicks"""
+        return {
+            "id": self.next_id(),
+            "application_id": APPLICATION_ID,
+            "type": 3,
+            "token": f"interaction-{self.next_id()}",
+            "version": 1,
+            "guild_id": guild_id,
+            "channel_id": channel_id,
+            "channel": self.channels.get(channel_id) or {"id": channel_id, "type": 0, "guild_id": guild_id},
+            "member": dict(member_payload(user_id), permissions="0"),
+            "data": {"custom_id": custom_id, "component_type": 2},
+            "locale": "de",
+            "guild_locale": "de",
+            "app_permissions": "8",
+            "attachment_size_limit": 10485760,
+            "entitlements": [],
+            "authorizing_integration_owners": {},
+            "context": 0
+        }
+    
+    def next_id(self) -> str:
+        with self._lock:
+            return str(next(self._ids))
+    
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        url = urlsplit(request.path)
+        path = re.sub(r"^/api(/v\d+)?", "", url.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        raw = request.rfile.read(length) if length else b""
+        
+        route, handler, match = f"{request.command} {path}", None, None
+        for method, template, pattern, candidate in self._routes:
+            if method == request.command:
+                match = pattern.match(path)
+                if match:
+                    route, handler = f"{method} {template}", candidate
+                    break
+        
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        
+        if handler is None:
+            status, payload, headers = 404, {"message": "Unknown route", "code": 0}, {}
+        elif self.rate_limit_ratio and self._random.random() < self.rate_limit_ratio:
+            # Ohne Via-Header hält discord.py die Antwort für eine Cloudflare-Sperre und wiederholt nicht
+            status, headers = 429, {"Retry-After": str(self.retry_after), "X-RateLimit-Scope": "user", "Via": "1.1 google"}
+            payload = {"message": "You are being rate limited.", "retry_after": self.retry_after, "global": False}
+        else:
+            try:
+                body = self._parse_body(request, raw)
+                status, payload = handler(request, match, body, parse_qs(url.query))
+            except Exception as e:
+                status, payload = 500, {"message": f"{type(e).__name__}: {e}", "code": 0}
+            headers = {}
+        
+        with self._lock:
+            self._counts[(route, status)] = self._counts.get((route, status), 0) + 1
+        
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        if payload is not None:
+            request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+    
+    def _parse_body(self, request: BaseHTTPRequestHandler, raw: bytes) -> Any:
+        content_type = request.headers.get("Content-Type", "")
+        if not raw:
+            return {}
+        if content_type.startswith("application/json"):
+            return json.loads(raw)
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            return {key: values[0] for key, values in parse_qs(raw.decode("utf-8")).items()}
+        if content_type.startswith("multipart/form-data"):
+            # discord.py sendet Dateien als multipart; der JSON-Teil heißt payload_json
+            found = re.search(rb'name="payload_json"\r\n(?:[^\r\n]+\r\n)*\r\n(.*?)\r\n--', raw, re.S)
+            return json.loads(found.group(1)) if found else {}
+        return {}
+    
+    def _channel(self, guild_id: str, data: dict) -> dict:
+        channel = {
+            "id": self.next_id(),
+            "guild_id": guild_id,
+            "type": data.get("type", 0),
+            "name": data.get("name", "kanal"),
+            "position": data.get("position", 0),
+            "parent_id": data.get("parent_id"),
+            "topic": data.get("topic"),
+            "nsfw": False,
+            "permission_overwrites": data.get("permission_overwrites", [])
+        }
+        with self._lock:
+            self.channels[channel["id"]] = channel
+        return channel
+    
+    def _message(self, channel_id: str, body: dict, author_id: str = BOT_USER_ID) -> dict:
+        channel = self.channels.get(channel_id, {})
+        message = {
+            "id": self.next_id(),
+            "channel_id": channel_id,
+            "guild_id": channel.get("guild_id"),
+            "author": user_payload(author_id, bot=author_id == BOT_USER_ID),
+            "content": body.get("content") or "",
+            "timestamp": TIMESTAMP,
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": body.get("embeds") or [],
+            "components": [],
+            "pinned": False,
+            "type": 0,
+            "flags": body.get("flags", 0)
+        }
+        with self._lock:
+            self.messages.setdefault(channel_id, []).append(message)
+        return message
+    
+    def _get_me(self, request, match, body, query):
+        authorization = request.headers.get("Authorization", "")
+        if authorization.startswith("Bot "):
+            return 200, user_payload(BOT_USER_ID, name="ticket-bot", bot=True)
+        # OAuth2-Benutzer: stabile ID pro Token
+        user_id = str(int(hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:12], 16))
+        return 200, user_payload(user_id)
+    
+    def _get_my_guilds(self, request, match, body, query):
+        return 200, [
+            {"id": guild_id, "name": f"Server {guild_id}", "icon": None, "owner": False, "permissions": "8", "features": []}
+            for guild_id in self.guild_ids
+        ]
+    
+    def _post_token(self, request, match, body, query):
+        return 200, {
+            "access_token": f"token-{self.next_id()}",
+            "refresh_token": f"refresh-{self.next_id()}",
+            "token_type": "Bearer",
+            "expires_in": 604800,
+            "scope": body.get("scope", "identify guilds")
+        }
+    
+    def _get_application(self, request, match, body, query):
+        return 200, {
+            "id": APPLICATION_ID,
+            "name": "ticket-bot",
+            "icon": None,
+            "description": "",
+            "bot_public": False,
+            "bot_require_code_grant": False,
+            "owner": user_payload("900000000000000003"),
+            "team": None,
+            "verify_key": "0" * 64,
+            "flags": 0
+        }
+    
+    def _list_commands(self, request, match, body, query):
+        return 200, []
+    
+    def _put_commands(self, request, match, body, query):
+        return 200, [
+            dict(command, id=self.next_id(), application_id=APPLICATION_ID, version="1", default_member_permissions=None)
+            for command in body or []
+        ]
+    
+    def _interaction_callback(self, request, match, body, query):
+        # Antwort auf die Interaktion wie mit ?with_response=true
+        data = body.get("data") or {}
+        interaction = {
+            "id": match.group("interaction_id"),
+            "type": 3,
+            "activity_instance_id": None,
+            "response_message_id": None,
+            "response_message_loading": body.get("type") == 5,
+            "response_message_ephemeral": bool(data.get("flags", 0) & 64)
+        }
+        return 200, {"interaction": interaction, "resource": {"type": body.get("type")}}
+    
+    def _create_channel(self, request, match, body, query):
+        channel = self._channel(match.group("guild_id"), body)
+        self.events.put(("CHANNEL_CREATE", channel))
+        return 201, channel
+    
+    def _edit_channel(self, request, match, body, query):
+        channel = self.channels.get(match.group("channel_id"))
+        if channel is None:
+            return 404, {"message": "Unknown Channel", "code": 10003}
+        channel.update({key: value for key, value in body.items() if key in channel})
+        self.events.put(("CHANNEL_UPDATE", channel))
+        return 200, channel
+    
+    def _delete_channel(self, request, match, body, query):
+        with self._lock:
+            channel = self.channels.pop(match.group("channel_id"), None)
+            self.messages.pop(match.group("channel_id"), None)
+        if channel is None:
+            return 404, {"message": "Unknown Channel", "code": 10003}
+        self.events.put(("CHANNEL_DELETE", channel))
+        return 200, channel
+    
+    def _get_messages(self, request, match, body, query):
+        messages = self.messages.get(match.group("channel_id"), [])
+        limit = int(query.get("limit", ["50"])[0])
+        if "after" in query:
+            after = int(query["after"][0])
+            return 200, [m for m in messages if int(m["id"]) > after][:limit][::-1]
+        if "before" in query:
+            before = int(query["before"][0])
+            messages = [m for m in messages if int(m["id"]) < before]
+        return 200, messages[-limit:][::-1]
+    
+    def _create_message(self, request, match, body, query):
+        channel_id = match.group("channel_id")
+        if channel_id not in self.channels:
+            return 404, {"message": "Unknown Channel", "code": 10003}
+        return 200, self._message(channel_id, body)
+    
+    def _pin_message(self, request, match, body, query):
+        return 204, None
+    
+    def _create_followup(self, request, match, body, query):
+        return 200, self._message(self.next_id(), body)
+    
+    def _edit_followup(self, request, match, body, query):
+        return 200, self._message(self.next_id(), body)
@@ -0,0 +1,273 @@
+"""
+Lasttest für TicketBot und das Web-Interface gegen den lokalen Fake-Discord-Server (offline).
+
+Startet benchmarks.fake_discord, meldet einen echten TicketBot über DISCORD_API dort an und spielt
+Bursts aus Ticket-Öffnen und -Schließen (create_ticket/close_ticket mit echten Interaktionen) ab.
+Parallel dazu laufen Dashboard-Sitzungen über den Flask-Testclient, deren OAuth2-Aufrufe ebenfalls
+beim Fake-Server landen. Ausgegeben werden Anzahl, Fehler, Durchsatz und p50/p95/p99 pro Vorgang
+sowie die Discord-Aufrufe pro Route. Mit --max-p95-ms als Regressionstest (Exit-Code 1).
+Aufruf: python -m benchmarks.load_test [--tickets 200] [--concurrency 50] [--sessions 20] [--latency 0.05] [--rate-limit 0.02]
+"""
+import os
+import sys
+import math
+import time
+import queue
+import asyncio
+import logging
+import argparse
+import tempfile
+import threading
+import concurrent.futures
+from typing import Dict, List
+
+import discord
+
+from benchmarks.fake_discord import FakeDiscord
+
+class LatencyStats:
+    """
+    Sammelt Laufzeiten und Fehler pro Vorgang (auch aus mehreren Threads)
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        # Vorgang -> [erster Start, letztes Ende] für den Durchsatz
+        self.spans: Dict[str, List[float]] = {}
+    
+    def record(self, name: str, start: float, ok: bool = True) -> None:
+        end = time.perf_counter()
+        with self._lock:
+            self.samples.setdefault(name, []).append(end - start)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            span = self.spans.setdefault(name, [start, end])
+            span[0] = min(span[0], start)
+            span[1] = max(span[1], end)
+    
+    def summary(self) -> Dict[str, dict]:
+        result = {}
+        for name, samples in self.samples.items():
+            samples = sorted(samples)
+            duration = self.spans[name][1] - self.spans[name][0]
+            result[name] = {
+                "count": len(samples),
+                "errors": self.errors.get(name, 0),
+                "throughput": len(samples) / duration if duration > 0 else 0.0,
+                "p50": percentile(samples, 0.50),
+                "p95": percentile(samples, 0.95),
+                "p99": percentile(samples, 0.99)
+            }
+        return result
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Quantil nach dem Nearest-Rank-Verfahren"""
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[max(0, math.ceil(q * len(sorted_samples)) - 1)]
+
+async def pump_gateway(state, fake: FakeDiscord, stop: asyncio.Event) -> None:
+    """Gibt die Kanal-Events des Fake-Servers wie das Gateway an den Cache des Clients weiter"""
+    parsers = {
+        "CHANNEL_CREATE": state.parse_channel_create,
+        "CHANNEL_UPDATE": state.parse_channel_update,
+        "CHANNEL_DELETE": state.parse_channel_delete
+    }
+    while not stop.is_set():
+        try:
+            while True:
+                event, data = fake.events.get_nowait()
+                parsers[event](data)
+        except queue.Empty:
+            pass
+        await asyncio.sleep(0.005)
+
+async def open_ticket(bot_instance, fake: FakeDiscord, stats: LatencyStats, guild_id: str, channel_id: str, user_id: str) -> None:
+    interaction = discord.Interaction(
+        data=fake.component_interaction(guild_id, channel_id, user_id, "create_ticket:Support"),
+        state=bot_instance.bot._connection
+    )
+    start = time.perf_counter()
+    try:
+        await bot_instance.create_ticket(interaction, "Support")
+        stats.record("ticket_open", start)
+    except Exception as e:
+        stats.record("ticket_open", start, ok=False)
+        print(f"ticket_open fehlgeschlagen: {type(e).__name__}: {e}", file=sys.stderr)
+
+async def close_ticket(bot_instance, fake: FakeDiscord, stats: LatencyStats, guild_id: str, channel_id: str, user_id: str) -> None:
+    interaction = discord.Interaction(
+        data=fake.component_interaction(guild_id, channel_id, user_id, "close_ticket"),
+        state=bot_instance.bot._connection
+    )
+    start = time.perf_counter()
+    try:
+        await bot_instance.close_ticket(interaction)
+        stats.record("ticket_close", start)
+    except Exception as e:
+        stats.record("ticket_close", start, ok=False)
+        print(f"ticket_close fehlgeschlagen: {type(e).__name__}: {e}", file=sys.stderr)
+
+async def run_burst(coros, concurrency: int) -> None:
+    """Führt die Vorgänge mit höchstens concurrency gleichzeitigen Aufrufen aus"""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def limited(coro):
+        async with semaphore:
+            await coro
+    
+    await asyncio.gather(*(limited(coro) for coro in coros))
+
+def dashboard_session(app, index: int, guild_ids: List[str], requests_per_session: int, stats: LatencyStats) -> None:
+    """Eine Dashboard-Sitzung: Übersicht, Server-Einstellungen und die API-Aufrufe der Seite"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        # Eigenes Token pro Sitzung, damit der OAuth2-Cache nicht alle Sitzungen bedient
+        session["discord_token"] = {"access_token": f"load-test-{index}", "token_type": "Bearer"}
+    
+    guild_id = guild_ids[index % len(guild_ids)]
+    pages = [
+        ("web dashboard", "/dashboard"),
+        ("web guild_settings", f"/guild/{guild_id}"),
+        ("web api_tickets", f"/api/guild/{guild_id}/tickets"),
+        ("web api_channels", f"/api/guild/{guild_id}/channels"),
+        ("web api_roles", f"/api/guild/{guild_id}/roles")
+    ]
+    for request_index in range(requests_per_session):
+        name, path = pages[request_index % len(pages)]
+        start = time.perf_counter()
+        try:
+            response = client.get(path)
+            stats.record(name, start, ok=response.status_code == 200)
+        except Exception as e:
+            stats.record(name, start, ok=False)
+            print(f"{name} fehlgeschlagen: {type(e).__name__}: {e}", file=sys.stderr)
+
+async def run(args: argparse.Namespace, fake: FakeDiscord) -> LatencyStats:
+    # Erst hier importieren: web.discord_http liest DISCORD_API beim Import
+    from bot.bot import TicketBot
+    from web.app import create_app
+    
+    stats = LatencyStats()
+    bot_instance = TicketBot()
+    client = bot_instance.bot
+    
+    # Login, Anwendungsinfo und Befehls-Sync laufen gegen den Fake-Server
+    start = time.perf_counter()
+    await client.login(bot_instance.token)
+    stats.record("bot_login", start)
+    
+    state = client._connection
+    guild_channels = {}
+    for payload in fake.guild_create_payloads():
+        state._add_guild_from_data(payload)
+        guild_channels[payload["id"]] = payload["channels"][0]["id"]
+    
+    stop = asyncio.Event()
+    pump = asyncio.create_task(pump_gateway(state, fake, stop))
+    
+    # Dashboard-Sitzungen laufen in Threads parallel zu den Ticket-Bursts (wie Flask neben dem Bot)
+    app = create_app(bot_instance)
+    loop = asyncio.get_running_loop()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(args.sessions, 16)), thread_name_prefix="dashboard")
+    sessions = [
+        loop.run_in_executor(executor, dashboard_session, app, index, fake.guild_ids, args.requests_per_session, stats)
+        for index in range(args.sessions)
+    ]
+    
+    try:
+        for burst in range(args.bursts):
+            users = [(fake.guild_ids[i % len(fake.guild_ids)], str(700000000000000000 + burst * args.tickets + i)) for i in range(args.tickets)]
+            await run_burst(
+                (open_ticket(bot_instance, fake, stats, guild_id, guild_channels[guild_id], user_id) for guild_id, user_id in users),
+                args.concurrency
+            )
+            
+            # Offene Tickets dieses Bursts über ihren Kanal wieder schließen
+            closing = []
+            for guild_id, user_id in users:
+                tickets = bot_instance.config_manager.get_guild_config(guild_id)["tickets"]
+                for ticket in tickets.values():
+                    if ticket["user_id"] == user_id and ticket["status"] == "open":
+                        closing.append((guild_id, ticket["channel_id"], user_id))
+            await run_burst(
+                (close_ticket(bot_instance, fake, stats, guild_id, channel_id, user_id) for guild_id, channel_id, user_id in closing),
+                args.concurrency
+            )
+        
+        await asyncio.gather(*sessions)
+    finally:
+        executor.shutdown(wait=False)
+        stop.set()
+        await pump
+        await bot_instance.scheduler.close()
+        await client.close()
+        bot_instance.config_manager.flush()
+    
+    return stats
+
+def print_report(stats: LatencyStats, fake: FakeDiscord, elapsed: float) -> None:
+    print(f"\n{'Vorgang':<22}{'Anzahl':>8}{'Fehler':>8}{'Durchsatz/s':>13}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in sorted(stats.summary().items()):
+        print(f"{name:<22}{row['count']:>8}{row['errors']:>8}{row['throughput']:>13.1f}"
+              f"{row['p50'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}{row['p99'] * 1000:>10.1f}")
+    
+    print("\nDiscord-Aufrufe pro Route (Statuscode: Anzahl)")
+    for route, statuses in sorted(fake.call_counts().items()):
+        counts = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+        print(f"  {route:<58}{counts}")
+    print(f"\nGesamtdauer {elapsed:.2f} s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lasttest gegen einen lokalen Fake-Discord-Server")
+    parser.add_argument("--guilds", type=int, default=5, help="Anzahl Server")
+    parser.add_argument("--tickets", type=int, default=200, help="Tickets pro Burst")
+    parser.add_argument("--bursts", type=int, default=1, help="Anzahl Bursts (jeweils öffnen, dann schließen)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Gleichzeitige Interaktionen")
+    parser.add_argument("--sessions", type=int, default=20, help="Dashboard-Sitzungen")
+    parser.add_argument("--requests-per-session", type=int, default=10, help="Seitenaufrufe pro Dashboard-Sitzung")
+    parser.add_argument("--latency", type=float, default=0.05, help="Antwortzeit des Fake-Servers in Sekunden")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Zufällige zusätzliche Antwortzeit in Sekunden")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Anteil der Anfragen, die mit 429 beantwortet werden")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Exit-Code 1, wenn ein p95 darüber liegt oder Fehler auftreten")
+    args = parser.parse_args()
+    
+    guild_ids = [str(800000000000000000 + index * 1000) for index in range(args.guilds)]
+    fake = FakeDiscord(guild_ids, latency=args.latency, jitter=args.jitter, rate_limit_ratio=args.rate_limit).start()
+    
+    # Bot und Web-Interface lesen ihre Einstellungen beim Import bzw. Start aus der Umgebung
+    os.environ["DISCORD_API"] = fake.api_base
+    os.environ["BOT_TOKEN"] = "load-test"
+    os.environ.setdefault("FLASK_SECRET_KEY", "load-test")
+    os.environ.pop("DEV_GUILD_ID", None)
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Konfiguration, Logs und Transkripte landen im temporären Verzeichnis
+        os.chdir(work_dir)
+        # Info-Logs pro Ticket würden die Ausgabe überdecken; Warnungen und Fehler bleiben sichtbar
+        logging.disable(logging.INFO)
+        try:
+            start = time.perf_counter()
+            stats = asyncio.run(run(args, fake))
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+            fake.stop()
+    
+    print(f"{args.guilds} Server, {args.bursts} x {args.tickets} Tickets, {args.concurrency} gleichzeitig, "
+          f"{args.sessions} Dashboard-Sitzungen, Latenz {args.latency * 1000:.0f}+{args.jitter * 1000:.0f} ms, "
+          f"429-Anteil {args.rate_limit:.1%}")
+    print_report(stats, fake, elapsed)
+    
+    if args.max_p95_ms is not None:
+        summary = stats.summary()
+        slow = [name for name, row in summary.items() if row["p95"] * 1000 > args.max_p95_ms]
+        failed = [name for name, row in summary.items() if row["errors"]]
+        if slow or failed:
+            print(f"\nRegression: p95 über {args.max_p95_ms:.0f} ms bei {slow}, Fehler bei {failed}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
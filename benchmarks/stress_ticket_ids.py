@@ -0,0 +1,55 @@
+"""
+Stresstest für die Vergabe von Ticket-IDs bei gleichzeitigen Button-Klicks.
+
+Simuliert viele parallele Interaktionen, die wie create_ticket zuerst eine ID reservieren,
+dann mehrere (zufällig lange) Discord-Aufrufe awaiten und das Ticket erst danach speichern.
+Aufruf: python -m benchmarks.stress_ticket_ids [anzahl]
+"""
+import sys
+import random
+import asyncio
+import tempfile
+
+from utils.config import ConfigManager
+
+async def simulated_create_ticket(manager: ConfigManager, guild_id: str, user_id: str) -> str:
+    ticket_id = manager.reserve_ticket(guild_id, user_id)
+    if ticket_id is None:
+        return None
+    
+    # Kategorie, Kanal, Nachricht, Pin
+    for _ in range(4):
+        await asyncio.sleep(random.uniform(0, 0.02))
+    
+    manager.add_ticket(guild_id, ticket_id, user_id, f"channel-{ticket_id}", "Support")
+    return ticket_id
+
+async def run(count: int) -> None:
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = ConfigManager(data_dir, backend="sqlite")
+        guild_id = "1"
+        
+        # Jeder Benutzer klickt zweimal; pro Benutzer darf nur ein Ticket entstehen
+        user_ids = [str(i) for i in range(count)] * 2
+        random.shuffle(user_ids)
+        results = await asyncio.gather(*(simulated_create_ticket(manager, guild_id, u) for u in user_ids))
+        
+        ticket_ids = [t_id for t_id in results if t_id is not None]
+        tickets = manager.get_guild_config(guild_id)["tickets"]
+        
+        assert len(ticket_ids) == count, f"{len(ticket_ids)} Tickets statt {count}"
+        assert len(set(ticket_ids)) == count, "Doppelte Ticket-IDs vergeben"
+        assert len(tickets) == count, f"{len(tickets)} gespeicherte Tickets statt {count}"
+        assert len({t["user_id"] for t in tickets.values()}) == count, "Benutzer mit mehreren Tickets"
+        
+        # Nach einem Neustart geht die Vergabe ohne Kollision weiter
+        manager.close()
+        reloaded = ConfigManager(data_dir, backend="sqlite")
+        next_id = reloaded.reserve_ticket(guild_id, "neu")
+        assert next_id not in tickets, f"ID {next_id} nach Neustart erneut vergeben"
+        reloaded.close()
+        
+        print(f"{len(user_ids)} gleichzeitige Interaktionen -> {count} eindeutige Tickets, nächste ID {next_id}")
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
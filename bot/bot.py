@@ -2,224 +2,862 @@ import os
 import discord
 from discord.ext import commands
 import asyncio
-from typing import Optional
+import signal
+import time
+import concurrent.futures
+from typing import Optional, Dict, List, Tuple, Any, Callable
 import datetime
 
 from utils.config import ConfigManager
 from utils.logger import Logger
-from bot.commands import register_commands
-from bot.components import register_component_callbacks
+from utils.metrics import REGISTRY, StepTimer, collect_families
+from utils.transcripts import TranscriptArchive, format_transcript_line
+from bot.commands import register_commands, command_tree_hash
+from bot.components import ComponentRouter, CloseTicketView, TicketPanelView, register_component_callbacks, register_persistent_views
+from bot.users import UsernameResolver
+from bot.log_dispatcher import LogDispatcher
+from bot.scheduler import Scheduler
+from bot.http_metrics import create_trace_config
+
+STARTUP_PHASES = REGISTRY.histogram(
+    "bot_startup_phase_seconds",
+    "Dauer der Startphasen des Bots (Login, Views, Command-Sync, Cache bereit)",
+    labelnames=("step",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+TICKET_SECONDS = REGISTRY.histogram(
+    "ticket_operation_seconds",
+    "Gesamtdauer von Ticket-Vorgängen (Erstellen bis Antwort, Schließen bis Transkript)",
+    labelnames=("action",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0, 60.0)
+)
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Verspätung des Event-Loops des Bots (gemessen an einem periodischen Sleep)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+LOOP_LAG_MAX = REGISTRY.gauge(
+    "event_loop_lag_max_seconds",
+    "Größte Verspätung des Event-Loops im letzten Messintervall"
+)
+TICKET_CREATE_STEPS = REGISTRY.histogram(
+    "ticket_create_step_seconds",
+    "Dauer der einzelnen Schritte beim Erstellen eines Tickets",
+    labelnames=("step",)
+)
+
+def client_options(profile: str = "default") -> Tuple[discord.Intents, Dict[str, Any]]:
+    """
+    Intents und Cache-Optionen für den Gateway-Client.
+    "low" behält nur, was die Ticket-Abläufe brauchen: Server/Kanäle/Rollen (Kategorien, Berechtigungen),
+    Nachrichten-Events (Inaktivität) und message_content (Transkripte per REST), aber keinen Nachrichten-
+    und Member-Cache und kein Chunking.
+    """
+    if profile == "low":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.guild_messages = True
+        intents.message_content = True
+        return intents, {
+            "max_messages": None,
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "chunk_guilds_at_startup": False
+        }
+    
+    if profile != "default":
+        raise ValueError(f"Unbekanntes Speicherprofil: {profile}")
+    
+    intents = discord.Intents.default()
+    intents.messages = True
+    intents.guilds = True
+    intents.message_content = True
+    return intents, {}
+
+class CategorySlot:
+    """
+    Vergebener Platz in einer Tickets-Kategorie; zählt, bis der neue Kanal im Kanal-Cache auftaucht
+    """
+    __slots__ = ("channel_id", "expires")
+    
+    def __init__(self, expires: float):
+        self.channel_id: Optional[int] = None
+        self.expires = expires
 
 class TicketBot:
     """
     Hauptklasse für den Discord Ticket Bot
     """
-    def __init__(self):
+    # Discord erlaubt höchstens 50 Kanäle pro Kategorie
+    CATEGORY_CHANNEL_LIMIT = 50
+    # So lange zählt ein Platz nach dem Erstellen des Kanals höchstens noch, bis der Kanal im Cache auftaucht
+    CATEGORY_SLOT_TTL = 10.0
+    # Obergrenze für Plätze, deren Kanal noch erstellt wird (falls der Aufruf nie zurückkehrt)
+    CATEGORY_SLOT_PENDING_TTL = 120.0
+    # So lange (Sekunden) darf das Transkript eines geschlossenen Tickets dauern, bevor die gespeicherte
+    # Abschluss-Aufgabe es selbst übernimmt (z.B. nach einem Neustart)
+    CLOSE_JOB_GRACE = 600.0
+    
+    def __init__(self, shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None, sharded: bool = False):
         self.token = os.getenv("BOT_TOKEN")
+        # Im Cluster-Modus verwaltet dieser Prozess nur die Server seiner Shards
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
         self.config_manager = ConfigManager()
+        self.transcript_archive = TranscriptArchive()
         self.logger = Logger("ticket_bot")
+        self._background_tasks = set()
+        self._startup = StepTimer(STARTUP_PHASES)
+        self._ready_once = False
+        # Beim Beenden aufgerufen, solange der Bot-Loop noch läuft (z.B. Web-Server leeren)
+        self._shutdown_hooks: List[Callable[[], None]] = []
+        self._shutting_down = False
         
-        # Erstelle Bot mit Intents
-        intents = discord.Intents.default()
-        intents.messages = True
-        intents.guilds = True
-        intents.message_content = True
+        # Vergebene, evtl. noch nicht im Kanal-Cache sichtbare Plätze pro Kategorie
+        self._category_slots: Dict[int, List[CategorySlot]] = {}
+        self._category_locks: Dict[int, asyncio.Lock] = {}
+        # Ticket-Kanäle, deren Transkript gerade in diesem Prozess erstellt wird
+        self._closing: set = set()
+        
+        # Erstelle Bot mit Intents und Cache-Einstellungen des Speicherprofils
+        intents, options = client_options(os.getenv("BOT_MEMORY_PROFILE", "default"))
         
-        self.bot = commands.Bot(command_prefix='!', intents=intents)
+        # Alternative REST-Basis-URL (z.B. lokaler Fake-Server für Lasttests)
+        api_base = os.getenv("DISCORD_API")
+        if api_base:
+            discord.http.Route.BASE = f"{api_base.rstrip('/')}/v10"
+        
+        # Ausgehende REST-Aufrufe und Rate-Limits für /metrics zählen
+        options["http_trace"] = create_trace_config()
+        
+        if sharded or shard_ids is not None:
+            # Mehrere Gateway-Verbindungen; ohne shard_count wird die von Discord empfohlene Anzahl verwendet
+            self.bot = commands.AutoShardedBot(command_prefix='!', intents=intents, shard_ids=shard_ids, shard_count=shard_count, **options)
+        else:
+            self.bot = commands.Bot(command_prefix='!', intents=intents, **options)
+        self.user_resolver = UsernameResolver(self.bot)
+        self.log_dispatcher = LogDispatcher(self.bot)
+        
+        # Verzögerte Aufgaben, die einen Neustart überstehen
+        self.scheduler = Scheduler(
+            self.config_manager,
+            max_concurrency=int(os.getenv("SCHEDULER_MAX_CONCURRENCY", 4)),
+            owns_guild=self.owns_guild
+        )
+        self.scheduler.register("delete_channel", self._delete_channel_job)
+        self.scheduler.register("finish_close", self._finish_close_job)
+        self.scheduler.register("idle_close", self._idle_close_job)
+        
+        # Letzte Aktivität pro Ticket-Kanal (channel_id -> Unix-Zeit), nur im Speicher;
+        # nach einem Neustart dient die ID der letzten Nachricht des Kanals als Ersatz
+        self._last_activity: Dict[str, float] = {}
+        
+        # Component-Interaktionen: custom_id-Präfix -> Handler
+        self.component_router = ComponentRouter()
         
         # Registriere Events
+        self.bot.setup_hook = self.setup_hook
+        self._close_client = self.bot.close
+        self.bot.close = self.close
         self.bot.event(self.on_ready)
         self.bot.event(self.on_interaction)
+        # Listener statt Event, damit die Standard-Verarbeitung von on_message erhalten bleibt
+        self.bot.add_listener(self.on_message)
         
         # Registriere Commands und Component-Callbacks
         register_commands(self)
         register_component_callbacks(self)
     
-    async def on_ready(self):
-        """Event, wenn der Bot bereit ist"""
-        self.logger.info(f'Logged in as {self.bot.user.name}')
+    async def setup_hook(self):
+        """Wird einmal nach dem Login und vor dem Verbinden mit dem Gateway aufgerufen"""
+        self._startup.mark("login")
+        
+        # Persistente Views, damit Buttons älterer Nachrichten nach einem Neustart funktionieren
+        with self._startup.step("views"):
+            register_persistent_views(self)
+        
+        self._spawn(self._monitor_loop_lag())
+        
+        # docker/systemd beenden mit SIGTERM: wie Strg+C geordnet herunterfahren
         try:
-            synced = await self.bot.tree.sync()
-            self.logger.info(f"Synced {len(synced)} command(s)")
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: self._spawn(self.bot.close()))
+        except (NotImplementedError, RuntimeError):
+            # Windows oder nicht im Haupt-Thread
+            pass
+        
+        # Einmal pro Prozess statt bei jedem (Re-)Connect in on_ready; im Cluster nur der Worker mit Shard 0
+        if self.shard_ids is None or 0 in self.shard_ids:
+            with self._startup.step("sync"):
+                # FORCE_COMMAND_SYNC=True erzwingt den Sync, falls der gespeicherte Hash nicht mehr zu Discord passt
+                await self.sync_commands(force=os.getenv("FORCE_COMMAND_SYNC", "False").lower() == "true")
+    
+    async def sync_commands(self, force: bool = False):
+        """Synchronisiert die Slash-Commands nur, wenn sich ihr Hash seit dem letzten Sync geändert hat"""
+        # Entwicklung: Commands sofort in einem Test-Server statt global (global kann bis zu einer Stunde dauern)
+        dev_guild_id = os.getenv("DEV_GUILD_ID")
+        guild = discord.Object(id=int(dev_guild_id)) if dev_guild_id else None
+        if guild:
+            self.bot.tree.copy_global_to(guild=guild)
+        
+        meta_key = f"command_tree_hash:{dev_guild_id or 'global'}"
+        tree_hash = command_tree_hash(self.bot.tree, guild=guild)
+        if not force and self.config_manager.get_meta(meta_key) == tree_hash:
+            self.logger.info("Commands unverändert, Sync übersprungen")
+            return
+        
+        try:
+            synced = await self.bot.tree.sync(guild=guild)
+            self.config_manager.set_meta(meta_key, tree_hash)
+            self.logger.info(f"Synced {len(synced)} command(s)" + (f" to guild {dev_guild_id}" if guild else ""))
         except Exception as e:
             self.logger.error(f"Error syncing commands: {e}")
     
+    async def _monitor_loop_lag(self, interval: float = 0.5, window: int = 20):
+        """Misst dauerhaft, wie viel später als geplant der Event-Loop einen Sleep beendet"""
+        worst = 0.0
+        samples = 0
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(time.perf_counter() - start - interval, 0.0)
+            LOOP_LAG.observe(lag)
+            worst = max(worst, lag)
+            samples += 1
+            if samples >= window:
+                LOOP_LAG_MAX.set(worst)
+                worst = 0.0
+                samples = 0
+    
+    def owns_guild(self, guild_id: str) -> bool:
+        """Prüft, ob der Server zu einem Shard dieses Prozesses gehört"""
+        if self.shard_ids is None:
+            return True
+        return (int(guild_id) >> 22) % self.shard_count in self.shard_ids
+    
+    async def on_ready(self):
+        """Event, wenn der Bot bereit ist (auch nach jedem Reconnect)"""
+        self.logger.info(f'Logged in as {self.bot.user.name}')
+        
+        if not self._ready_once:
+            self._ready_once = True
+            self._startup.mark("ready")
+            self.logger.info(f"Startzeiten: {self._startup.summary()}")
+        
+        # Gespeicherte Aufgaben (z.B. ausstehende Kanal-Löschungen) wieder einplanen
+        self.scheduler.start()
+    
     async def on_interaction(self, interaction: discord.Interaction):
         """Event für Button-Interaktionen und andere Components"""
         if interaction.type == discord.InteractionType.component:
-            # Die Logik für Component-Interaktionen ist in components.py
-            pass
+            # Routing per Dict-Lookup, die Handler sind in components.py registriert
+            await self.component_router.dispatch(interaction)
+    
+    async def on_message(self, message: discord.Message):
+        """Merkt sich die letzte Aktivität in Ticket-Kanälen (O(1) über den Kanal-Index)"""
+        if message.guild is None or message.author.bot:
+            return
+        
+        channel_id = str(message.channel.id)
+        if self.config_manager.get_ticket_id_by_channel(str(message.guild.id), channel_id):
+            self._last_activity[channel_id] = message.created_at.timestamp()
     
     async def create_ticket(self, interaction: discord.Interaction, category: str):
         """Erstellt ein neues Ticket"""
+        timer = StepTimer(TICKET_CREATE_STEPS)
         guild_id = str(interaction.guild_id)
-        guild_config = self.config_manager.get_guild_config(guild_id)
+        guild_config = self.config_manager.get_guild_settings(guild_id)
         user_id = str(interaction.user.id)
         
-        # Prüfe, ob der Benutzer bereits ein offenes Ticket hat
-        for ticket_id, ticket_info in guild_config["tickets"].items():
-            if ticket_info["user_id"] == user_id and ticket_info["status"] == "open":
-                await interaction.response.send_message("Du hast bereits ein offenes Ticket!", ephemeral=True)
-                return
+        # Reserviere die Ticket-ID synchron, bevor irgendetwas awaited wird.
+        # Gleichzeitige Klicks erhalten so eindeutige IDs, ein Benutzer aber nur ein Ticket.
+        ticket_id = self.config_manager.reserve_ticket(guild_id, user_id)
+        if ticket_id is None:
+            await self.component_router.ack(
+                interaction, interaction.response.send_message("Du hast bereits ein offenes Ticket!", ephemeral=True)
+            )
+            return
         
         guild = interaction.guild
         
-        # Finde oder erstelle Tickets-Kategorie
-        category_channel = discord.utils.get(guild.categories, name="Tickets")
-        if not category_channel:
-            category_channel = await guild.create_category("Tickets")
+        try:
+            # Sofort bestätigen (Discord erwartet eine Antwort innerhalb von 3 Sekunden)
+            # und parallel dazu die Tickets-Kategorie suchen bzw. erstellen
+            _, (category_channel, slot) = await asyncio.gather(
+                timer.measure("defer", self.component_router.ack(interaction, interaction.response.defer(ephemeral=True, thinking=True))),
+                timer.measure("category", self._get_ticket_category(guild))
+            )
+            
+            # Erstelle Ticket-Kanal
+            ticket_name = f"ticket-{ticket_id}-{interaction.user.name.lower()}"
+            
+            # Setze Berechtigungen
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                interaction.user: discord.PermissionOverwrite(read_messages=True, send_messages=True),
+                guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True, manage_channels=True)
+            }
+            
+            # Füge Rollenberechtigungen hinzu
+            for cat in guild_config["ticket_categories"]:
+                if cat["name"] == category:
+                    for role_id in cat["role_ids"]:
+                        role = guild.get_role(int(role_id))
+                        if role:
+                            overwrites[role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            
+            for role_id in guild_config["admin_role_ids"]:
+                role = guild.get_role(int(role_id))
+                if role:
+                    overwrites[role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            
+            # Erstelle den Kanal
+            ticket_channel = None
+            try:
+                with timer.step("channel"):
+                    ticket_channel = await guild.create_text_channel(
+                        name=ticket_name,
+                        category=category_channel,
+                        overwrites=overwrites,
+                        topic=f"Ticket für {interaction.user.name} - {category}"
+                    )
+            finally:
+                self._release_category_slot(category_channel, slot, ticket_channel)
+        except BaseException as e:
+            # Reservierung freigeben (auch bei Abbruch), damit der Benutzer es erneut versuchen kann
+            self.config_manager.release_ticket_reservation(guild_id, user_id)
+            if isinstance(e, Exception) and interaction.response.is_done():
+                await interaction.followup.send("Das Ticket konnte nicht erstellt werden.", ephemeral=True)
+            raise
         
-        # Erstelle Ticket-Kanal
-        ticket_count = len(guild_config["tickets"]) + 1
-        ticket_name = f"ticket-{ticket_count}-{interaction.user.name.lower()}"
+        # Speichere Ticket-Infos, sobald der Kanal existiert
+        self.config_manager.add_ticket(
+            guild_id=guild_id,
+            ticket_id=ticket_id,
+            user_id=user_id,
+            channel_id=str(ticket_channel.id),
+            category=category
+        )
         
-        # Setze Berechtigungen
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            interaction.user: discord.PermissionOverwrite(read_messages=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True, manage_channels=True)
-        }
+        self._schedule_idle_close(guild_id, ticket_id, str(ticket_channel.id), guild_config)
         
-        # Füge Rollenberechtigungen hinzu
-        for cat in guild_config["ticket_categories"]:
-            if cat["name"] == category:
-                for role_id in cat["role_ids"]:
-                    role = guild.get_role(int(role_id))
-                    if role:
-                        overwrites[role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
-        
-        for role_id in guild_config["admin_role_ids"]:
-            role = guild.get_role(int(role_id))
-            if role:
-                overwrites[role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
-        
-        # Erstelle den Kanal
-        ticket_channel = await guild.create_text_channel(
-            name=ticket_name,
-            category=category_channel,
-            overwrites=overwrites,
-            topic=f"Ticket für {interaction.user.name} - {category}"
+        # Begrüßungsnachricht und Antwort an den Benutzer laufen parallel
+        await asyncio.gather(
+            timer.measure("welcome", self._send_ticket_welcome(ticket_channel, interaction.user, category, ticket_id)),
+            timer.measure("followup", interaction.followup.send(f"Ticket erstellt! Gehe zu {ticket_channel.mention}", ephemeral=True))
         )
         
+        # Logge Ticket-Erstellung abseits des kritischen Pfads (gebündelt über den Log-Dispatcher)
+        self._log_ticket_created(guild_config, ticket_id, interaction.user, category, ticket_channel)
+        
+        TICKET_SECONDS.observe(timer.total, action="create")
+        self.logger.info(f"Ticket #{ticket_id} in Server {guild_id} erstellt: {timer.summary()}")
+    
+    async def _get_ticket_category(self, guild: discord.Guild) -> Tuple[discord.CategoryChannel, CategorySlot]:
+        """
+        Gibt eine Tickets-Kategorie mit einem reservierten Platz zurück und erstellt bei Bedarf eine weitere
+        (Tickets 2, 3, ...). Der Platz wird mit _release_category_slot freigegeben.
+        """
+        reserved = self._reserve_category_slot(guild)
+        if reserved:
+            return reserved
+        
+        # Nur das Erstellen wird pro Server serialisiert, damit gleichzeitige Tickets keine Kategorien doppelt anlegen
+        lock = self._category_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            reserved = self._reserve_category_slot(guild)
+            if reserved:
+                return reserved
+            
+            categories = self._ticket_categories(guild)
+            names = {category.name for category in categories}
+            number = 1
+            while (f"Tickets {number}" if number > 1 else "Tickets") in names:
+                number += 1
+            
+            category_channel = await guild.create_category(f"Tickets {number}" if number > 1 else "Tickets")
+            self.config_manager.set_ticket_category_ids(
+                str(guild.id),
+                [str(category.id) for category in categories] + [str(category_channel.id)]
+            )
+            slot = CategorySlot(time.monotonic() + self.CATEGORY_SLOT_PENDING_TTL)
+            self._category_slots[category_channel.id] = [slot]
+            self.logger.info(f"Tickets-Kategorie {category_channel.name} in Server {guild.id} erstellt")
+            return category_channel, slot
+    
+    def _ticket_categories(self, guild: discord.Guild) -> List[discord.CategoryChannel]:
+        """Gibt die gespeicherten Tickets-Kategorien zurück, die noch existieren (Lookup per ID im Kanal-Cache)"""
+        guild_id = str(guild.id)
+        category_ids = self.config_manager.get_guild_settings(guild_id).get("ticket_category_ids")
+        if category_ids is None:
+            # Bestehende Server: einmalig die vorhandene "Tickets"-Kategorie übernehmen
+            legacy_category = discord.utils.get(guild.categories, name="Tickets")
+            category_ids = [str(legacy_category.id)] if legacy_category else []
+            self.config_manager.set_ticket_category_ids(guild_id, category_ids)
+        
+        categories = []
+        for category_id in category_ids:
+            channel = guild.get_channel(int(category_id))
+            if isinstance(channel, discord.CategoryChannel):
+                categories.append(channel)
+        
+        # Manuell gelöschte Kategorien aus der Konfiguration entfernen
+        if len(categories) != len(category_ids):
+            self.config_manager.set_ticket_category_ids(guild_id, [str(category.id) for category in categories])
+        
+        return categories
+    
+    def _reserve_category_slot(self, guild: discord.Guild) -> Optional[Tuple[discord.CategoryChannel, CategorySlot]]:
+        """
+        Reserviert einen Platz in der ersten Tickets-Kategorie mit weniger als 50 Kanälen.
+        Frühere Kategorien werden bevorzugt, damit geleerte Kategorien wiederverwendet werden.
+        """
+        now = time.monotonic()
+        categories = self._ticket_categories(guild)
+        # Ein Durchlauf über den Kanal-Cache statt CategoryChannel.channels (durchsucht und sortiert je Kategorie alle Kanäle)
+        counts = dict.fromkeys((category.id for category in categories), 0)
+        for channel in guild.channels:
+            if channel.category_id in counts:
+                counts[channel.category_id] += 1
+        
+        for category_channel in categories:
+            # Plätze, deren Kanal schon im Cache ist, nicht doppelt zählen
+            slots = [
+                slot for slot in self._category_slots.get(category_channel.id, [])
+                if slot.expires > now and (slot.channel_id is None or guild.get_channel(slot.channel_id) is None)
+            ]
+            self._category_slots[category_channel.id] = slots
+            if counts[category_channel.id] + len(slots) < self.CATEGORY_CHANNEL_LIMIT:
+                slot = CategorySlot(now + self.CATEGORY_SLOT_PENDING_TTL)
+                slots.append(slot)
+                return category_channel, slot
+        return None
+    
+    def _release_category_slot(self, category_channel: discord.CategoryChannel, slot: CategorySlot, channel: Optional[discord.abc.GuildChannel]) -> None:
+        """Gibt einen Platz frei: sofort, wenn kein Kanal erstellt wurde, sonst sobald der Kanal im Cache auftaucht"""
+        if channel is None:
+            slots = self._category_slots.get(category_channel.id, [])
+            if slot in slots:
+                slots.remove(slot)
+            return
+        
+        slot.channel_id = channel.id
+        slot.expires = time.monotonic() + self.CATEGORY_SLOT_TTL
+    
+    async def _send_ticket_welcome(self, ticket_channel: discord.TextChannel, user: discord.abc.User, category: str, ticket_id: str):
+        """Sendet und pinnt die Begrüßungsnachricht im Ticket-Kanal"""
         # Erstelle Embed für das Ticket
         embed = discord.Embed(
             title=f"Ticket: {category}",
-            description=f"Danke für die Erstellung eines Tickets, {interaction.user.mention}. Das Support-Team wird sich in Kürze bei dir melden.",
+            description=f"Danke für die Erstellung eines Tickets, {user.mention}. Das Support-Team wird sich in Kürze bei dir melden.",
             color=discord.Color.blue(),
             timestamp=datetime.datetime.now()
         )
-        embed.set_footer(text=f"Ticket ID: {ticket_count}")
-        
-        # Erstelle Buttons
-        close_button = discord.ui.Button(style=discord.ButtonStyle.danger, label="Ticket schließen", custom_id="close_ticket")
-        
-        view = discord.ui.View()
-        view.add_item(close_button)
+        embed.set_footer(text=f"Ticket ID: {ticket_id}")
         
-        message = await ticket_channel.send(embed=embed, view=view)
+        # Persistenter Schließen-Button
+        message = await ticket_channel.send(embed=embed, view=CloseTicketView())
         await message.pin()
-        
-        # Speichere Ticket-Infos
-        ticket_id = str(ticket_count)
-        self.config_manager.add_ticket(
-            guild_id=guild_id,
-            ticket_id=ticket_id,
-            user_id=user_id,
-            channel_id=str(ticket_channel.id),
-            category=category
-        )
-        
-        # Antworte auf Interaktion
-        await interaction.response.send_message(f"Ticket erstellt! Gehe zu {ticket_channel.mention}", ephemeral=True)
-        
-        # Logge Ticket-Erstellung
+    
+    def _log_ticket_created(self, guild_config: dict, ticket_id: str, user: discord.abc.User, category: str, ticket_channel: discord.TextChannel):
+        """Reiht die Ticket-Erstellung für den Log-Kanal ein"""
         log_channel_id = guild_config.get("ticket_log_channel_id")
         if log_channel_id:
-            log_channel = self.bot.get_channel(int(log_channel_id))
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="Ticket erstellt",
-                    description=f"Ticket #{ticket_id} wurde von {interaction.user.mention} erstellt",
-                    color=discord.Color.green(),
-                    timestamp=datetime.datetime.now()
-                )
-                log_embed.add_field(name="Kategorie", value=category)
-                log_embed.add_field(name="Kanal", value=ticket_channel.mention)
-                await log_channel.send(embed=log_embed)
+            log_embed = discord.Embed(
+                title="Ticket erstellt",
+                description=f"Ticket #{ticket_id} wurde von {user.mention} erstellt",
+                color=discord.Color.green(),
+                timestamp=datetime.datetime.now()
+            )
+            log_embed.add_field(name="Kategorie", value=category)
+            log_embed.add_field(name="Kanal", value=ticket_channel.mention)
+            self.log_dispatcher.dispatch(int(log_channel_id), log_embed)
+    
+    def _spawn(self, coro) -> asyncio.Task:
+        """Startet eine Hintergrund-Aufgabe und hält eine Referenz, bis sie fertig ist"""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+        return task
+    
+    def _on_background_task_done(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            self.logger.error(f"Fehler in Hintergrund-Aufgabe: {task.exception()}")
     
     async def close_ticket(self, interaction: discord.Interaction):
         """Schließt ein Ticket"""
+        start = time.perf_counter()
         guild_id = str(interaction.guild_id)
         guild_config = self.config_manager.get_guild_config(guild_id)
         channel_id = str(interaction.channel_id)
         
         # Finde das Ticket
-        ticket_id = None
-        for t_id, ticket in guild_config["tickets"].items():
-            if ticket["channel_id"] == channel_id and ticket["status"] == "open":
-                ticket_id = t_id
-                break
+        ticket_id = self.config_manager.get_ticket_id_by_channel(guild_id, channel_id)
+        if ticket_id and guild_config["tickets"][ticket_id]["status"] != "open":
+            ticket_id = None
         
         if ticket_id:
             # Aktualisiere Ticket-Status
-            self.config_manager.update_ticket_status(
-                guild_id=guild_id,
-                ticket_id=ticket_id,
-                status="closed",
-                closed_at=datetime.datetime.now().isoformat()
-            )
+            self._mark_ticket_closed(guild_id, ticket_id, channel_id, interaction.user.mention)
             
-            # Erstelle Transkript
-            await self.create_transcript(interaction, ticket_id, guild_config)
+            # Antworte sofort; das Transkript kann bei langen Tickets dauern
+            await self.component_router.ack(
+                interaction, interaction.response.send_message("Ticket wird geschlossen, Transkript wird erstellt...")
+            )
             
-            # Antworte auf Interaktion
-            await interaction.response.send_message("Ticket wird in 5 Sekunden geschlossen...")
-            await asyncio.sleep(5)
-            await interaction.channel.delete()
+            await self._finish_close(interaction.channel, ticket_id, guild_config, interaction.user.mention)
+            await interaction.edit_original_response(content="Ticket wird in 5 Sekunden geschlossen...")
+            TICKET_SECONDS.observe(time.perf_counter() - start, action="close")
         else:
-            await interaction.response.send_message("Konnte kein offenes Ticket für diesen Kanal finden.", ephemeral=True)
+            await self.component_router.ack(
+                interaction, interaction.response.send_message("Konnte kein offenes Ticket für diesen Kanal finden.", ephemeral=True)
+            )
     
-    async def create_transcript(self, interaction: discord.Interaction, ticket_id: str, guild_config: dict):
-        """Erstellt ein Transkript des Tickets und sendet es an den Log-Kanal"""
-        # Sammle Nachrichten
-        messages = []
-        async for msg in interaction.channel.history(limit=100, oldest_first=True):
-            time = msg.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            content = msg.content if msg.content else "*[Kein Textinhalt]*"
-            messages.append(f"[{time}] {msg.author.name}: {content}")
+    def _mark_ticket_closed(self, guild_id: str, ticket_id: str, channel_id: str, closed_by: str):
+        """Setzt den Status auf geschlossen, bevor etwas awaited wird (verhindert doppeltes Schließen)"""
+        self.config_manager.update_ticket_status(
+            guild_id=guild_id,
+            ticket_id=ticket_id,
+            status="closed",
+            closed_at=datetime.datetime.now().isoformat()
+        )
+        self.scheduler.cancel(guild_id, f"idle_close:{channel_id}")
+        self._last_activity.pop(channel_id, None)
+        # Transkript und Löschen gleich mit dem Status sichern: übersteht einen Neustart oder ein fehlgeschlagenes Transkript
+        self._schedule_finish_close(guild_id, ticket_id, channel_id, closed_by, self.CLOSE_JOB_GRACE)
+    
+    def _schedule_finish_close(self, guild_id: str, ticket_id: str, channel_id: str, closed_by: str, delay: float, transcript_done: bool = False):
+        """Plant (oder verschiebt) die gespeicherte Abschluss-Aufgabe eines geschlossenen Tickets"""
+        self.scheduler.schedule(
+            guild_id,
+            "finish_close",
+            delay=delay,
+            payload={"channel_id": channel_id, "ticket_id": ticket_id, "closed_by": closed_by, "transcript_done": transcript_done},
+            job_id=f"finish_close:{channel_id}"
+        )
+    
+    async def _finish_close(self, channel: discord.TextChannel, ticket_id: str, guild_config: dict, closed_by: str):
+        """Erstellt das Transkript und verschiebt das Löschen des Kanals auf in 5 Sekunden"""
+        guild_id = str(channel.guild.id)
+        channel_id = str(channel.id)
+        self._closing.add(channel_id)
+        try:
+            await self.create_transcript(channel, ticket_id, guild_config, closed_by)
+        except Exception:
+            # Die gespeicherte Aufgabe versucht das Transkript erneut
+            self._schedule_finish_close(guild_id, ticket_id, channel_id, closed_by, self.scheduler.RETRY_DELAY)
+            raise
+        finally:
+            self._closing.discard(channel_id)
         
-        transcript = "\n".join(messages)
+        # Löschen über die gespeicherte Aufgabe, statt den Handler 5 Sekunden warten zu lassen
+        self._schedule_finish_close(guild_id, ticket_id, channel_id, closed_by, 5, transcript_done=True)
+    
+    async def _finish_close_job(self, guild_id: str, payload: dict):
+        """Geplante Aufgabe: erstellt das Transkript, falls es noch fehlt, und löscht den Kanal"""
+        channel_id = payload["channel_id"]
+        if channel_id in self._closing:
+            # Das Transkript läuft noch in diesem Prozess: später erneut prüfen
+            self._schedule_finish_close(guild_id, payload["ticket_id"], channel_id, payload.get("closed_by"), self.CLOSE_JOB_GRACE)
+            return
         
-        # Erstelle Transkript-Datei
-        transcript_dir = "data/transcripts"
-        if not os.path.exists(transcript_dir):
-            os.makedirs(transcript_dir)
+        if not payload.get("transcript_done"):
+            channel = await self._ticket_channel(channel_id)
+            if channel is None:
+                return
+            guild_config = self.config_manager.get_guild_config(guild_id)
+            await self.create_transcript(channel, payload["ticket_id"], guild_config, payload.get("closed_by") or self.bot.user.mention)
         
-        file_path = f'{transcript_dir}/ticket-{ticket_id}.txt'
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(transcript)
+        await self._delete_channel_job(guild_id, payload)
+    
+    async def create_transcript(self, channel: discord.TextChannel, ticket_id: str, guild_config: dict, closed_by: str):
+        """Erstellt ein Transkript des Tickets und sendet es an den Log-Kanal"""
+        # Erstelle Transkript im Archiv: komplette Historie, blockweise im Thread-Pool
+        # komprimiert geschrieben und dabei in den Volltextindex aufgenommen
+        guild_id = str(channel.guild.id)
+        file_name = f"ticket-{ticket_id}.txt.gz"
+        
+        async with self.transcript_archive.writer(guild_id, ticket_id) as writer:
+            async for msg in channel.history(limit=None, oldest_first=True):
+                await writer.write_line(format_transcript_line(msg))
+        file_path = writer.file_path
         
-        # Sende Transkript an Log-Kanal
+        # Sende Transkript an Log-Kanal (gebündelt über den Log-Dispatcher)
         log_channel_id = guild_config.get("ticket_log_channel_id")
         if log_channel_id:
-            log_channel = self.bot.get_channel(int(log_channel_id))
-            if log_channel:
-                user = await self.bot.fetch_user(int(guild_config["tickets"][ticket_id]["user_id"]))
-                
-                log_embed = discord.Embed(
-                    title="Ticket geschlossen",
-                    description=f"Ticket #{ticket_id} wurde von {interaction.user.mention} geschlossen",
-                    color=discord.Color.red(),
-                    timestamp=datetime.datetime.now()
-                )
-                log_embed.add_field(name="Erstellt von", value=user.mention if user else "Unbekannt")
-                log_embed.add_field(name="Kategorie", value=guild_config["tickets"][ticket_id]["category"])
-                
-                with open(file_path, 'rb') as f:
-                    transcript_file = discord.File(f, filename=f'ticket-{ticket_id}.txt')
-                    await log_channel.send(embed=log_embed, file=transcript_file)
+            ticket = guild_config["tickets"][ticket_id]
+            log_embed = discord.Embed(
+                title="Ticket geschlossen",
+                description=f"Ticket #{ticket_id} wurde von {closed_by} geschlossen",
+                color=discord.Color.red(),
+                timestamp=datetime.datetime.now()
+            )
+            # Erwähnung direkt aus der ID, ohne zusätzlichen fetch_user-Aufruf
+            log_embed.add_field(name="Erstellt von", value=f"<@{ticket['user_id']}>")
+            log_embed.add_field(name="Kategorie", value=ticket["category"])
+            
+            self.log_dispatcher.dispatch(int(log_channel_id), log_embed, file_path=file_path, file_name=file_name)
+    
+    def _idle_timeout(self, guild_config: dict) -> float:
+        """Zeitlimit für inaktive Tickets in Sekunden (0 = deaktiviert)"""
+        return float(guild_config.get("idle_close_hours") or 0) * 3600
+    
+    def _schedule_idle_close(self, guild_id: str, ticket_id: str, channel_id: str, guild_config: dict, last_activity: Optional[float] = None):
+        """Plant die Prüfung auf Inaktivität für den Zeitpunkt, an dem das Ticket frühestens inaktiv wäre"""
+        timeout = self._idle_timeout(guild_config)
+        if not timeout:
+            return
+        
+        due = (last_activity or time.time()) + timeout
+        self.scheduler.schedule(
+            guild_id,
+            "idle_close",
+            delay=max(due - time.time(), 0),
+            payload={"channel_id": channel_id, "ticket_id": ticket_id},
+            job_id=f"idle_close:{channel_id}"
+        )
+    
+    def arm_idle_close(self, guild_id: str):
+        """Plant die Inaktivitäts-Prüfung für alle offenen Tickets eines Servers neu (nach Änderung des Zeitlimits)"""
+        guild_config = self.config_manager.get_guild_config(guild_id)
+        timeout = self._idle_timeout(guild_config)
+        now = time.time()
+        jobs = []
+        for ticket_id in self.config_manager.get_open_ticket_ids(guild_id):
+            ticket = guild_config["tickets"][ticket_id]
+            channel_id = ticket["channel_id"]
+            # Genauer Zeitpunkt wird erst bei Fälligkeit geprüft, hier genügt eine Untergrenze
+            last_activity = self._last_activity.get(channel_id) or self._created_timestamp(ticket)
+            payload = {"channel_id": channel_id, "ticket_id": ticket_id}
+            jobs.append((f"idle_close:{channel_id}", max(last_activity + timeout - now, 0), payload))
+        
+        # Ein Schreibvorgang für alle Tickets statt einem pro Ticket (blockiert sonst den Bot-Loop)
+        if timeout:
+            self.scheduler.schedule_many(guild_id, "idle_close", jobs)
+        else:
+            self.scheduler.cancel_many(guild_id, [job_id for job_id, _, _ in jobs])
+    
+    def _created_timestamp(self, ticket: dict) -> float:
+        try:
+            return datetime.datetime.fromisoformat(ticket["created_at"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return time.time()
+    
+    def _last_activity_of(self, channel: discord.TextChannel, ticket: dict) -> float:
+        """Letzte Aktivität: Index, sonst Zeitstempel der letzten Nachricht (Snowflake), sonst Erstellungszeit"""
+        last_activity = self._last_activity.get(str(channel.id), 0.0)
+        if channel.last_message_id:
+            last_activity = max(last_activity, discord.utils.snowflake_time(channel.last_message_id).timestamp())
+        return max(last_activity, self._created_timestamp(ticket))
+    
+    async def _idle_close_job(self, guild_id: str, payload: dict):
+        """Geplante Aufgabe: schließt ein Ticket, wenn seit dem Zeitlimit keine Nachricht geschrieben wurde"""
+        guild_config = self.config_manager.get_guild_config(guild_id)
+        ticket_id = payload["ticket_id"]
+        ticket = guild_config["tickets"].get(ticket_id)
+        timeout = self._idle_timeout(guild_config)
+        if not ticket or ticket["status"] != "open" or not timeout:
+            return
+        
+        channel = self.bot.get_channel(int(payload["channel_id"]))
+        if channel is None:
+            return
+        
+        # Lazy Re-Arming: Nachrichten verschieben keine Aufgaben, erst hier wird nachgerechnet
+        last_activity = self._last_activity_of(channel, ticket)
+        if last_activity + timeout > time.time():
+            self._schedule_idle_close(guild_id, ticket_id, payload["channel_id"], guild_config, last_activity)
+            return
+        
+        self._mark_ticket_closed(guild_id, ticket_id, payload["channel_id"], self.bot.user.mention)
+        await channel.send("Ticket wird wegen Inaktivität geschlossen, Transkript wird erstellt...")
+        await self._finish_close(channel, ticket_id, guild_config, self.bot.user.mention)
+        self.logger.info(f"Ticket #{ticket_id} in Server {guild_id} wegen Inaktivität geschlossen")
+    
+    async def _delete_channel_job(self, guild_id: str, payload: dict):
+        """Geplante Aufgabe: löscht den Kanal eines geschlossenen Tickets"""
+        channel = await self._ticket_channel(payload["channel_id"])
+        if channel is None:
+            return
+        
+        try:
+            await channel.delete(reason=f"Ticket #{payload.get('ticket_id')} geschlossen")
+        except discord.NotFound:
+            pass
+    
+    async def _ticket_channel(self, channel_id: str) -> Optional[discord.abc.GuildChannel]:
+        """Kanal aus dem Cache oder per API; None, wenn er bereits gelöscht wurde (z.B. manuell)"""
+        channel = self.bot.get_channel(int(channel_id))
+        if channel is None:
+            try:
+                channel = await self.bot.fetch_channel(int(channel_id))
+            except discord.NotFound:
+                return None
+        return channel
+    
+    def update_guild_categories(self, guild_id: str, categories: List[dict]):
+        """Speichert die Ticket-Kategorien eines Servers (aus dem Web-Interface) auf dem Bot-Loop"""
+        self._write_on_loop(guild_id, self.config_manager.update_guild_categories, categories)
+    
+    def update_guild_admin_roles(self, guild_id: str, role_ids: List[str]):
+        """Speichert die Admin-Rollen eines Servers auf dem Bot-Loop"""
+        self._write_on_loop(guild_id, self.config_manager.update_guild_admin_roles, role_ids)
+    
+    def set_log_channel(self, guild_id: str, channel_id: Optional[str]):
+        """Speichert den Log-Kanal eines Servers auf dem Bot-Loop"""
+        self._write_on_loop(guild_id, self.config_manager.set_log_channel, channel_id)
+    
+    def set_idle_close_hours(self, guild_id: str, hours: int):
+        """Speichert das Zeitlimit für inaktive Tickets und plant offene Tickets auf dem Bot-Loop neu ein"""
+        self._write_on_loop(guild_id, self._set_idle_close_hours, hours)
+    
+    def _set_idle_close_hours(self, guild_id: str, hours: int):
+        self.config_manager.set_idle_close_hours(guild_id, hours)
+        self.arm_idle_close(guild_id)
+    
+    def _write_on_loop(self, guild_id: str, write, *args):
+        """
+        Führt eine Änderung an den Einstellungen eines Servers auf dem Bot-Loop aus und wartet darauf.
+        Fehler (auch ein unbekannter Server oder ein Timeout) werden an den Aufrufer weitergereicht.
+        """
+        async def apply():
+            if self.bot.get_guild(int(guild_id)) is None:
+                raise LookupError(f"Server {guild_id} ist dem Bot nicht bekannt")
+            self.config_manager.get_guild_config(guild_id)
+            return write(guild_id, *args)
+        
+        return self.run_threadsafe(apply())
+    
+    def get_guild_channels(self, guild_id: str) -> Optional[List[dict]]:
+        """Gibt die Text-Kanäle eines Servers für das Web-Interface zurück (None, wenn der Bot ihn nicht kennt)"""
+        # Der Cache wird auf dem Bot-Loop verändert; aus Web-Threads daher nur dort lesen
+        return self._read_on_loop(self._guild_channels(guild_id))
+    
+    async def _guild_channels(self, guild_id: str) -> Optional[List[dict]]:
+        guild = self.bot.get_guild(int(guild_id))
+        if not guild:
+            return None
+        
+        return [
+            {
+                "id": str(channel.id),
+                "name": channel.name,
+                "category": channel.category.name if channel.category else "Keine Kategorie"
+            }
+            for channel in guild.text_channels
+        ]
+    
+    def get_guild_roles(self, guild_id: str) -> Optional[List[dict]]:
+        """Gibt die Rollen eines Servers (außer @everyone) für das Web-Interface zurück"""
+        return self._read_on_loop(self._guild_roles(guild_id))
+    
+    async def _guild_roles(self, guild_id: str) -> Optional[List[dict]]:
+        guild = self.bot.get_guild(int(guild_id))
+        if not guild:
+            return None
+        
+        return [
+            {
+                "id": str(role.id),
+                "name": role.name,
+                "color": role.color.value
+            }
+            for role in guild.roles
+            if role.name != "@everyone"
+        ]
+    
+    def _read_on_loop(self, coro):
+        """Führt einen Lesezugriff auf den Discord-Cache auf dem Bot-Loop aus (None, solange der Bot nicht läuft)"""
+        try:
+            return self.run_threadsafe(coro)
+        except Exception as e:
+            coro.close()
+            self.logger.error(f"Lesezugriff auf dem Bot-Loop fehlgeschlagen: {e}")
+            return None
+    
+    def resolve_usernames(self, guild_id: str, user_ids: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        """
+        Löst Benutzernamen auf dem Bot-Loop auf (bei Fehlern nur aus dem Cache); gibt die Namen und die
+        zurückgestellten IDs zurück, die in einem weiteren Aufruf aufgelöst werden
+        """
+        try:
+            return self.run_threadsafe(self.user_resolver.resolve(int(guild_id), user_ids))
+        except Exception as e:
+            self.logger.error(f"Fehler beim Auflösen von Benutzernamen: {e}")
+            return self.user_resolver.cached_names(user_ids), []
+    
+    def cached_usernames(self, guild_id: str, user_ids: List[str]) -> Dict[str, str]:
+        """Liefert bereits bekannte Benutzernamen ohne REST-Aufruf; bei Fehlern nur aus dem Namens-Cache"""
+        try:
+            return self.run_threadsafe(self._cached_usernames(guild_id, user_ids))
+        except Exception as e:
+            self.logger.error(f"Fehler beim Auflösen von Benutzernamen: {e}")
+            return self.user_resolver.cached_names(user_ids)
+    
+    async def _cached_usernames(self, guild_id: str, user_ids: List[str]) -> Dict[str, str]:
+        # Member- und User-Cache von discord.py werden auf dem Bot-Loop verändert
+        return self.user_resolver.resolve_cached(int(guild_id), user_ids)
+    
+    def create_ticket_panel(self, guild_id: str, channel_id: str):
+        """Sendet das Ticket-Panel auf dem Bot-Loop und setzt danach den Panel-Kanal; Fehler werden weitergereicht"""
+        self.run_threadsafe(self._send_ticket_panel(guild_id, channel_id))
+    
+    async def _send_ticket_panel(self, guild_id: str, channel_id: str):
+        guild = self.bot.get_guild(int(guild_id))
+        if not guild:
+            raise LookupError(f"Server {guild_id} ist dem Bot nicht bekannt")
+        
+        channel = guild.get_channel(int(channel_id))
+        if not isinstance(channel, discord.TextChannel):
+            raise LookupError(f"Kanal {channel_id} nicht gefunden")
+        
+        guild_config = self.config_manager.get_guild_settings(guild_id)
+        
+        # Erstelle Ticket-Panel Embed
+        embed = discord.Embed(
+            title="Support Ticket System",
+            description="Klicke auf einen der unten stehenden Buttons, um ein Support-Ticket zu erstellen",
+            color=discord.Color.blue()
+        )
+        
+        await channel.send(embed=embed, view=TicketPanelView(guild_config["ticket_categories"]))
+        self.config_manager.set_ticket_channel(guild_id, channel_id)
+    
+    def collect_metrics(self, **labels) -> list:
+        """Gibt die Metriken dieses Prozesses für /metrics zurück (im Cluster vom Launcher mit Label worker abgefragt)"""
+        return collect_families(**labels)
+    
+    def run_threadsafe(self, coro, timeout: float = 10.0):
+        """Führt eine Coroutine aus einem anderen Thread (z.B. Flask) auf dem Bot-Loop aus und wartet auf das Ergebnis"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.bot.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+    
+    def add_shutdown_hook(self, hook: Callable[[], None]) -> None:
+        """Registriert eine (blockierende) Funktion, die beim Beenden vor dem Schließen des Bots im Thread-Pool läuft"""
+        self._shutdown_hooks.append(hook)
+    
+    async def close(self):
+        """Fährt geordnet herunter: erst die Shutdown-Hooks und der Scheduler, dann die Verbindung zu Discord"""
+        if not self._shutting_down:
+            self._shutting_down = True
+            loop = asyncio.get_running_loop()
+            for hook in self._shutdown_hooks:
+                try:
+                    # Im Thread-Pool, damit der Loop währenddessen z.B. noch Web-Anfragen beantworten kann
+                    await loop.run_in_executor(None, hook)
+                except Exception as e:
+                    self.logger.error(f"Fehler beim Herunterfahren: {e}")
+            await self.scheduler.close()
+            # Noch gesammelte Log-Einträge senden, solange die Verbindung besteht
+            await self.log_dispatcher.close()
+        
+        await self._close_client()
     
     def run(self):
         """Startet den Bot"""
         self.logger.info("Starting bot...")
+        self._startup = StepTimer(STARTUP_PHASES)
         self.bot.run(self.token)
@@ -0,0 +1,295 @@
+import os
+import itertools
+import threading
+import multiprocessing
+import concurrent.futures
+from multiprocessing.connection import Connection
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from utils.config import ConfigManager
+from utils.logger import Logger
+from utils.metrics import REGISTRY, collect_families
+
+# Attribute von TicketBot, deren öffentliche Methoden das Web-Interface im Cluster aufrufen darf
+REMOTE_OBJECTS = ("config_manager", "transcript_archive")
+# Methoden von TicketBot für das Web-Interface; erstes Argument ist immer die guild_id
+REMOTE_METHODS = (
+    "update_guild_categories", "update_guild_admin_roles", "set_log_channel", "set_idle_close_hours",
+    "get_guild_channels", "get_guild_roles", "resolve_usernames", "cached_usernames",
+    "create_ticket_panel"
+)
+# Methoden von TicketBot, die der Launcher in jedem Worker aufruft (ohne guild_id)
+WORKER_METHODS = ("collect_metrics",)
+
+WORKER_UP = REGISTRY.gauge(
+    "cluster_worker_up",
+    "Ob der Worker beim letzten Abruf von /metrics geantwortet hat (1) oder nicht (0)",
+    labelnames=("worker",)
+)
+
+class ClusterError(Exception):
+    """
+    Fehler bei einem Aufruf an einen Worker-Prozess
+    """
+    pass
+
+def shard_for_guild(guild_id, shard_count: int) -> int:
+    """Shard eines Servers nach der Formel von Discord"""
+    return (int(guild_id) >> 22) % shard_count
+
+def split_shards(shard_count: int, workers: int) -> List[List[int]]:
+    """Verteilt die Shards in zusammenhängenden Bereichen möglichst gleichmäßig auf die Worker"""
+    workers = max(1, min(workers, shard_count))
+    size, rest = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for index in range(workers):
+        end = start + size + (1 if index < rest else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+def recommended_shard_count(token: str) -> int:
+    """Fragt die von Discord empfohlene Anzahl Shards ab"""
+    from web.discord_http import DiscordHTTPClient
+    
+    response = DiscordHTTPClient().get("/gateway/bot", headers={"Authorization": f"Bot {token}"})
+    response.raise_for_status()
+    return int(response.json()["shards"])
+
+def run_worker(index: int, shard_ids: List[int], shard_count: int, conn: Connection):
+    """Einstiegspunkt eines Worker-Prozesses: Bot für die eigenen Shards plus IPC-Server"""
+    # Eigene Log-Dateien pro Worker, bevor der erste Logger erstellt wird
+    os.environ["LOG_PROCESS_NAME"] = f"worker{index}"
+    from bot.bot import TicketBot
+    
+    bot = TicketBot(shard_ids=shard_ids, shard_count=shard_count)
+    bot.logger.info(f"Worker {index} startet mit Shards {shard_ids[0]}-{shard_ids[-1]} von {shard_count}")
+    
+    server = WorkerServer(bot, conn)
+    threading.Thread(target=server.serve, name=f"cluster-ipc-{index}", daemon=True).start()
+    
+    try:
+        bot.run()
+    finally:
+        bot.config_manager.flush()
+
+class WorkerServer:
+    """
+    Beantwortet Aufrufe des Web-Interfaces im Worker-Prozess (je Aufruf ein Thread aus dem Pool)
+    """
+    def __init__(self, bot_instance, conn: Connection, max_workers: int = 8):
+        self.bot_instance = bot_instance
+        self.conn = conn
+        self._send_lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cluster-call")
+    
+    def serve(self):
+        """Liest Anfragen, bis der Launcher die Verbindung schließt"""
+        while True:
+            try:
+                request_id, path, args, kwargs = self.conn.recv()
+            except (EOFError, OSError):
+                return
+            self._executor.submit(self._handle, request_id, path, args, kwargs)
+    
+    def _handle(self, request_id: int, path: Tuple[str, ...], args: tuple, kwargs: dict):
+        try:
+            response = (request_id, True, self._resolve(path)(*args, **kwargs))
+        except Exception as e:
+            response = (request_id, False, f"{type(e).__name__}: {e}")
+        
+        with self._send_lock:
+            try:
+                self.conn.send(response)
+            except Exception as e:
+                # z.B. nicht serialisierbares Ergebnis
+                self.conn.send((request_id, False, f"{type(e).__name__}: {e}"))
+    
+    def _resolve(self, path: Tuple[str, ...]):
+        # Nur freigegebene, öffentliche Methoden aufrufbar machen
+        if len(path) == 2 and path[0] in REMOTE_OBJECTS and not path[1].startswith("_"):
+            return getattr(getattr(self.bot_instance, path[0]), path[1])
+        if len(path) == 1 and (path[0] in REMOTE_METHODS or path[0] in WORKER_METHODS):
+            return getattr(self.bot_instance, path[0])
+        raise ClusterError(f"Aufruf nicht erlaubt: {'.'.join(path)}")
+
+class WorkerHandle:
+    """
+    Verbindung des Launchers zu einem Worker-Prozess mit parallelen, per ID zugeordneten Anfragen
+    """
+    def __init__(self, index: int, shard_ids: List[int], process: multiprocessing.Process, conn: Connection):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.process = process
+        self.conn = conn
+        self._ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, concurrent.futures.Future] = {}
+        self._pending_lock = threading.Lock()
+        threading.Thread(target=self._read, name=f"cluster-reader-{index}", daemon=True).start()
+    
+    def call(self, path: Tuple[str, ...], args: tuple, kwargs: dict, timeout: float) -> Any:
+        future = concurrent.futures.Future()
+        with self._pending_lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        
+        try:
+            with self._send_lock:
+                self.conn.send((request_id, path, args, kwargs))
+            return future.result(timeout)
+        except (OSError, EOFError) as e:
+            raise ClusterError(f"Worker {self.index} nicht erreichbar: {e}")
+        except concurrent.futures.TimeoutError:
+            raise ClusterError(f"Worker {self.index} antwortet nicht ({'.'.join(path)})")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+    
+    def _read(self):
+        while True:
+            try:
+                request_id, ok, value = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._pending_lock:
+                future = self._pending.get(request_id)
+            if future is not None and not future.done():
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(ClusterError(value))
+        
+        # Worker beendet: wartende Aufrufe sofort abbrechen
+        with self._pending_lock:
+            pending = list(self._pending.values())
+        for future in pending:
+            if not future.done():
+                future.set_exception(ClusterError(f"Worker {self.index} wurde beendet"))
+
+class Cluster:
+    """
+    Startet den Bot in mehreren Worker-Prozessen mit je einem Bereich von Shards.
+    Alle Worker teilen sich die SQLite-Datenbank; jeder Server wird nur von seinem Worker verändert.
+    """
+    def __init__(self, workers: int, shard_count: Optional[int] = None, call_timeout: float = 15.0):
+        self.logger = Logger("cluster")
+        self.token = os.getenv("BOT_TOKEN")
+        self.shard_count = shard_count or recommended_shard_count(self.token)
+        self.call_timeout = call_timeout
+        self.shard_ranges = split_shards(self.shard_count, workers)
+        self.workers: List[WorkerHandle] = []
+        self._worker_by_shard: Dict[int, WorkerHandle] = {}
+    
+    def start(self):
+        """Bereitet die gemeinsame Datenbank vor und startet die Worker-Prozesse"""
+        # Mehrere Prozesse können nur die SQLite-Datenbank gemeinsam nutzen (nicht die config.json)
+        os.environ["CONFIG_BACKEND"] = "sqlite"
+        # Migration einer bestehenden config.json genau einmal, bevor die Worker starten
+        ConfigManager(backend="sqlite").close()
+        
+        context = multiprocessing.get_context("spawn")
+        for index, shard_ids in enumerate(self.shard_ranges):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=run_worker,
+                args=(index, shard_ids, self.shard_count, child_conn),
+                name=f"ticket-bot-worker-{index}"
+            )
+            process.start()
+            child_conn.close()
+            
+            worker = WorkerHandle(index, shard_ids, process, parent_conn)
+            self.workers.append(worker)
+            for shard_id in shard_ids:
+                self._worker_by_shard[shard_id] = worker
+        
+        self.logger.info(f"{len(self.workers)} Worker für {self.shard_count} Shards gestartet")
+    
+    def worker_for(self, guild_id) -> WorkerHandle:
+        """Gibt den Worker zurück, der den Server verwaltet"""
+        return self._worker_by_shard[shard_for_guild(guild_id, self.shard_count)]
+    
+    def call(self, guild_id, path: Tuple[str, ...], args: tuple, kwargs: dict) -> Any:
+        """Ruft eine Methode im Worker des Servers auf und wartet auf das Ergebnis"""
+        return self.worker_for(guild_id).call(path, args, kwargs, self.call_timeout)
+    
+    def collect_metrics(self) -> list:
+        """Fragt die Metriken aller Worker parallel ab; jedes Sample erhält das Label worker"""
+        def collect(worker: WorkerHandle) -> list:
+            try:
+                families = worker.call(("collect_metrics",), (), {"worker": str(worker.index)}, self.call_timeout)
+            except ClusterError as e:
+                self.logger.warning(f"Metriken von Worker {worker.index} nicht verfügbar: {e}")
+                WORKER_UP.set(0, worker=worker.index)
+                return []
+            WORKER_UP.set(1, worker=worker.index)
+            return families
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.workers) or 1) as executor:
+            results = list(executor.map(collect, self.workers))
+        return [family for families in results for family in families]
+    
+    def join(self, before_stop: Optional[Callable[[], None]] = None):
+        """Wartet auf alle Worker; bei Strg+C werden sie beendet (vorher before_stop, z.B. Web-Server leeren)"""
+        try:
+            for worker in self.workers:
+                worker.process.join()
+                self.logger.warning(f"Worker {worker.index} beendet (Exit-Code {worker.process.exitcode})")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if before_stop is not None:
+                before_stop()
+            self.stop()
+    
+    def stop(self, timeout: float = 10.0):
+        """Beendet alle Worker (SIGINT wurde bei Strg+C bereits an die Prozessgruppe gesendet, sonst SIGTERM)"""
+        for worker in self.workers:
+            if worker.process.is_alive():
+                # SIGTERM: der Worker fährt geordnet herunter und schreibt seine Konfiguration
+                worker.process.terminate()
+        for worker in self.workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.kill()
+
+class RemoteObject:
+    """
+    Stellvertreter für ein Attribut von TicketBot (z.B. config_manager) im Launcher;
+    jeder Methodenaufruf wird anhand seines ersten Arguments (guild_id) an den zuständigen Worker geleitet
+    """
+    def __init__(self, cluster: Cluster, name: str):
+        self._cluster = cluster
+        self._name = name
+    
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        
+        def call(guild_id, *args, **kwargs):
+            return self._cluster.call(guild_id, (self._name, method), (guild_id,) + args, kwargs)
+        return call
+
+class ClusterProxy:
+    """
+    Bietet dem Web-Interface dieselbe Schnittstelle wie TicketBot, führt aber alles im Worker des Servers aus
+    """
+    def __init__(self, cluster: Cluster):
+        self.cluster = cluster
+        for name in REMOTE_OBJECTS:
+            setattr(self, name, RemoteObject(cluster, name))
+    
+    def collect_metrics(self) -> list:
+        """Metriken des Launchers (Web-Interface) und aller Worker (Bot, Speicher, Scheduler usw.)"""
+        worker_families = self.cluster.collect_metrics()
+        return collect_families() + worker_families
+    
+    def __getattr__(self, method: str):
+        if method not in REMOTE_METHODS:
+            raise AttributeError(method)
+        
+        def call(guild_id, *args, **kwargs):
+            return self.cluster.call(guild_id, (method,), (guild_id,) + args, kwargs)
+        return call
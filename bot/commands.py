@@ -1,6 +1,10 @@
+import json
+import hashlib
 import discord
 from discord import app_commands
 
+from bot.components import TicketPanelView
+
 def register_commands(bot_instance):
     """Registriert alle Slash-Commands für den Bot"""
     
@@ -12,7 +16,7 @@ def register_commands(bot_instance):
             return
         
         guild_id = str(interaction.guild_id)
-        guild_config = bot_instance.config_manager.get_guild_config(guild_id)
+        guild_config = bot_instance.config_manager.get_guild_settings(guild_id)
         
         # Erstelle Ticket-Panel Embed
         embed = discord.Embed(
@@ -22,15 +26,7 @@ def register_commands(bot_instance):
         )
         
         # Erstelle Buttons für jede Ticket-Kategorie
-        view = discord.ui.View(timeout=None)
-        
-        for category in guild_config["ticket_categories"]:
-            button = discord.ui.Button(
-                style=discord.ButtonStyle.primary,
-                label=category["name"],
-                custom_id=f"create_ticket:{category['name']}"
-            )
-            view.add_item(button)
+        view = TicketPanelView(guild_config["ticket_categories"])
         
         await interaction.response.send_message("Erstelle Ticket-Panel...", ephemeral=True)
         channel = interaction.channel
@@ -61,12 +57,25 @@ def register_commands(bot_instance):
             return
         
         guild_id = str(interaction.guild_id)
-        guild_config = bot_instance.config_manager.get_guild_config(guild_id)
+        guild_config = bot_instance.config_manager.get_guild_settings(guild_id)
         
         role_id = str(role.id)
         if role_id not in guild_config["admin_role_ids"]:
-            admin_roles = guild_config["admin_role_ids"] + [role_id]
+            admin_roles = list(guild_config["admin_role_ids"]) + [role_id]
             bot_instance.config_manager.update_guild_admin_roles(guild_id, admin_roles)
             await interaction.response.send_message(f"{role.mention} wurde als Admin-Rolle hinzugefügt", ephemeral=True)
         else:
             await interaction.response.send_message(f"{role.mention} ist bereits eine Admin-Rolle", ephemeral=True)
+
+def command_tree_hash(tree: app_commands.CommandTree, guild: discord.abc.Snowflake = None) -> str:
+    """Stabiler Hash der registrierten Slash-Commands (gleiche Nutzlast wie beim Sync an Discord)"""
+    payload = []
+    for command in tree.get_commands(guild=guild):
+        try:
+            payload.append(command.to_dict(tree))
+        except TypeError:
+            # Ältere discord.py-Versionen erwarten keinen Tree
+            payload.append(command.to_dict())
+    payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
@@ -1,19 +1,121 @@
+import time
 import discord
+from typing import Dict, Callable, Awaitable, Optional, List
+
+from utils.logger import Logger
+from utils.metrics import REGISTRY
+
+TIME_TO_ACK = REGISTRY.histogram(
+    "component_ack_seconds",
+    "Zeit vom Eingang einer Component-Interaktion bis zur ersten Antwort an Discord",
+    labelnames=("handler",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0)
+)
+HANDLE_SECONDS = REGISTRY.histogram(
+    "component_handle_seconds",
+    "Gesamtdauer der Verarbeitung einer Component-Interaktion",
+    labelnames=("handler", "result")
+)
+UNROUTED_TOTAL = REGISTRY.counter(
+    "component_unrouted_total",
+    "Component-Interaktionen ohne registrierten Handler"
+)
+
+ComponentHandler = Callable[[discord.Interaction, str], Awaitable[None]]
+
+class ComponentRouter:
+    """
+    Leitet Component-Interaktionen anhand des Präfixes der custom_id ("präfix:argument")
+    per Dict-Lookup an den registrierten Handler weiter und misst Antwort- und Gesamtzeit
+    """
+    def __init__(self):
+        self.logger = Logger("components")
+        self._handlers: Dict[str, ComponentHandler] = {}
+    
+    def register(self, prefix: str, handler: ComponentHandler) -> None:
+        """Registriert einen Handler: handler(interaction, argument)"""
+        self._handlers[prefix] = handler
+    
+    async def dispatch(self, interaction: discord.Interaction) -> None:
+        """Führt den Handler zur custom_id der Interaktion aus"""
+        prefix, _, argument = interaction.data.get("custom_id", "").partition(":")
+        handler = self._handlers.get(prefix)
+        if handler is None:
+            UNROUTED_TOTAL.inc()
+            return
+        
+        start = time.perf_counter()
+        interaction.extras["component_handler"] = prefix
+        interaction.extras["component_received_at"] = start
+        result = "ok"
+        try:
+            await handler(interaction, argument)
+        except Exception as e:
+            result = "error"
+            self.logger.error(f"Fehler im Component-Handler {prefix}: {e}")
+        finally:
+            duration = time.perf_counter() - start
+            # Handler ohne ack(): erste Antwort spätestens am Ende der Verarbeitung
+            if "component_acked" not in interaction.extras and interaction.response.is_done():
+                TIME_TO_ACK.observe(duration, handler=prefix)
+            HANDLE_SECONDS.observe(duration, handler=prefix, result=result)
+    
+    async def ack(self, interaction: discord.Interaction, awaitable: Awaitable):
+        """Awaited die erste Antwort eines Handlers (defer/send_message) und misst die Zeit bis dahin"""
+        result = await awaitable
+        received_at = interaction.extras.get("component_received_at")
+        if received_at is not None and "component_acked" not in interaction.extras:
+            interaction.extras["component_acked"] = True
+            TIME_TO_ACK.observe(time.perf_counter() - received_at, handler=interaction.extras["component_handler"])
+        return result
+
+class TicketPanelView(discord.ui.View):
+    """
+    Persistentes Ticket-Panel mit einem Button pro Ticket-Kategorie
+    """
+    def __init__(self, categories: List[dict]):
+        super().__init__(timeout=None)
+        for category in categories:
+            self.add_item(discord.ui.Button(
+                style=discord.ButtonStyle.primary,
+                label=category["name"],
+                custom_id=f"create_ticket:{category['name']}"
+            ))
+
+class CloseTicketView(discord.ui.View):
+    """
+    Persistenter Schließen-Button in jedem Ticket-Kanal
+    """
+    def __init__(self):
+        super().__init__(timeout=None)
+        self.add_item(discord.ui.Button(style=discord.ButtonStyle.danger, label="Ticket schließen", custom_id="close_ticket"))
+
+def register_persistent_views(bot_instance) -> None:
+    """Registriert die Views beim Start, damit ihre Buttons auch nach einem Neustart bekannt sind"""
+    bot_instance.bot.add_view(CloseTicketView())
+    
+    # Jede Kategorie nur einmal, auch wenn mehrere Server gleich benannte Kategorien haben
+    categories = {}
+    for guild_config in bot_instance.config_manager.config["guilds"].values():
+        for category in guild_config.get("ticket_categories", []):
+            categories.setdefault(category["name"], category)
+    
+    # Eine View fasst höchstens 25 Buttons
+    categories = list(categories.values())
+    for index in range(0, len(categories), 25):
+        bot_instance.bot.add_view(TicketPanelView(categories[index:index + 25]))
 
 def register_component_callbacks(bot_instance):
     """Registriert alle Component-Callbacks für den Bot"""
+    router = bot_instance.component_router
+    
+    # Ticket erstellen (custom_id "create_ticket:<Kategorie>")
+    async def create_ticket(interaction: discord.Interaction, category: str):
+        await bot_instance.create_ticket(interaction, category)
+    
+    # Ticket schließen (custom_id "close_ticket")
+    async def close_ticket(interaction: discord.Interaction, _: Optional[str] = None):
+        await bot_instance.close_ticket(interaction)
     
-    @bot_instance.bot.event
-    async def on_interaction(interaction: discord.Interaction):
-        """Event für Button-Interaktionen und andere Components"""
-        if interaction.type == discord.InteractionType.component:
-            custom_id = interaction.data.get("custom_id", "")
-            
-            # Ticket erstellen
-            if custom_id.startswith("create_ticket:"):
-                category = custom_id.split(":")[1]
-                await bot_instance.create_ticket(interaction, category)
-            
-            # Ticket schließen
-            elif custom_id == "close_ticket":
-                await bot_instance.close_ticket(interaction)
+    router.register("create_ticket", create_ticket)
+    router.register("close_ticket", close_ticket)
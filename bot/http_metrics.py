@@ -0,0 +1,52 @@
+import re
+import time
+import aiohttp
+
+from utils.metrics import REGISTRY
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "discord_bot_requests_total",
+    "Ausgehende Discord-REST-Aufrufe des Bots",
+    labelnames=("method", "route", "status")
+)
+RATE_LIMITED_TOTAL = REGISTRY.counter(
+    "discord_bot_rate_limited_total",
+    "Rate-Limit-Treffer (429) des Bots",
+    labelnames=("method", "route", "scope")
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "discord_bot_request_seconds",
+    "Dauer ausgehender Discord-REST-Aufrufe des Bots",
+    labelnames=("method", "route")
+)
+
+# Tokens in Interaktions- und Webhook-URLs sowie alle IDs ersetzen (begrenzte Anzahl Label-Werte)
+_TOKEN_PATTERN = re.compile(r"/(interactions|webhooks)/(\d+)/[^/]+")
+_ID_PATTERN = re.compile(r"/\d+")
+
+def normalize_route(path: str) -> str:
+    """Macht aus einem API-Pfad eine Route ohne IDs, z.B. /api/v10/channels/{id}/messages"""
+    path = _TOKEN_PATTERN.sub(r"/\1/{id}/{token}", path)
+    return _ID_PATTERN.sub("/{id}", path)
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """TraceConfig für den HTTP-Client von discord.py (Option http_trace), zählt Aufrufe und 429-Antworten"""
+    trace_config = aiohttp.TraceConfig()
+    
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+    
+    async def on_request_end(session, context, params):
+        route = normalize_route(params.url.path)
+        status = params.response.status
+        REQUESTS_TOTAL.inc(method=params.method, route=route, status=status)
+        REQUEST_SECONDS.observe(time.perf_counter() - context.start, method=params.method, route=route)
+        if status == 429:
+            scope = params.response.headers.get("X-RateLimit-Scope") or (
+                "global" if params.response.headers.get("X-RateLimit-Global") else "bucket"
+            )
+            RATE_LIMITED_TOTAL.inc(method=params.method, route=route, scope=scope)
+    
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
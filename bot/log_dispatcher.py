@@ -0,0 +1,189 @@
+import time
+import asyncio
+import aiohttp
+import discord
+from typing import Dict, Optional
+
+from utils.logger import Logger
+from utils.metrics import REGISTRY
+
+QUEUE_DEPTH = REGISTRY.gauge(
+    "log_dispatch_queue_depth",
+    "Wartende Log-Einträge pro Log-Kanal",
+    labelnames=("channel_id",)
+)
+FLUSH_LATENCY = REGISTRY.histogram(
+    "log_dispatch_flush_seconds",
+    "Zeit vom Einreihen des ersten Eintrags bis zum Versand der Log-Nachricht",
+    buckets=(0.1, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0, 60.0)
+)
+BATCH_SIZE = REGISTRY.histogram(
+    "log_dispatch_batch_size",
+    "Anzahl Embeds pro gesendeter Log-Nachricht",
+    buckets=(1, 2, 3, 5, 8, 10)
+)
+DROPPED_TOTAL = REGISTRY.counter(
+    "log_dispatch_dropped_total",
+    "Verworfene Log-Einträge (Warteschlange voll, Versand fehlgeschlagen oder beim Beenden nicht mehr gesendet)",
+    labelnames=("reason",)
+)
+RETRIES_TOTAL = REGISTRY.counter(
+    "log_dispatch_retries_total",
+    "Wiederholte Sendeversuche nach vorübergehenden Fehlern (5xx, Netzwerk, Timeout)"
+)
+
+class LogItem:
+    """
+    Ein Eintrag für den Log-Kanal: ein Embed und optional eine Datei
+    """
+    __slots__ = ("embed", "file_path", "file_name", "enqueued_at")
+    
+    def __init__(self, embed: discord.Embed, file_path: Optional[str] = None, file_name: Optional[str] = None):
+        self.embed = embed
+        self.file_path = file_path
+        self.file_name = file_name
+        self.enqueued_at = time.monotonic()
+
+class LogDispatcher:
+    """
+    Sammelt Log-Embeds pro Log-Kanal in einer Warteschlange und sendet sie gebündelt
+    (bis zu 10 Embeds pro Nachricht), sobald der Stapel voll ist oder flush_interval abgelaufen ist.
+    Ein Token-Bucket pro Kanal hält das Nachrichtenlimit von Discord ein; vorübergehende Fehler
+    werden mit wachsender Pause wiederholt, close() sendet beim Beenden alles noch Wartende.
+    """
+    MAX_EMBEDS = 10
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY = 2.0
+    
+    def __init__(self, bot: discord.Client, flush_interval: float = 2.0, max_queue: int = 1000,
+                 rate_limit: int = 5, rate_period: float = 5.0):
+        self.bot = bot
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.logger = Logger("log_dispatcher")
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        # Kanal -> Zeitpunkte der letzten Sendungen (für das Rate-Limit)
+        self._sent_at: Dict[int, list] = {}
+        self._closing = False
+    
+    def dispatch(self, channel_id: int, embed: discord.Embed, file_path: Optional[str] = None, file_name: Optional[str] = None) -> None:
+        """Reiht einen Log-Eintrag ein, ohne zu warten (nie blockierend für den aufrufenden Handler)"""
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue(maxsize=self.max_queue)
+            self._workers[channel_id] = asyncio.ensure_future(self._worker(channel_id, queue))
+        
+        try:
+            queue.put_nowait(LogItem(embed, file_path, file_name))
+        except asyncio.QueueFull:
+            DROPPED_TOTAL.inc(reason="queue_full")
+            self.logger.warning(f"Log-Warteschlange für Kanal {channel_id} ist voll, Eintrag verworfen")
+            return
+        QUEUE_DEPTH.set(queue.qsize(), channel_id=channel_id)
+    
+    def queue_depth(self, channel_id: int) -> int:
+        """Anzahl wartender Einträge für einen Log-Kanal"""
+        queue = self._queues.get(channel_id)
+        return queue.qsize() if queue else 0
+    
+    async def close(self, timeout: float = 10.0) -> None:
+        """Sendet wartende Einträge ohne Sammelfenster (höchstens timeout Sekunden) und beendet dann alle Worker"""
+        self._closing = True
+        if self._queues:
+            try:
+                await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout)
+            except asyncio.TimeoutError:
+                remaining = sum(queue.qsize() for queue in self._queues.values())
+                DROPPED_TOTAL.inc(remaining, reason="shutdown")
+                self.logger.warning(f"Log-Dispatcher: {remaining} Eintrag/Einträge beim Beenden nicht mehr gesendet")
+        
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+    
+    async def _worker(self, channel_id: int, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            deadline = batch[0].enqueued_at + self.flush_interval
+            
+            # Sammeln bis 10 Embeds, eine Datei (beendet den Stapel) oder Ablauf des Zeitfensters
+            while len(batch) < self.MAX_EMBEDS and batch[-1].file_path is None:
+                if queue.empty():
+                    timeout = deadline - time.monotonic()
+                    # Beim Beenden nicht mehr auf weitere Einträge warten
+                    if timeout <= 0 or self._closing:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(queue.get_nowait())
+            
+            QUEUE_DEPTH.set(queue.qsize(), channel_id=channel_id)
+            try:
+                await self._wait_for_rate_limit(channel_id)
+                await self._send(channel_id, batch)
+            finally:
+                # Gesendet oder endgültig verworfen; close() wartet darauf über queue.join()
+                for _ in batch:
+                    queue.task_done()
+    
+    async def _wait_for_rate_limit(self, channel_id: int) -> None:
+        sent_at = self._sent_at.setdefault(channel_id, [])
+        now = time.monotonic()
+        while sent_at and sent_at[0] <= now - self.rate_period:
+            sent_at.pop(0)
+        if len(sent_at) >= self.rate_limit:
+            await asyncio.sleep(sent_at[0] + self.rate_period - now)
+            sent_at.pop(0)
+        sent_at.append(time.monotonic())
+    
+    async def _send(self, channel_id: int, batch: list) -> None:
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            DROPPED_TOTAL.inc(len(batch), reason="channel_missing")
+            return
+        
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            # Dateien pro Versuch neu öffnen, ein gesendeter discord.File ist verbraucht
+            files = self._open_files(channel_id, batch)
+            try:
+                await channel.send(embeds=[item.embed for item in batch], files=files)
+                break
+            except (discord.DiscordServerError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.MAX_ATTEMPTS:
+                    DROPPED_TOTAL.inc(len(batch), reason="http_error")
+                    self.logger.error(f"Fehler beim Senden an Log-Kanal {channel_id} nach {attempt} Versuchen: {e}")
+                    return
+                RETRIES_TOTAL.inc()
+                self.logger.warning(f"Senden an Log-Kanal {channel_id} fehlgeschlagen (Versuch {attempt}), wiederhole: {e}")
+                await asyncio.sleep(self.RETRY_DELAY * attempt)
+            except discord.HTTPException as e:
+                # z.B. fehlende Berechtigung oder ungültiger Inhalt: ein erneuter Versuch ändert nichts
+                DROPPED_TOTAL.inc(len(batch), reason="http_error")
+                self.logger.error(f"Fehler beim Senden an Log-Kanal {channel_id}: {e}")
+                return
+            finally:
+                for file in files:
+                    file.close()
+        
+        BATCH_SIZE.observe(len(batch))
+        FLUSH_LATENCY.observe(time.monotonic() - batch[0].enqueued_at)
+    
+    def _open_files(self, channel_id: int, batch: list) -> list:
+        files = []
+        for item in batch:
+            if not item.file_path:
+                continue
+            try:
+                files.append(discord.File(item.file_path, filename=item.file_name))
+            except OSError as e:
+                # Die Embeds trotzdem senden, nur ohne die fehlende Datei
+                self.logger.error(f"Datei {item.file_path} für Log-Kanal {channel_id} nicht lesbar: {e}")
+        return files
@@ -0,0 +1,185 @@
+import time
+import heapq
+import asyncio
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Tuple
+
+from utils.config import ConfigManager
+from utils.logger import Logger
+from utils.metrics import REGISTRY
+
+JOBS_TOTAL = REGISTRY.counter(
+    "scheduler_jobs_total",
+    "Ausgeführte geplante Aufgaben nach Art und Ergebnis",
+    labelnames=("kind", "result")
+)
+JOB_DELAY = REGISTRY.histogram(
+    "scheduler_job_delay_seconds",
+    "Verspätung geplanter Aufgaben gegenüber dem geplanten Zeitpunkt",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 3600.0)
+)
+
+JobHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+class Scheduler:
+    """
+    Führt verzögerte Aufgaben (z.B. Kanal löschen) zum geplanten Zeitpunkt aus.
+    Die Aufgaben werden einzeln gespeichert (bei SQLite je eine Zeile) und überstehen so einen Neustart;
+    im Speicher stehen sie in einem Heap, sortiert nach Fälligkeit.
+    """
+    RETRY_DELAY = 30.0
+    MAX_ATTEMPTS = 3
+    
+    def __init__(self, config_manager: ConfigManager, max_concurrency: int = 4, owns_guild: Optional[Callable[[str], bool]] = None):
+        self.config_manager = config_manager
+        # Im Cluster-Modus nur Aufgaben der eigenen Server ausführen
+        self.owns_guild = owns_guild
+        self.logger = Logger("scheduler")
+        self._handlers: Dict[str, JobHandler] = {}
+        # (Fälligkeit, Reihenfolge, guild_id, job_id)
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._sequence = 0
+        self._running: set = set()
+        self._tasks: set = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+    
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Registriert die Coroutine, die Aufgaben dieser Art ausführt: handler(guild_id, payload)"""
+        self._handlers[kind] = handler
+    
+    def schedule(self, guild_id: str, kind: str, delay: float, payload: Optional[Dict[str, Any]] = None, job_id: Optional[str] = None) -> str:
+        """
+        Plant eine Aufgabe in delay Sekunden und speichert sie sofort.
+        Eine bestehende Aufgabe mit gleicher job_id wird dabei neu terminiert.
+        """
+        job_id = job_id or f"{kind}:{time.time_ns()}"
+        job = self._new_job(kind, delay, payload)
+        self.config_manager.set_scheduled_job(guild_id, job_id, job)
+        self._push(job["run_at"], guild_id, job_id)
+        return job_id
+    
+    def schedule_many(self, guild_id: str, kind: str, jobs: List[Tuple[str, float, Dict[str, Any]]]) -> None:
+        """Plant mehrere Aufgaben (job_id, delay, payload) eines Servers und speichert sie mit einem Schreibvorgang"""
+        new_jobs = {job_id: self._new_job(kind, delay, payload) for job_id, delay, payload in jobs}
+        if not new_jobs:
+            return
+        self.config_manager.set_scheduled_jobs(guild_id, new_jobs)
+        for job_id, job in new_jobs.items():
+            self._push(job["run_at"], guild_id, job_id)
+    
+    def cancel(self, guild_id: str, job_id: str) -> None:
+        """Entfernt eine geplante Aufgabe (der Heap-Eintrag verfällt beim Erreichen)"""
+        self.config_manager.remove_scheduled_job(guild_id, job_id)
+    
+    def cancel_many(self, guild_id: str, job_ids: List[str]) -> None:
+        """Entfernt mehrere geplante Aufgaben eines Servers mit einem Schreibvorgang"""
+        self.config_manager.remove_scheduled_jobs(guild_id, job_ids)
+    
+    def _new_job(self, kind: str, delay: float, payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "kind": kind,
+            "run_at": time.time() + delay,
+            "payload": payload or {},
+            "attempts": 0
+        }
+    
+    def start(self) -> None:
+        """Lädt alle gespeicherten Aufgaben in den Heap und startet die Ausführung (mehrfach aufrufbar)"""
+        if self._runner is not None and not self._runner.done():
+            return
+        
+        self._wakeup = asyncio.Event()
+        self._heap = []
+        jobs = self.config_manager.get_scheduled_jobs()
+        if self.owns_guild is not None:
+            jobs = [(guild_id, job_id, job) for guild_id, job_id, job in jobs if self.owns_guild(guild_id)]
+        for guild_id, job_id, job in jobs:
+            self._push(job["run_at"], guild_id, job_id)
+        self._runner = asyncio.ensure_future(self._run())
+        self.logger.info(f"Scheduler gestartet, {len(jobs)} Aufgabe(n) geplant")
+    
+    async def close(self) -> None:
+        """Beendet die Ausführung; gespeicherte Aufgaben bleiben für den nächsten Start erhalten"""
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def _push(self, run_at: float, guild_id: str, job_id: str) -> None:
+        self._sequence += 1
+        heapq.heappush(self._heap, (run_at, self._sequence, guild_id, job_id))
+        # Den Runner nur wecken, wenn die neue Aufgabe die nächste fällige ist
+        if self._wakeup is not None and self._heap[0][1] == self._sequence:
+            self._wakeup.set()
+    
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            run_at, _, guild_id, job_id = heapq.heappop(self._heap)
+            job = self.config_manager.get_scheduled_job(guild_id, job_id)
+            # Abgebrochen, neu terminiert oder bereits in Ausführung
+            if job is None or job["run_at"] != run_at or (guild_id, job_id) in self._running:
+                continue
+            
+            await self._semaphore.acquire()
+            self._running.add((guild_id, job_id))
+            task = asyncio.ensure_future(self._execute(guild_id, job_id, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _execute(self, guild_id: str, job_id: str, job: Dict[str, Any]) -> None:
+        kind = job["kind"]
+        try:
+            JOB_DELAY.observe(max(time.time() - job["run_at"], 0.0))
+            handler = self._handlers.get(kind)
+            if handler is None:
+                self.logger.error(f"Keine Funktion für geplante Aufgabe {job_id} ({kind}) registriert")
+                JOBS_TOTAL.inc(kind=kind, result="unknown")
+                self._finish(guild_id, job_id, job)
+                return
+            
+            try:
+                await handler(guild_id, job["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                attempts = job.get("attempts", 0) + 1
+                if attempts >= self.MAX_ATTEMPTS:
+                    self.logger.error(f"Geplante Aufgabe {job_id} nach {attempts} Versuchen verworfen: {e}")
+                    JOBS_TOTAL.inc(kind=kind, result="failed")
+                    self._finish(guild_id, job_id, job)
+                else:
+                    self.logger.warning(f"Geplante Aufgabe {job_id} fehlgeschlagen (Versuch {attempts}): {e}")
+                    JOBS_TOTAL.inc(kind=kind, result="retry")
+                    retry = dict(job, run_at=time.time() + self.RETRY_DELAY * attempts, attempts=attempts)
+                    self.config_manager.set_scheduled_job(guild_id, job_id, retry)
+                    self._push(retry["run_at"], guild_id, job_id)
+                return
+            
+            JOBS_TOTAL.inc(kind=kind, result="success")
+            self._finish(guild_id, job_id, job)
+        finally:
+            self._running.discard((guild_id, job_id))
+            self._semaphore.release()
+    
+    def _finish(self, guild_id: str, job_id: str, job: Dict[str, Any]) -> None:
+        # Nur entfernen, wenn die Aufgabe während der Ausführung nicht neu terminiert wurde
+        current = self.config_manager.get_scheduled_job(guild_id, job_id)
+        if current is not None and current["run_at"] == job["run_at"]:
+            self.config_manager.remove_scheduled_job(guild_id, job_id)
@@ -0,0 +1,93 @@
+import asyncio
+import discord
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.cache import TTLCache
+
+class UsernameResolver:
+    """
+    Löst Benutzer-IDs in Benutzernamen auf: zuerst aus dem Cache bzw. dem Member-Cache des Bots,
+    fehlende Benutzer per fetch_user mit begrenzter Parallelität
+    """
+    def __init__(self, bot: discord.Client, max_concurrency: int = 4, max_fetch_per_call: int = 50, ttl: float = 3600.0, maxsize: int = 50000):
+        self.bot = bot
+        self.max_concurrency = max_concurrency
+        self.max_fetch_per_call = max_fetch_per_call
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    def cached_names(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """Liest nur den eigenen (thread-sicheren) Cache; darf auch außerhalb des Bot-Loops aufgerufen werden"""
+        names = {}
+        for user_id in user_ids:
+            name = self.cache.get(user_id)
+            if name is not None:
+                names[user_id] = name
+        return names
+    
+    def resolve_cached(self, guild_id: int, user_ids: Iterable[str]) -> Dict[str, str]:
+        """Löst nur Benutzer auf, die ohne REST-Aufruf bekannt sind (nur auf dem Bot-Loop aufrufen)"""
+        guild = self.bot.get_guild(guild_id)
+        names = {}
+        for user_id in user_ids:
+            name = self.cache.get(user_id)
+            if name is None and user_id.isdigit():
+                user = (guild.get_member(int(user_id)) if guild else None) or self.bot.get_user(int(user_id))
+                if user:
+                    name = user.name
+                    self.cache.set(user_id, name)
+            if name is not None:
+                names[user_id] = name
+        return names
+    
+    async def resolve(self, guild_id: int, user_ids: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        """
+        Löst Benutzer auf; unbekannte werden von Discord geholt, höchstens max_fetch_per_call pro Aufruf.
+        Gibt die Namen und die zurückgestellten IDs zurück, die der Aufrufer in einem weiteren Aufruf anfragen kann.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        names = self.resolve_cached(guild_id, user_ids)
+        
+        misses = [user_id for user_id in user_ids if user_id not in names and user_id.isdigit()]
+        deferred = misses[self.max_fetch_per_call:]
+        misses = misses[:self.max_fetch_per_call]
+        if misses:
+            fetched = await asyncio.gather(*(self._fetch(user_id) for user_id in misses))
+            for user_id, name in zip(misses, fetched):
+                if name is not None:
+                    names[user_id] = name
+        
+        return names, deferred
+    
+    async def _fetch(self, user_id: str) -> Optional[str]:
+        # Gleichzeitige Anfragen für denselben Benutzer teilen sich einen REST-Aufruf
+        inflight = self._inflight.get(user_id)
+        if inflight is not None:
+            return await inflight
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            async with self._semaphore:
+                try:
+                    user = await self.bot.fetch_user(int(user_id))
+                    name = user.name
+                except discord.NotFound:
+                    name = None
+                except discord.HTTPException:
+                    name = None
+            
+            if name is not None:
+                self.cache.set(user_id, name)
+            future.set_result(name)
+            return name
+        except BaseException:
+            # Wartende Aufrufer erhalten "unbekannt" statt des Fehlers
+            future.set_result(None)
+            raise
+        finally:
+            del self._inflight[user_id]
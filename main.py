@@ -1,5 +1,5 @@
 import os
-import threading
+import signal
 import asyncio
 from dotenv import load_dotenv
 
@@ -8,34 +8,69 @@ load_dotenv()
 
 # Importiere Bot und Web-App erst nach dem Laden der Umgebungsvariablen
 from bot.bot import TicketBot
+from bot.cluster import Cluster, ClusterProxy
 from web.app import create_app
+from web.server import WebServer, create_web_server
 
-def run_flask(app):
-    """Startet den Flask-Server in einem separaten Thread"""
-    host = os.getenv("FLASK_HOST", "localhost")
-    port = int(os.getenv("FLASK_PORT", 5000))
-    debug = os.getenv("FLASK_DEBUG", "False").lower() == "true"
-    
-    # Im Debug-Modus verwenden wir nicht den Threaded-Modus von Flask
-    if debug:
-        app.run(host=host, port=port, debug=debug)
-    else:
-        app.run(host=host, port=port)
+def start_web(app) -> WebServer:
+    """Startet das Web-Interface (waitress bzw. Entwicklungsserver) in einem Hintergrund-Thread"""
+    web_server = create_web_server(app)
+    web_server.start()
+    return web_server
+
+def stop_on_sigterm(signum, frame):
+    """Signal-Handler: beendet den Launcher wie mit Strg+C"""
+    raise KeyboardInterrupt
+
+def run_cluster(workers: int):
+    """Startet mehrere Worker-Prozesse mit je einem Bereich von Shards; das Web-Interface läuft im Launcher"""
+    shard_count = int(os.getenv("BOT_SHARD_COUNT") or 0) or None
+    cluster = Cluster(workers, shard_count)
+    cluster.start()
+    
+    # Das Web-Interface leitet Server-Aktionen an den zuständigen Worker weiter
+    app = create_app(ClusterProxy(cluster))
+    
+    web_server = start_web(app)
+    drain_timeout = float(os.getenv("WEB_DRAIN_TIMEOUT", 10))
+    
+    # SIGTERM (docker/systemd) wie Strg+C behandeln
+    signal.signal(signal.SIGTERM, stop_on_sigterm)
+    
+    # Laufende Web-Anfragen abschließen, bevor die Worker beendet werden, die sie beantworten
+    try:
+        cluster.join(before_stop=lambda: web_server.stop(drain_timeout))
+    finally:
+        web_server.stop(drain_timeout)
 
 def main():
-    # Erstelle Bot-Instanz
-    bot = TicketBot()
+    # Cluster-Modus: mehrere Prozesse mit gemeinsamer SQLite-Datenbank
+    workers = int(os.getenv("BOT_CLUSTER_WORKERS", 1))
+    if workers > 1:
+        run_cluster(workers)
+        return
+    
+    # Erstelle Bot-Instanz (optional mit automatischem Sharding in einem Prozess)
+    bot = TicketBot(sharded=os.getenv("BOT_SHARDING", "False").lower() == "true")
     
     # Erstelle Flask-App
     app = create_app(bot)
     
-    # Starte Flask in separatem Thread
-    flask_thread = threading.Thread(target=run_flask, args=(app,))
-    flask_thread.daemon = True  # Thread wird beendet, wenn Hauptprogramm endet
-    flask_thread.start()
+    # Starte das Web-Interface in separatem Thread
+    web_server = start_web(app)
+    drain_timeout = float(os.getenv("WEB_DRAIN_TIMEOUT", 10))
+    
+    # Laufende Web-Anfragen beim Beenden (Strg+C oder SIGTERM) abschließen, solange der Bot-Loop sie noch beantwortet
+    bot.add_shutdown_hook(lambda: web_server.stop(drain_timeout))
     
     # Starte den Bot (blockiert bis zum Ende)
-    bot.run()
+    try:
+        bot.run()
+    finally:
+        # Falls der Bot nie richtig gestartet ist (z.B. Login fehlgeschlagen)
+        web_server.stop(drain_timeout)
+        # Schreibe gesammelte Konfigurationsänderungen vor dem Beenden
+        bot.config_manager.flush()
 
 if __name__ == "__main__":
     main()
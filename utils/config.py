@@ -1,98 +1,462 @@
 import os
-import json
-from typing import Dict, Any, Optional
+import bisect
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+
+from utils.storage import create_storage, migrate_json_to_sqlite, SqliteStorage
+from utils.metrics import REGISTRY
+from utils.pubsub import PubSub
+from utils.snapshot import FrozenDict, freeze
+
+OPEN_TICKETS = REGISTRY.gauge(
+    "tickets_open",
+    "Offene Tickets pro Server",
+    labelnames=("guild_id",)
+)
 
 class ConfigManager:
     """
     Verwaltet die Konfiguration des Bots und der Server
     """
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", backend: Optional[str] = None):
         self.data_dir = data_dir
         self.config_file = os.path.join(data_dir, "config.json")
+        
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        
+        # Sperre für Änderungen, damit Hintergrund-Flushes konsistente Snapshots schreiben
+        self.lock = threading.RLock()
+        
+        # Speicher-Backend: "json" (eine Datei) oder "sqlite" (Tabellen mit Indizes)
+        self.storage = create_storage(backend or os.getenv("CONFIG_BACKEND", "json"), data_dir, lock=self.lock)
         self.config = self.load_config()
+        
+        # Sekundäre Indizes pro Server: user_id -> offenes Ticket, channel_id -> Ticket
+        self._open_tickets_by_user: Dict[str, Dict[str, str]] = {}
+        self._tickets_by_channel: Dict[str, Dict[str, str]] = {}
+        # Sortierte Ticket-IDs pro Server für Abfragen mit Paginierung: alle, nach Status, Benutzer und Kategorie
+        self._ticket_ids: Dict[str, List[int]] = {}
+        self._ticket_ids_by_status: Dict[str, Dict[str, List[int]]] = {}
+        self._ticket_ids_by_user: Dict[str, Dict[str, List[int]]] = {}
+        self._ticket_ids_by_category: Dict[str, Dict[str, List[int]]] = {}
+        self.rebuild_indexes()
+        
+        # Reservierte, aber noch nicht gespeicherte Tickets pro Server: user_id -> ticket_id
+        self._reserved_tickets: Dict[str, Dict[str, str]] = {}
+        
+        # Neue und geänderte Tickets pro Server (Thema = guild_id) für die Live-Ansicht im Web-Interface
+        self.ticket_events = PubSub()
+        
+        # Unveränderliche Einstellungen pro Server (ohne Tickets); Leser brauchen keine Sperre,
+        # Schreiber ersetzen den Snapshot nach jeder Änderung als Ganzes (Copy-on-Write)
+        self._settings: Dict[str, FrozenDict] = {}
     
     def load_config(self) -> Dict[str, Any]:
-        """Lädt die Konfiguration aus der Datei oder erstellt eine neue"""
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
+        """Lädt die Konfiguration aus dem Speicher oder erstellt eine neue"""
+        config = self.storage.load()
         
-        if os.path.exists(self.config_file):
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            default_config = {
-                "guilds": {}
+        # Einmalige Migration einer bestehenden config.json in die leere Datenbank
+        if config is None and isinstance(self.storage, SqliteStorage) and os.path.exists(self.config_file):
+            migrate_json_to_sqlite(self.config_file, self.storage)
+            config = self.storage.load()
+        
+        if config is None:
+            config = {
+                "guilds": {},
+                "meta": {}
             }
-            self.save_config(default_config)
-            return default_config
+            # Eine leere Datenbank braucht keinen Anfangszustand; ein vollständiges Neuschreiben
+            # würde Zeilen löschen, die ein anderer Worker inzwischen geschrieben hat
+            if not isinstance(self.storage, SqliteStorage):
+                self.save_config(config)
+        
+        # Ältere Konfigurationen ohne Metadaten
+        config.setdefault("meta", {})
+        return config
     
     def save_config(self, config: Optional[Dict[str, Any]] = None) -> None:
-        """Speichert die Konfiguration in der Datei"""
+        """Speichert die komplette Konfiguration"""
         if config is None:
             config = self.config
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4)
+        self.storage.save(config)
+    
+    def save_guild(self, guild_id: str) -> None:
+        """Speichert die Einstellungen eines Servers"""
+        self.storage.save_guild(self.config, guild_id)
+    
+    def save_ticket(self, guild_id: str, ticket_id: str) -> None:
+        """Speichert ein einzelnes Ticket"""
+        self.storage.save_ticket(self.config, guild_id, ticket_id)
+    
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """Gibt einen bot-weiten Metadaten-Eintrag zurück (z.B. Hash der Slash-Commands)"""
+        with self.lock:
+            return self.config["meta"].get(key, default)
+    
+    def set_meta(self, key: str, value: Any) -> None:
+        """Setzt und speichert einen bot-weiten Metadaten-Eintrag"""
+        with self.lock:
+            self.config["meta"][key] = value
+            self.storage.save_meta(self.config, key)
+    
+    def flush(self) -> None:
+        """Schreibt ausstehende (gesammelte) Änderungen sofort"""
+        self.storage.flush()
+    
+    def close(self) -> None:
+        """Schreibt ausstehende Änderungen und schließt das Speicher-Backend"""
+        self.storage.close()
+    
+    def rebuild_indexes(self) -> None:
+        """Baut die Ticket-Indizes aus der geladenen Konfiguration neu auf"""
+        with self.lock:
+            self._open_tickets_by_user = {}
+            self._tickets_by_channel = {}
+            self._ticket_ids = {}
+            self._ticket_ids_by_status = {}
+            self._ticket_ids_by_user = {}
+            self._ticket_ids_by_category = {}
+            for guild_id, guild_config in self.config["guilds"].items():
+                for ticket_id, ticket in guild_config.get("tickets", {}).items():
+                    self._index_ticket(guild_id, ticket_id, ticket)
+    
+    def _index_ticket(self, guild_id: str, ticket_id: str, ticket: Dict[str, Any], previous_status: Optional[str] = None) -> None:
+        by_user = self._open_tickets_by_user.setdefault(guild_id, {})
+        self._tickets_by_channel.setdefault(guild_id, {})[ticket["channel_id"]] = ticket_id
+        
+        if ticket["status"] == "open":
+            by_user[ticket["user_id"]] = ticket_id
+        elif by_user.get(ticket["user_id"]) == ticket_id:
+            del by_user[ticket["user_id"]]
+        # Ein offenes Ticket pro Benutzer, daher entspricht die Größe des Index der Anzahl offener Tickets
+        OPEN_TICKETS.set(len(by_user), guild_id=guild_id)
+        
+        if not ticket_id.isdigit():
+            return
+        number = int(ticket_id)
+        by_status = self._ticket_ids_by_status.setdefault(guild_id, {})
+        
+        if previous_status is None:
+            # Neues Ticket; IDs steigen monoton, daher meist ein Anhängen am Ende
+            bisect.insort(self._ticket_ids.setdefault(guild_id, []), number)
+            bisect.insort(self._ticket_ids_by_user.setdefault(guild_id, {}).setdefault(ticket["user_id"], []), number)
+            bisect.insort(by_status.setdefault(ticket["status"], []), number)
+            bisect.insort(self._ticket_ids_by_category.setdefault(guild_id, {}).setdefault(ticket.get("category"), []), number)
+        elif previous_status != ticket["status"]:
+            ids = by_status.get(previous_status, [])
+            index = bisect.bisect_left(ids, number)
+            if index < len(ids) and ids[index] == number:
+                del ids[index]
+            bisect.insort(by_status.setdefault(ticket["status"], []), number)
+    
+    def query_tickets(
+        self,
+        guild_id: str,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        user_id: Optional[str] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        descending: bool = True,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Gibt eine Seite gefilterter Tickets (nach ID sortiert) und den Cursor für die nächste Seite zurück.
+        Die Auswahl startet beim kleinsten passenden Index (Benutzer, Status, Kategorie oder alle Tickets);
+        der Zeitraum wird per binärer Suche über die fortlaufenden IDs eingegrenzt.
+        """
+        def matches(ticket: Dict[str, Any]) -> bool:
+            if status is not None and ticket["status"] != status:
+                return False
+            if category is not None and ticket.get("category") != category:
+                return False
+            if user_id is not None and ticket["user_id"] != user_id:
+                return False
+            created_at = ticket.get("created_at") or ""
+            if created_from and created_at < created_from:
+                return False
+            return not (created_to and created_at[:len(created_to)] > created_to)
+        
+        with self.lock:
+            tickets = self.config["guilds"].get(guild_id, {}).get("tickets", {})
+            indexes = []
+            if user_id is not None:
+                indexes.append(self._ticket_ids_by_user.get(guild_id, {}).get(user_id, []))
+            if status is not None:
+                indexes.append(self._ticket_ids_by_status.get(guild_id, {}).get(status, []))
+            if category is not None:
+                indexes.append(self._ticket_ids_by_category.get(guild_id, {}).get(category, []))
+            ids = min(indexes, key=len) if indexes else self._ticket_ids.get(guild_id, [])
+            
+            # Zeitraum: Tickets werden in ID-Reihenfolge erstellt, created_at steigt also mit der ID
+            lo, hi = 0, len(ids)
+            if created_from or created_to:
+                all_ids = self._ticket_ids.get(guild_id, [])
+                
+                def created(number: int) -> str:
+                    return (tickets.get(str(number)) or {}).get("created_at") or ""
+                
+                first = _first_index(all_ids, lambda number: created(number) >= created_from) if created_from else 0
+                end = _first_index(all_ids, lambda number: created(number)[:len(created_to)] > created_to) if created_to else len(all_ids)
+                if first >= end:
+                    return [], None
+                lo = bisect.bisect_left(ids, all_ids[first])
+                hi = bisect.bisect_right(ids, all_ids[end - 1])
+            
+            # Nur Einträge hinter dem Cursor (die zuletzt gelieferte ID)
+            if cursor and descending:
+                hi = min(hi, bisect.bisect_left(ids, int(cursor)))
+            elif cursor:
+                lo = max(lo, bisect.bisect_right(ids, int(cursor)))
+            
+            # Ein Filter: der Index passt bereits, die Seite kostet nur O(limit)
+            if len(indexes) <= 1:
+                return _ticket_page(tickets, ids, lo, hi, descending, limit, matches)
+            # Mehrere Filter: Kandidaten kopieren und ohne Sperre prüfen, damit der Bot-Loop nicht wartet
+            window = ids[lo:hi]
+        
+        return _ticket_page(tickets, window, 0, len(window), descending, limit, matches)
+    
+    def get_open_ticket_id(self, guild_id: str, user_id: str) -> Optional[str]:
+        """Gibt die ID des offenen Tickets eines Benutzers zurück (O(1))"""
+        return self._open_tickets_by_user.get(guild_id, {}).get(user_id)
+    
+    def get_ticket_id_by_channel(self, guild_id: str, channel_id: str) -> Optional[str]:
+        """Gibt die ID des Tickets zu einem Kanal zurück (O(1))"""
+        return self._tickets_by_channel.get(guild_id, {}).get(channel_id)
+    
+    def reserve_ticket(self, guild_id: str, user_id: str) -> Optional[str]:
+        """
+        Reserviert atomar die nächste Ticket-ID eines Servers für einen Benutzer (nur im Speicher;
+        der Zähler wird mit dem Ticket in add_ticket gespeichert). Gibt None zurück, wenn der Benutzer
+        bereits ein offenes oder reserviertes Ticket hat.
+        """
+        with self.lock:
+            guild_config = self.get_guild_config(guild_id)
+            reserved = self._reserved_tickets.setdefault(guild_id, {})
+            if user_id in reserved or self.get_open_ticket_id(guild_id, user_id):
+                return None
+            
+            # Fortlaufender Zähler; bei bestehenden Servern einmalig aus den vorhandenen IDs ermittelt
+            if "next_ticket_id" not in guild_config:
+                guild_config["next_ticket_id"] = max(
+                    (int(t_id) for t_id in guild_config["tickets"] if t_id.isdigit()),
+                    default=0
+                ) + 1
+            
+            ticket_id = str(guild_config["next_ticket_id"])
+            guild_config["next_ticket_id"] += 1
+            reserved[user_id] = ticket_id
+            return ticket_id
+    
+    def release_ticket_reservation(self, guild_id: str, user_id: str) -> None:
+        """Gibt eine Reservierung frei, z.B. wenn das Erstellen des Kanals fehlgeschlagen ist"""
+        with self.lock:
+            self._reserved_tickets.get(guild_id, {}).pop(user_id, None)
     
     def get_guild_config(self, guild_id: str) -> Dict[str, Any]:
         """Gibt die Konfiguration für einen Server zurück oder erstellt eine neue"""
-        if guild_id not in self.config["guilds"]:
-            self.config["guilds"][guild_id] = {
-                "ticket_categories": [
-                    {
-                        "name": "Support",
-                        "description": "Hilfe vom Support-Team erhalten",
-                        "color": 3447003,
-                        "role_ids": []
-                    }
-                ],
-                "admin_role_ids": [],
-                "ticket_channel_id": None,
-                "ticket_log_channel_id": None,
-                "tickets": {}
-            }
-            self.save_config()
-        
-        return self.config["guilds"][guild_id]
+        with self.lock:
+            if guild_id not in self.config["guilds"]:
+                self.config["guilds"][guild_id] = {
+                    "ticket_categories": [
+                        {
+                            "name": "Support",
+                            "description": "Hilfe vom Support-Team erhalten",
+                            "color": 3447003,
+                            "role_ids": []
+                        }
+                    ],
+                    "admin_role_ids": [],
+                    "ticket_channel_id": None,
+                    "ticket_log_channel_id": None,
+                    "tickets": {}
+                }
+                self.save_guild(guild_id)
+                self._refresh_settings(guild_id)
+            
+            return self.config["guilds"][guild_id]
+    
+    def get_guild_settings(self, guild_id: str) -> FrozenDict:
+        """Gibt einen unveränderlichen Snapshot der Einstellungen eines Servers zurück (ohne Sperre)"""
+        settings = self._settings.get(guild_id)
+        if settings is None:
+            with self.lock:
+                self.get_guild_config(guild_id)
+                settings = self._settings.get(guild_id) or self._refresh_settings(guild_id)
+        return settings
+    
+    def _refresh_settings(self, guild_id: str) -> FrozenDict:
+        """Ersetzt den Snapshot eines Servers nach einer Änderung (nur unter der Sperre aufrufen)"""
+        guild_config = self.config["guilds"][guild_id]
+        settings = freeze({key: value for key, value in guild_config.items() if key not in ("tickets", "scheduled_jobs")})
+        self._settings[guild_id] = settings
+        return settings
     
     def update_guild_categories(self, guild_id: str, categories: list) -> None:
         """Aktualisiert die Ticket-Kategorien eines Servers"""
-        self.config["guilds"][guild_id]["ticket_categories"] = categories
-        self.save_config()
+        with self.lock:
+            self.config["guilds"][guild_id]["ticket_categories"] = categories
+            self.save_guild(guild_id)
+            self._refresh_settings(guild_id)
     
     def update_guild_admin_roles(self, guild_id: str, role_ids: list) -> None:
         """Aktualisiert die Admin-Rollen eines Servers"""
-        self.config["guilds"][guild_id]["admin_role_ids"] = role_ids
-        self.save_config()
+        with self.lock:
+            self.config["guilds"][guild_id]["admin_role_ids"] = role_ids
+            self.save_guild(guild_id)
+            self._refresh_settings(guild_id)
     
     def update_ticket_status(self, guild_id: str, ticket_id: str, status: str, closed_at: str = None) -> None:
         """Aktualisiert den Status eines Tickets"""
-        self.config["guilds"][guild_id]["tickets"][ticket_id]["status"] = status
-        if closed_at:
-            self.config["guilds"][guild_id]["tickets"][ticket_id]["closed_at"] = closed_at
-        self.save_config()
+        with self.lock:
+            previous_status = self.config["guilds"][guild_id]["tickets"][ticket_id]["status"]
+            self.config["guilds"][guild_id]["tickets"][ticket_id]["status"] = status
+            if closed_at:
+                self.config["guilds"][guild_id]["tickets"][ticket_id]["closed_at"] = closed_at
+            self._index_ticket(guild_id, ticket_id, self.config["guilds"][guild_id]["tickets"][ticket_id], previous_status)
+            self.save_ticket(guild_id, ticket_id)
+            self._publish_ticket(guild_id, ticket_id)
     
     def add_ticket(self, guild_id: str, ticket_id: str, user_id: str, channel_id: str, category: str) -> None:
         """Fügt ein neues Ticket hinzu"""
-        self.config["guilds"][guild_id]["tickets"][ticket_id] = {
-            "user_id": user_id,
-            "channel_id": channel_id,
-            "category": category,
-            "status": "open",
-            "created_at": datetime.datetime.now().isoformat(),
-            "closed_at": None
-        }
-        self.save_config()
+        with self.lock:
+            self.config["guilds"][guild_id]["tickets"][ticket_id] = {
+                "user_id": user_id,
+                "channel_id": channel_id,
+                "category": category,
+                "status": "open",
+                "created_at": datetime.datetime.now().isoformat(),
+                "closed_at": None
+            }
+            self._index_ticket(guild_id, ticket_id, self.config["guilds"][guild_id]["tickets"][ticket_id])
+            self._reserved_tickets.get(guild_id, {}).pop(user_id, None)
+            # Ticket und Ticket-Zähler in einem Schreibvorgang
+            self.storage.save_new_ticket(self.config, guild_id, ticket_id)
+            self._publish_ticket(guild_id, ticket_id)
+    
+    def _publish_ticket(self, guild_id: str, ticket_id: str) -> None:
+        """Meldet den aktuellen Stand eines Tickets an die Abonnenten des Servers"""
+        ticket = self.config["guilds"][guild_id]["tickets"][ticket_id]
+        self.ticket_events.publish(guild_id, {
+            "id": ticket_id,
+            "category": ticket.get("category"),
+            "user_id": ticket.get("user_id"),
+            "status": ticket.get("status"),
+            "created_at": ticket.get("created_at"),
+            "closed_at": ticket.get("closed_at")
+        })
     
     def set_log_channel(self, guild_id: str, channel_id: str) -> None:
         """Setzt den Log-Kanal für einen Server"""
-        self.config["guilds"][guild_id]["ticket_log_channel_id"] = channel_id
-        self.save_config()
+        with self.lock:
+            self.config["guilds"][guild_id]["ticket_log_channel_id"] = channel_id
+            self.save_guild(guild_id)
+            self._refresh_settings(guild_id)
+    
+    def set_idle_close_hours(self, guild_id: str, hours: int) -> None:
+        """Setzt, nach wie vielen Stunden ohne Nachricht ein Ticket automatisch geschlossen wird (0 = nie)"""
+        with self.lock:
+            self.get_guild_config(guild_id)["idle_close_hours"] = hours
+            self.save_guild(guild_id)
+            self._refresh_settings(guild_id)
+    
+    def get_open_ticket_ids(self, guild_id: str) -> List[str]:
+        """Gibt die IDs aller offenen Tickets eines Servers zurück (aus dem Status-Index)"""
+        with self.lock:
+            return [str(number) for number in self._ticket_ids_by_status.get(guild_id, {}).get("open", [])]
+    
+    def set_ticket_category_ids(self, guild_id: str, category_ids: List[str]) -> None:
+        """Setzt die Discord-Kategorien, in denen Ticket-Kanäle angelegt werden (in Füllreihenfolge)"""
+        with self.lock:
+            self.config["guilds"][guild_id]["ticket_category_ids"] = category_ids
+            self.save_guild(guild_id)
+            self._refresh_settings(guild_id)
+    
+    def get_scheduled_jobs(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Gibt alle gespeicherten geplanten Aufgaben als (guild_id, job_id, job) zurück"""
+        with self.lock:
+            return [
+                (guild_id, job_id, dict(job))
+                for guild_id, guild_config in self.config["guilds"].items()
+                for job_id, job in guild_config.get("scheduled_jobs", {}).items()
+            ]
+    
+    def get_scheduled_job(self, guild_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+        """Gibt eine geplante Aufgabe zurück oder None, wenn sie nicht (mehr) existiert"""
+        with self.lock:
+            return self.config["guilds"].get(guild_id, {}).get("scheduled_jobs", {}).get(job_id)
+    
+    def set_scheduled_job(self, guild_id: str, job_id: str, job: Dict[str, Any]) -> None:
+        """Speichert eine geplante Aufgabe (neu oder neu terminiert)"""
+        with self.lock:
+            self.get_guild_config(guild_id).setdefault("scheduled_jobs", {})[job_id] = job
+            self.storage.save_job(self.config, guild_id, job_id)
+    
+    def set_scheduled_jobs(self, guild_id: str, jobs: Dict[str, Dict[str, Any]]) -> None:
+        """Speichert mehrere geplante Aufgaben eines Servers mit einem Schreibvorgang"""
+        with self.lock:
+            self.get_guild_config(guild_id).setdefault("scheduled_jobs", {}).update(jobs)
+            self.storage.save_jobs(self.config, guild_id, list(jobs))
+    
+    def remove_scheduled_jobs(self, guild_id: str, job_ids: List[str]) -> None:
+        """Entfernt mehrere geplante Aufgaben eines Servers mit einem Schreibvorgang"""
+        with self.lock:
+            jobs = self.config["guilds"].get(guild_id, {}).get("scheduled_jobs", {})
+            removed = [job_id for job_id in job_ids if jobs.pop(job_id, None) is not None]
+            if removed:
+                self.storage.save_jobs(self.config, guild_id, removed)
+    
+    def remove_scheduled_job(self, guild_id: str, job_id: str) -> None:
+        """Entfernt eine geplante Aufgabe"""
+        with self.lock:
+            jobs = self.config["guilds"].get(guild_id, {}).get("scheduled_jobs", {})
+            if jobs.pop(job_id, None) is not None:
+                self.storage.save_job(self.config, guild_id, job_id)
     
     def set_ticket_channel(self, guild_id: str, channel_id: str) -> None:
         """Setzt den Kanal für das Ticket-Panel"""
-        self.config["guilds"][guild_id]["ticket_channel_id"] = channel_id
-        self.save_config()
+        with self.lock:
+            self.config["guilds"][guild_id]["ticket_channel_id"] = channel_id
+            self.save_guild(guild_id)
+            self._refresh_settings(guild_id)
+
+def _first_index(ids: List[int], predicate) -> int:
+    """Binäre Suche: erste Position, ab der predicate(id) wahr ist (predicate muss monoton sein)"""
+    lo, hi = 0, len(ids)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(ids[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def _ticket_page(
+    tickets: Dict[str, Dict[str, Any]],
+    ids: List[int],
+    lo: int,
+    hi: int,
+    descending: bool,
+    limit: int,
+    matches
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Sammelt bis zu limit passende Tickets aus ids[lo:hi] und gibt sie mit dem nächsten Cursor zurück"""
+    index, step = (hi - 1, -1) if descending else (lo, 1)
+    page = []
+    while lo <= index < hi and len(page) < limit:
+        ticket_id = str(ids[index])
+        index += step
+        ticket = tickets.get(ticket_id)
+        if ticket is not None and matches(ticket):
+            page.append(dict(ticket, id=ticket_id))
+    
+    has_more = lo <= index < hi
+    next_cursor = page[-1]["id"] if page and has_more else None
+    return page, next_cursor
 
 # Datetime-Import für add_ticket
 import datetime
@@ -1,6 +1,124 @@
 import logging
+import logging.handlers
 import os
+import json
+import queue
+import atexit
+import threading
 from datetime import datetime
+from typing import Dict, Optional
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatiert Log-Einträge als eine JSON-Zeile pro Eintrag
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+class _RoutingHandler(logging.Handler):
+    """
+    Verteilt Einträge im Hintergrund-Thread auf die Log-Datei des jeweiligen Loggers
+    """
+    def __init__(self):
+        super().__init__()
+        self.handlers: Dict[str, logging.Handler] = {}
+    
+    def emit(self, record: logging.LogRecord):
+        handler = self.handlers.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+
+class _LogPipeline:
+    """
+    Gemeinsame Handler aller Logger eines Prozesses: eine Datei pro Logger-Name, eine Konsole
+    und im Queue-Modus ein Hintergrund-Thread, der die eigentlichen Schreibzugriffe übernimmt
+    """
+    def __init__(self):
+        self.mode = os.getenv("LOG_MODE", "queue")
+        self.rotation = os.getenv("LOG_ROTATION", "daily")
+        self.max_bytes = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+        self.backup_count = int(os.getenv("LOG_BACKUP_COUNT", 14))
+        self.json_format = os.getenv("LOG_FORMAT", "text") == "json"
+        # Im Cluster-Modus schreibt jeder Prozess in eigene Dateien (Rotation ist nicht prozessübergreifend sicher)
+        self.process_name = os.getenv("LOG_PROCESS_NAME")
+        
+        self.text_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        self.console_handler = logging.StreamHandler()
+        self.console_handler.setLevel(logging.INFO)
+        self.console_handler.setFormatter(self.text_formatter)
+        
+        self._lock = threading.Lock()
+        self._configured: Dict[str, logging.Logger] = {}
+        self._router: Optional[_RoutingHandler] = None
+        self._queue_handler: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        
+        if self.mode == "queue":
+            log_queue = queue.SimpleQueue()
+            self._router = _RoutingHandler()
+            self._queue_handler = logging.handlers.QueueHandler(log_queue)
+            self._listener = logging.handlers.QueueListener(log_queue, self._router, self.console_handler, respect_handler_level=True)
+            self._listener.start()
+            # Beim Beenden ausstehende Einträge noch schreiben
+            atexit.register(self._listener.stop)
+    
+    def configure(self, name: str, log_dir: str) -> logging.Logger:
+        """Richtet den Logger einmalig ein; weitere Aufrufe mit gleichem Namen fügen keine Handler hinzu"""
+        with self._lock:
+            logger = self._configured.get(name)
+            if logger is not None:
+                return logger
+            
+            logger = logging.getLogger(name)
+            logger.setLevel(logging.INFO)
+            file_handler = self._file_handler(name, log_dir)
+            
+            if self._router is not None:
+                # Aufrufer zahlen nur das Einreihen in die Queue
+                self._router.handlers[name] = file_handler
+                logger.addHandler(self._queue_handler)
+            else:
+                logger.addHandler(file_handler)
+                logger.addHandler(self.console_handler)
+            
+            self._configured[name] = logger
+            return logger
+    
+    def _file_handler(self, name: str, log_dir: str) -> logging.Handler:
+        suffix = f".{self.process_name}" if self.process_name else ""
+        
+        log_file = os.path.join(log_dir, f"{name}{suffix}.log")
+        if self.rotation == "size":
+            handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8', delay=True
+            )
+        else:
+            # Tägliche Rotation um Mitternacht, alte Dateien erhalten das Datum als Endung
+            handler = logging.handlers.TimedRotatingFileHandler(
+                log_file, when="midnight", backupCount=self.backup_count, encoding='utf-8', delay=True
+            )
+        
+        handler.setLevel(logging.INFO)
+        handler.setFormatter(JsonFormatter() if self.json_format else self.text_formatter)
+        return handler
+
+_pipeline: Optional[_LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+def _get_pipeline() -> _LogPipeline:
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = _LogPipeline()
+        return _pipeline
 
 class Logger:
     """
@@ -12,31 +130,10 @@ class Logger:
         
         # Erstelle Log-Verzeichnis, falls es nicht existiert
         if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        # Erstelle Logger
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.INFO)
-        
-        # Dateiname mit Datum
-        log_file = os.path.join(log_dir, f"{name}_{datetime.now().strftime('%Y-%m-%d')}.log")
-        
-        # Handler für Datei
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        
-        # Handler für Konsole
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+            os.makedirs(log_dir, exist_ok=True)
         
-        # Handler hinzufügen
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Handler werden pro Name nur einmal angelegt, egal wie oft Logger(name) erstellt wird
+        self.logger = _get_pipeline().configure(name, log_dir)
     
     def info(self, message: str):
         """Info-Log"""
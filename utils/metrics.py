@@ -0,0 +1,236 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple, Optional, Sequence
+
+class Histogram:
+    """
+    Histogramm mit festen Buckets (kumulativ, wie bei Prometheus)
+    """
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), buckets: Optional[Sequence[float]] = None):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets or self.DEFAULT_BUCKETS)
+        self._lock = threading.Lock()
+        # labels -> [Zähler pro Bucket (+Inf zuletzt), Summe, Anzahl]
+        self._values: Dict[Tuple[str, ...], list] = {}
+    
+    def observe(self, value: float, **labels) -> None:
+        """Erfasst einen Messwert"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def collect(self) -> Dict[Tuple[str, ...], Tuple[list, float, int]]:
+        """Gibt eine Kopie aller Werte zurück (Bucket-Zähler nicht kumuliert)"""
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+    
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Schätzt ein Quantil (obere Bucket-Grenze), z.B. q=0.99 für p99"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None or entry[2] == 0:
+                return None
+            counts, _, count = entry
+            target = q * count
+            running = 0
+            for index, bucket_count in enumerate(counts):
+                running += bucket_count
+                if running >= target:
+                    return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+class Counter:
+    """
+    Monoton steigender Zähler
+    """
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Erhöht den Zähler"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def get(self, **labels) -> float:
+        """Gibt den aktuellen Wert zurück"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+    
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        """Gibt eine Kopie aller Werte zurück"""
+        with self._lock:
+            return dict(self._values)
+
+class Gauge(Counter):
+    """
+    Wert, der steigen und fallen kann
+    """
+    def set(self, value: float, **labels) -> None:
+        """Setzt den Wert"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+    
+    def dec(self, amount: float = 1, **labels) -> None:
+        """Verringert den Wert"""
+        self.inc(-amount, **labels)
+
+class MetricsRegistry:
+    """
+    Sammelt alle Metriken des Prozesses; gleiche Namen liefern dieselbe Instanz
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+    
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+    
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (), buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._get_or_create(Histogram, name, description, labelnames, buckets)
+    
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, description, labelnames)
+    
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labelnames)
+    
+    def metrics(self) -> list:
+        """Gibt alle registrierten Metriken zurück"""
+        with self._lock:
+            return list(self._metrics.values())
+
+# Globale Registry des Prozesses
+REGISTRY = MetricsRegistry()
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+def collect_families(registry: Optional[MetricsRegistry] = None, **labels) -> List[tuple]:
+    """
+    Gibt alle Metriken als picklebare Liste von (Name, Typ, Beschreibung, Samples) zurück, z.B. für die Übergabe
+    zwischen Prozessen; labels (z.B. worker) werden jedem Sample vorangestellt
+    """
+    families = []
+    for metric in (registry or REGISTRY).metrics():
+        samples = []
+        if isinstance(metric, Histogram):
+            metric_type = "histogram"
+            for key, (counts, total, count) in sorted(metric.collect().items()):
+                sample_labels = dict(labels, **dict(zip(metric.labelnames, key)))
+                running = 0
+                for bound, bucket_count in zip(metric.buckets + (float("inf"),), counts):
+                    running += bucket_count
+                    samples.append((f"{metric.name}_bucket", dict(sample_labels, le=_format_value(bound)), running))
+                samples.append((f"{metric.name}_sum", sample_labels, total))
+                samples.append((f"{metric.name}_count", sample_labels, count))
+        else:
+            metric_type = "gauge" if isinstance(metric, Gauge) else "counter"
+            for key, value in sorted(metric.collect().items()):
+                samples.append((metric.name, dict(labels, **dict(zip(metric.labelnames, key))), value))
+        families.append((metric.name, metric_type, metric.description, samples))
+    return families
+
+def render_families(families: Iterable[tuple]) -> str:
+    """Gibt Metriken im Textformat von Prometheus (Version 0.0.4) zurück; gleichnamige (z.B. mehrerer Worker) werden zusammengefasst"""
+    merged: Dict[str, tuple] = {}
+    for name, metric_type, description, samples in families:
+        if name in merged:
+            merged[name][3].extend(samples)
+        else:
+            merged[name] = (name, metric_type, description, list(samples))
+    
+    lines = []
+    for name, metric_type, description, samples in merged.values():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+def render_prometheus(registry: Optional[MetricsRegistry] = None) -> str:
+    """Gibt alle Metriken im Textformat von Prometheus (Version 0.0.4) zurück"""
+    return render_families(collect_families(registry))
+
+class StepTimer:
+    """
+    Misst die Dauer einzelner Schritte eines Ablaufs (z.B. beim Erstellen eines Tickets)
+    """
+    def __init__(self, histogram: Optional[Histogram] = None):
+        self.histogram = histogram
+        self.steps: Dict[str, float] = {}
+        self._start = time.perf_counter()
+        self._last = self._start
+    
+    @contextmanager
+    def step(self, name: str):
+        """Misst den umschlossenen Block als Schritt name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last = time.perf_counter()
+            self._record(name, self._last - start)
+    
+    def mark(self, name: str) -> None:
+        """Erfasst die Zeit seit dem letzten Schritt als Schritt name (für Phasen ohne umschließenden Block)"""
+        now = time.perf_counter()
+        self._record(name, now - self._last)
+        self._last = now
+    
+    def _record(self, name: str, duration: float) -> None:
+        self.steps[name] = self.steps.get(name, 0.0) + duration
+        if self.histogram:
+            self.histogram.observe(duration, step=name)
+    
+    async def measure(self, name: str, awaitable):
+        """Awaited awaitable und misst die Dauer als Schritt name (für asyncio.gather)"""
+        with self.step(name):
+            return await awaitable
+    
+    @property
+    def total(self) -> float:
+        """Gesamtdauer seit Erstellung in Sekunden"""
+        return time.perf_counter() - self._start
+    
+    def summary(self) -> str:
+        """Kurze Zusammenfassung in Millisekunden, z.B. für Logs"""
+        parts = [f"{name}={duration * 1000:.0f}ms" for name, duration in self.steps.items()]
+        parts.append(f"total={self.total * 1000:.0f}ms")
+        return " ".join(parts)
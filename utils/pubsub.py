@@ -0,0 +1,108 @@
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+class _Topic:
+    """
+    Verlauf und Abonnenten eines Themas; alle Themen teilen sich die Sperre des PubSub
+    """
+    def __init__(self, lock: threading.Lock, history: int, start_id: int):
+        self.condition = threading.Condition(lock)
+        self.events: deque = deque(maxlen=history)
+        # Ereignisse bis zu dieser ID sind nicht (mehr) im Verlauf
+        self.missing_up_to = start_id
+        self.subscribers = 0
+
+class Subscription:
+    """
+    Abonnement eines Themas; liest neue Ereignisse ab der zuletzt gelesenen ID
+    """
+    def __init__(self, pubsub: "PubSub", topic: str, last_id: int):
+        self.pubsub = pubsub
+        self.topic = topic
+        self.last_id = last_id
+        self.closed = False
+    
+    def wait(self, timeout: float) -> Optional[List[Tuple[int, Any]]]:
+        """
+        Wartet höchstens timeout Sekunden auf neue Ereignisse und gibt sie als (ID, Ereignis) zurück.
+        Leere Liste bei Timeout, None, wenn Ereignisse verpasst wurden (Leser muss neu laden).
+        """
+        return self.pubsub._wait(self, timeout)
+    
+    def close(self) -> None:
+        """Beendet das Abonnement"""
+        if not self.closed:
+            self.closed = True
+            self.pubsub._unsubscribe(self.topic)
+    
+    def __enter__(self) -> "Subscription":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class PubSub:
+    """
+    In-Process Publish/Subscribe pro Thema (z.B. Server-ID).
+    Ein Publish hängt das Ereignis einmal an den Verlauf des Themas an und weckt alle Leser;
+    ohne Abonnenten kostet er nur einen Dict-Lookup. IDs steigen prozessweit monoton.
+    """
+    def __init__(self, history: int = 200):
+        self.history = history
+        self._lock = threading.Lock()
+        self._topics: Dict[str, _Topic] = {}
+        self._last_id = 0
+    
+    def publish(self, topic: str, event: Any) -> None:
+        """Veröffentlicht ein Ereignis an alle Abonnenten des Themas"""
+        with self._lock:
+            self._last_id += 1
+            state = self._topics.get(topic)
+            if state is None:
+                return
+            if len(state.events) == state.events.maxlen:
+                state.missing_up_to = state.events[0][0]
+            state.events.append((self._last_id, event))
+            state.condition.notify_all()
+    
+    def subscribe(self, topic: str, last_id: Optional[int] = None) -> Subscription:
+        """
+        Abonniert ein Thema. Mit last_id (z.B. aus Last-Event-ID) werden verpasste Ereignisse
+        nachgeliefert, soweit sie noch im Verlauf sind; ohne nur neue Ereignisse.
+        """
+        with self._lock:
+            state = self._topics.get(topic)
+            if state is None:
+                state = self._topics[topic] = _Topic(self._lock, self.history, self._last_id)
+            state.subscribers += 1
+            return Subscription(self, topic, self._last_id if last_id is None else last_id)
+    
+    def _wait(self, subscription: Subscription, timeout: float) -> Optional[List[Tuple[int, Any]]]:
+        with self._lock:
+            state = self._topics[subscription.topic]
+            
+            # ID aus einem früheren Prozess oder älter als der Verlauf: Leser muss neu laden
+            if subscription.last_id > self._last_id or subscription.last_id < state.missing_up_to:
+                subscription.last_id = self._last_id
+                return None
+            
+            if not state.events or state.events[-1][0] <= subscription.last_id:
+                state.condition.wait(timeout)
+                if subscription.last_id < state.missing_up_to:
+                    subscription.last_id = self._last_id
+                    return None
+            
+            events = [(event_id, event) for event_id, event in state.events if event_id > subscription.last_id]
+            if events:
+                subscription.last_id = events[-1][0]
+            return events
+    
+    def _unsubscribe(self, topic: str) -> None:
+        with self._lock:
+            state = self._topics.get(topic)
+            if state is None:
+                return
+            state.subscribers -= 1
+            if state.subscribers <= 0:
+                del self._topics[topic]
@@ -0,0 +1,36 @@
+import types
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+class FrozenDict(Mapping):
+    """
+    Unveränderliches Dictionary für Snapshots; lässt sich (anders als MappingProxyType)
+    pickeln und damit auch im Cluster an das Web-Interface übergeben
+    """
+    __slots__ = ("_data",)
+    
+    def __init__(self, data: Dict[str, Any]):
+        self._data = types.MappingProxyType(dict(data))
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __repr__(self) -> str:
+        return f"FrozenDict({dict(self._data)!r})"
+    
+    def __reduce__(self):
+        return FrozenDict, (dict(self._data),)
+
+def freeze(value: Any) -> Any:
+    """Erstellt eine tiefe, unveränderliche Kopie: Dicts werden zu FrozenDict, Listen zu Tupeln"""
+    if isinstance(value, Mapping):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
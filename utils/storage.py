@@ -0,0 +1,511 @@
+import os
+import sys
+import copy
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from utils.metrics import REGISTRY
+
+SAVE_SECONDS = REGISTRY.histogram(
+    "config_save_seconds",
+    "Dauer eines Schreibvorgangs der Konfiguration",
+    labelnames=("backend", "kind")
+)
+SAVE_BYTES = REGISTRY.counter(
+    "config_save_bytes_total",
+    "Geschriebene Bytes der Konfiguration",
+    labelnames=("backend", "kind")
+)
+
+def _copy_guild(guild_config: Dict[str, Any], tickets: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Kopie eines Servers für Snapshots: Tickets flach (enthalten nur einfache Werte), alles andere tief"""
+    copied = {}
+    for key, value in guild_config.items():
+        if key == "tickets":
+            copied[key] = tickets if tickets is not None else {ticket_id: dict(ticket) for ticket_id, ticket in value.items()}
+        else:
+            copied[key] = copy.deepcopy(value)
+    return copied
+
+class JsonStorage:
+    """
+    Speichert die komplette Konfiguration in einer JSON-Datei.
+    Mit debounce > 0 werden Speicheraufrufe gesammelt und spätestens nach max_latency Sekunden
+    gemeinsam von einem Hintergrund-Thread geschrieben.
+    """
+    def __init__(self, data_dir: str, debounce: float = 0.0, max_latency: float = 0.0, lock: Optional[threading.RLock] = None):
+        self.config_file = os.path.join(data_dir, "config.json")
+        self.debounce = debounce
+        self.max_latency = max(max_latency, debounce)
+        
+        # Sperre, unter der die Konfiguration verändert wird (für konsistente Snapshots)
+        self._lock = lock or threading.RLock()
+        self._write_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pending = None
+        self._dirty_since = None
+        self._deadline = None
+        self._thread = None
+        self._closed = False
+        
+        # Seit dem letzten Snapshot geänderte (Server, Ticket bzw. None für die Einstellungen)
+        self._changes: set = set()
+        self._full = True
+        # Letzter Snapshot je Server; nur unter _write_lock verwendet
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Lädt die Konfiguration oder gibt None zurück, wenn noch keine existiert"""
+        if not os.path.exists(self.config_file):
+            return None
+        
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def save(self, config: Dict[str, Any]) -> None:
+        """Schreibt die Konfiguration sofort oder markiert sie für den nächsten gesammelten Flush"""
+        self._save(config, full=True)
+    
+    def _save(self, config: Dict[str, Any], changes: Iterable[Tuple[str, Optional[str]]] = (), full: bool = False) -> None:
+        with self._cond:
+            self._changes.update(changes)
+            self._full = self._full or full
+        
+        if self.debounce <= 0:
+            with self._write_lock:
+                self._write(config)
+            return
+        
+        with self._cond:
+            now = time.monotonic()
+            self._pending = config
+            if self._dirty_since is None:
+                self._dirty_since = now
+            # Jeder Aufruf verschiebt den Flush, aber nie über max_latency hinaus
+            self._deadline = min(now + self.debounce, self._dirty_since + self.max_latency)
+            
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="config-flush", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+    
+    def save_guild(self, config: Dict[str, Any], guild_id: str) -> None:
+        """Speichert die Einstellungen eines Servers (bei JSON immer die ganze Datei)"""
+        self._save(config, [(guild_id, None)])
+    
+    def save_ticket(self, config: Dict[str, Any], guild_id: str, ticket_id: str) -> None:
+        """Speichert ein einzelnes Ticket (bei JSON immer die ganze Datei)"""
+        self._save(config, [(guild_id, ticket_id)])
+    
+    def save_new_ticket(self, config: Dict[str, Any], guild_id: str, ticket_id: str) -> None:
+        """Speichert ein neues Ticket samt Ticket-Zähler des Servers (bei JSON immer die ganze Datei)"""
+        self._save(config, [(guild_id, None), (guild_id, ticket_id)])
+    
+    def save_meta(self, config: Dict[str, Any], key: str) -> None:
+        """Speichert einen Metadaten-Eintrag (bei JSON immer die ganze Datei)"""
+        self._save(config)
+    
+    def save_job(self, config: Dict[str, Any], guild_id: str, job_id: str) -> None:
+        """Speichert oder entfernt eine geplante Aufgabe (bei JSON immer die ganze Datei)"""
+        self._save(config, [(guild_id, None)])
+    
+    def save_jobs(self, config: Dict[str, Any], guild_id: str, job_ids: List[str]) -> None:
+        """Speichert oder entfernt mehrere geplante Aufgaben (bei JSON einmal die ganze Datei)"""
+        self._save(config, [(guild_id, None)])
+    
+    def flush(self) -> None:
+        """Schreibt ausstehende Änderungen sofort"""
+        with self._write_lock:
+            with self._cond:
+                config = self._pending
+                self._pending = None
+                self._dirty_since = None
+                self._deadline = None
+            
+            if config is not None:
+                self._write(config)
+    
+    def close(self) -> None:
+        """Schreibt ausstehende Änderungen und beendet den Hintergrund-Thread"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+    
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            
+            self.flush()
+    
+    def _snapshot(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Kopiert unter der Config-Sperre nur die geänderten Server bzw. Tickets; unveränderte Server
+        stammen aus dem letzten Snapshot. Das Serialisieren läuft danach ohne die Sperre.
+        """
+        with self._cond:
+            changes, self._changes = self._changes, set()
+            full, self._full = self._full, False
+        
+        with self._lock:
+            guilds = config["guilds"]
+            if full:
+                self._snapshots = {}
+            
+            for guild_id, ticket_id in changes:
+                snapshot = self._snapshots.get(guild_id)
+                guild_config = guilds.get(guild_id)
+                if snapshot is None or guild_config is None:
+                    continue
+                if ticket_id is None:
+                    self._snapshots[guild_id] = _copy_guild(guild_config, snapshot.get("tickets"))
+                elif ticket_id in guild_config.get("tickets", {}):
+                    snapshot["tickets"][ticket_id] = dict(guild_config["tickets"][ticket_id])
+            
+            snapshot_guilds = {}
+            for guild_id, guild_config in guilds.items():
+                if guild_id not in self._snapshots:
+                    self._snapshots[guild_id] = _copy_guild(guild_config)
+                snapshot_guilds[guild_id] = self._snapshots[guild_id]
+            
+            # Entfernte Server nicht weiter vorhalten
+            if len(self._snapshots) != len(snapshot_guilds):
+                self._snapshots = dict(snapshot_guilds)
+            
+            return {
+                key: snapshot_guilds if key == "guilds" else copy.deepcopy(value)
+                for key, value in config.items()
+            }
+    
+    def _write(self, config: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        # Snapshot unter der Config-Sperre, damit keine halb geänderten Daten geschrieben werden;
+        # json.dumps läuft ohne die Sperre, damit der Bot-Loop währenddessen nicht wartet
+        data = json.dumps(self._snapshot(config), indent=4).encode("utf-8")
+        
+        # Atomar ersetzen: ein Absturz während des Schreibens lässt die alte Datei intakt
+        tmp_file = f"{self.config_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.config_file)
+        
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.config_file)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        
+        SAVE_SECONDS.observe(time.perf_counter() - start, backend="json", kind="full")
+        SAVE_BYTES.inc(len(data), backend="json", kind="full")
+
+class SqliteStorage:
+    """
+    Speichert Server-Einstellungen, Tickets und geplante Aufgaben in SQLite (WAL-Modus).
+    Jede Änderung schreibt nur die betroffene Zeile statt der ganzen Konfiguration.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS guilds (
+            guild_id TEXT PRIMARY KEY,
+            settings TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tickets (
+            guild_id TEXT NOT NULL,
+            ticket_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            category TEXT,
+            status TEXT NOT NULL,
+            created_at TEXT,
+            closed_at TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (guild_id, ticket_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_tickets_guild_status ON tickets (guild_id, status);
+        CREATE INDEX IF NOT EXISTS idx_tickets_guild_user ON tickets (guild_id, user_id);
+        CREATE INDEX IF NOT EXISTS idx_tickets_guild_channel ON tickets (guild_id, channel_id);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            guild_id TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (guild_id, job_id)
+        );
+    """
+    # Schlüssel der Server-Konfiguration mit eigener Tabelle (nicht in guilds.settings)
+    SEPARATE_KEYS = ("tickets", "scheduled_jobs")
+    
+    def __init__(self, data_dir: str, filename: str = "config.db"):
+        self.db_file = os.path.join(data_dir, filename)
+        self._lock = threading.Lock()
+        
+        # Autocommit; Transaktionen werden explizit gestartet
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+    
+    def is_empty(self) -> bool:
+        """Prüft, ob die Datenbank noch keine Server und keine Metadaten enthält"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM guilds) OR EXISTS (SELECT 1 FROM meta)"
+            ).fetchone()
+        return not row[0]
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Lädt alle Server inklusive Tickets oder gibt None zurück, wenn die Datenbank leer ist"""
+        if self.is_empty():
+            return None
+        
+        config = {"guilds": {}}
+        with self._lock:
+            legacy_jobs = []
+            for guild_id, settings in self._conn.execute("SELECT guild_id, settings FROM guilds"):
+                guild_config = json.loads(settings)
+                guild_config["tickets"] = {}
+                if "scheduled_jobs" in guild_config:
+                    legacy_jobs.append(guild_id)
+                config["guilds"][guild_id] = guild_config
+            
+            for guild_id, job_id, data in self._conn.execute("SELECT guild_id, job_id, data FROM scheduled_jobs"):
+                if guild_id in config["guilds"]:
+                    config["guilds"][guild_id].setdefault("scheduled_jobs", {})[job_id] = json.loads(data)
+            
+            # Ältere Datenbanken speicherten die Aufgaben in den Server-Einstellungen: einmalig umziehen
+            if legacy_jobs:
+                self._conn.execute("BEGIN")
+                try:
+                    for guild_id in legacy_jobs:
+                        guild_config = config["guilds"][guild_id]
+                        self._write_guild(guild_id, guild_config)
+                        for job_id, job in guild_config["scheduled_jobs"].items():
+                            self._write_job(guild_id, job_id, job)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            
+            rows = self._conn.execute(
+                "SELECT guild_id, ticket_id, data FROM tickets ORDER BY guild_id, CAST(ticket_id AS INTEGER)"
+            )
+            for guild_id, ticket_id, data in rows:
+                if guild_id in config["guilds"]:
+                    config["guilds"][guild_id]["tickets"][ticket_id] = json.loads(data)
+            
+            config["meta"] = {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM meta")}
+        
+        return config
+    
+    def save(self, config: Dict[str, Any], replace: bool = True) -> None:
+        """
+        Schreibt die komplette Konfiguration in einer Transaktion. Mit replace=False werden nur Zeilen
+        eingefügt bzw. aktualisiert, damit gleichzeitig laufende Prozesse keine Daten verlieren.
+        """
+        start = time.perf_counter()
+        written = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                if replace:
+                    self._conn.execute("DELETE FROM tickets")
+                    self._conn.execute("DELETE FROM guilds")
+                    self._conn.execute("DELETE FROM meta")
+                    self._conn.execute("DELETE FROM scheduled_jobs")
+                for guild_id, guild_config in config.get("guilds", {}).items():
+                    written += self._write_guild(guild_id, guild_config)
+                    for ticket_id, ticket in guild_config.get("tickets", {}).items():
+                        written += self._write_ticket(guild_id, ticket_id, ticket)
+                    for job_id, job in guild_config.get("scheduled_jobs", {}).items():
+                        written += self._write_job(guild_id, job_id, job)
+                for key in config.get("meta", {}):
+                    written += self._write_meta(key, config["meta"][key])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._observe("full", start, written)
+    
+    def save_guild(self, config: Dict[str, Any], guild_id: str) -> None:
+        """Speichert nur die Einstellungen eines Servers"""
+        start = time.perf_counter()
+        with self._lock:
+            written = self._write_guild(guild_id, config["guilds"][guild_id])
+        self._observe("guild", start, written)
+    
+    def save_ticket(self, config: Dict[str, Any], guild_id: str, ticket_id: str) -> None:
+        """Speichert nur ein einzelnes Ticket"""
+        start = time.perf_counter()
+        with self._lock:
+            written = self._write_ticket(guild_id, ticket_id, config["guilds"][guild_id]["tickets"][ticket_id])
+        self._observe("ticket", start, written)
+    
+    def save_new_ticket(self, config: Dict[str, Any], guild_id: str, ticket_id: str) -> None:
+        """Speichert ein neues Ticket und die Einstellungen seines Servers (Ticket-Zähler) in einer Transaktion"""
+        start = time.perf_counter()
+        guild_config = config["guilds"][guild_id]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                written = self._write_ticket(guild_id, ticket_id, guild_config["tickets"][ticket_id])
+                written += self._write_guild(guild_id, guild_config)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._observe("ticket", start, written)
+    
+    def save_meta(self, config: Dict[str, Any], key: str) -> None:
+        """Speichert nur einen Metadaten-Eintrag"""
+        start = time.perf_counter()
+        with self._lock:
+            written = self._write_meta(key, config["meta"][key])
+        self._observe("meta", start, written)
+    
+    def save_job(self, config: Dict[str, Any], guild_id: str, job_id: str) -> None:
+        """Speichert nur eine geplante Aufgabe oder löscht ihre Zeile, wenn sie nicht mehr existiert"""
+        start = time.perf_counter()
+        job = config["guilds"].get(guild_id, {}).get("scheduled_jobs", {}).get(job_id)
+        with self._lock:
+            if job is None:
+                self._conn.execute("DELETE FROM scheduled_jobs WHERE guild_id = ? AND job_id = ?", (guild_id, job_id))
+                written = 0
+            else:
+                written = self._write_job(guild_id, job_id, job)
+        self._observe("job", start, written)
+    
+    def save_jobs(self, config: Dict[str, Any], guild_id: str, job_ids: List[str]) -> None:
+        """Speichert oder entfernt mehrere geplante Aufgaben eines Servers in einer Transaktion"""
+        start = time.perf_counter()
+        jobs = config["guilds"].get(guild_id, {}).get("scheduled_jobs", {})
+        written = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for job_id in job_ids:
+                    job = jobs.get(job_id)
+                    if job is None:
+                        self._conn.execute("DELETE FROM scheduled_jobs WHERE guild_id = ? AND job_id = ?", (guild_id, job_id))
+                    else:
+                        written += self._write_job(guild_id, job_id, job)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._observe("jobs", start, written)
+    
+    def flush(self) -> None:
+        """Nichts zu tun, SQLite schreibt jede Änderung sofort"""
+        pass
+    
+    def close(self) -> None:
+        """Schließt die Datenbankverbindung"""
+        with self._lock:
+            self._conn.close()
+    
+    def _observe(self, kind: str, start: float, written: int) -> None:
+        SAVE_SECONDS.observe(time.perf_counter() - start, backend="sqlite", kind=kind)
+        SAVE_BYTES.inc(written, backend="sqlite", kind=kind)
+    
+    def _write_guild(self, guild_id: str, guild_config: Dict[str, Any]) -> int:
+        settings = json.dumps({key: value for key, value in guild_config.items() if key not in self.SEPARATE_KEYS})
+        self._conn.execute(
+            "INSERT INTO guilds (guild_id, settings) VALUES (?, ?) "
+            "ON CONFLICT (guild_id) DO UPDATE SET settings = excluded.settings",
+            (guild_id, settings)
+        )
+        return len(settings)
+    
+    def _write_meta(self, key: str, value: Any) -> int:
+        data = json.dumps(value)
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, data)
+        )
+        return len(data)
+    
+    def _write_job(self, guild_id: str, job_id: str, job: Dict[str, Any]) -> int:
+        data = json.dumps(job)
+        self._conn.execute(
+            "INSERT INTO scheduled_jobs (guild_id, job_id, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (guild_id, job_id) DO UPDATE SET data = excluded.data",
+            (guild_id, job_id, data)
+        )
+        return len(data)
+    
+    def _write_ticket(self, guild_id: str, ticket_id: str, ticket: Dict[str, Any]) -> int:
+        data = json.dumps(ticket)
+        self._conn.execute(
+            "INSERT INTO tickets (guild_id, ticket_id, user_id, channel_id, category, status, created_at, closed_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (guild_id, ticket_id) DO UPDATE SET "
+            "user_id = excluded.user_id, channel_id = excluded.channel_id, category = excluded.category, "
+            "status = excluded.status, created_at = excluded.created_at, closed_at = excluded.closed_at, "
+            "data = excluded.data",
+            (
+                guild_id,
+                ticket_id,
+                ticket["user_id"],
+                ticket["channel_id"],
+                ticket.get("category"),
+                ticket["status"],
+                ticket.get("created_at"),
+                ticket.get("closed_at"),
+                data
+            )
+        )
+        return len(data)
+
+def create_storage(backend: str, data_dir: str, lock: Optional[threading.RLock] = None):
+    """Erstellt das Speicher-Backend anhand des Namens ("json" oder "sqlite")"""
+    if backend == "sqlite":
+        return SqliteStorage(data_dir)
+    if backend == "json":
+        return JsonStorage(
+            data_dir,
+            debounce=float(os.getenv("CONFIG_SAVE_DEBOUNCE", 0)),
+            max_latency=float(os.getenv("CONFIG_SAVE_MAX_LATENCY", 5)),
+            lock=lock
+        )
+    raise ValueError(f"Unbekanntes Config-Backend: {backend}")
+
+def migrate_json_to_sqlite(json_file: str, storage: SqliteStorage) -> int:
+    """Überträgt eine bestehende config.json einmalig in die SQLite-Datenbank und gibt die Anzahl der Tickets zurück"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    
+    # Ohne Löschen: ein Worker, der gleichzeitig startet, hat evtl. schon eigene Zeilen geschrieben
+    storage.save(config, replace=False)
+    return sum(len(guild.get("tickets", {})) for guild in config.get("guilds", {}).values())
+
+if __name__ == "__main__":
+    # Verwendung: python -m utils.storage [data_dir]
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    json_file = os.path.join(data_dir, "config.json")
+    
+    sqlite_storage = SqliteStorage(data_dir)
+    if not sqlite_storage.is_empty():
+        print(f"{sqlite_storage.db_file} enthält bereits Daten, Migration übersprungen")
+        sys.exit(1)
+    
+    count = migrate_json_to_sqlite(json_file, sqlite_storage)
+    sqlite_storage.close()
+    print(f"{count} Ticket(s) von {json_file} nach {sqlite_storage.db_file} migriert")
@@ -0,0 +1,218 @@
+import os
+import gzip
+import html
+import sqlite3
+import asyncio
+import datetime
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+def format_transcript_line(message) -> str:
+    """Formatiert eine Discord-Nachricht als Transkript-Zeile"""
+    time = message.created_at.strftime("%Y-%m-%d %H:%M:%S")
+    content = message.content if message.content else "*[Kein Textinhalt]*"
+    return f"[{time}] {message.author.name}: {content}"
+
+class TranscriptWriter:
+    """
+    Schreibt ein Transkript blockweise auf die Festplatte (optional gzip-komprimiert).
+    Alle blockierenden Dateioperationen laufen im Thread-Pool, nicht auf dem Event-Loop.
+    """
+    def __init__(self, file_path: str, compress: bool = False, chunk_lines: int = 500):
+        self.file_path = file_path
+        self.compress = compress
+        self.chunk_lines = chunk_lines
+        self.line_count = 0
+        self._buffer: List[str] = []
+        self._file = None
+    
+    async def open(self) -> None:
+        """Erstellt das Verzeichnis und öffnet die Datei"""
+        await asyncio.to_thread(self._open)
+    
+    async def write_line(self, line: str) -> None:
+        """Puffert eine Zeile und schreibt den Puffer, sobald er voll ist"""
+        self._buffer.append(line)
+        self.line_count += 1
+        if len(self._buffer) >= self.chunk_lines:
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """Schreibt den aktuellen Puffer"""
+        if not self._buffer:
+            return
+        data = "\n".join(self._buffer) + "\n"
+        self._buffer = []
+        await asyncio.to_thread(self._file.write, data)
+    
+    async def close(self) -> None:
+        """Schreibt den Rest und schließt die Datei"""
+        if self._file is None:
+            return
+        try:
+            await self.flush()
+        finally:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+    
+    async def __aenter__(self) -> "TranscriptWriter":
+        await self.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> Optional[bool]:
+        await self.close()
+        return None
+    
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        if self.compress:
+            self._file = gzip.open(self.file_path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(self.file_path, 'w', encoding='utf-8')
+
+class TranscriptArchive:
+    """
+    Archiv für Transkripte: komprimierte Dateien pro Server und Ticket
+    und ein inkrementeller Volltextindex (SQLite FTS5), der beim Schreiben aktualisiert wird
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transcripts (
+            guild_id TEXT NOT NULL,
+            ticket_id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            line_count INTEGER NOT NULL DEFAULT 0,
+            archived_at TEXT NOT NULL,
+            PRIMARY KEY (guild_id, ticket_id)
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS transcript_chunks USING fts5(
+            content,
+            guild_id,
+            ticket_id UNINDEXED,
+            chunk UNINDEXED,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+    """
+    
+    def __init__(self, root_dir: str = "data/transcripts"):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root_dir, "index.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+    
+    def path_for(self, guild_id: str, ticket_id: str) -> str:
+        """Dateipfad eines Transkripts (pro Server getrennt, gzip-komprimiert)"""
+        return os.path.join(self.root_dir, guild_id, f"ticket-{ticket_id}.txt.gz")
+    
+    def writer(self, guild_id: str, ticket_id: str) -> "ArchivedTranscriptWriter":
+        """Erstellt einen Writer, der die Datei schreibt und jeden Block sofort indiziert"""
+        return ArchivedTranscriptWriter(self, guild_id, ticket_id)
+    
+    def search(self, guild_id: str, query: str, page: int = 1, limit: int = 20) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Durchsucht die Transkripte eines Servers; Ergebnisse pro Ticket nach Relevanz (BM25) sortiert.
+        Gibt die Treffer der Seite und ob weitere Seiten existieren zurück.
+        """
+        terms = [term for term in query.split() if term]
+        if not terms:
+            return [], False
+        
+        # Jeden Suchbegriff als Phrase quoten, damit keine FTS-Syntax aus der Eingabe ausgeführt wird
+        phrases = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        match = f'guild_id : "{guild_id}" AND content : ({phrases})'
+        offset = (max(page, 1) - 1) * limit
+        
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ticket_id, MIN(rank) AS score, rowid FROM ("
+                "    SELECT rowid, ticket_id, rank FROM transcript_chunks WHERE transcript_chunks MATCH ?"
+                ") GROUP BY ticket_id ORDER BY score LIMIT ? OFFSET ?",
+                (match, limit + 1, offset)
+            ).fetchall()
+            
+            results = []
+            for ticket_id, score, rowid in rows[:limit]:
+                snippet = self._conn.execute(
+                    "SELECT snippet(transcript_chunks, 0, char(57344), char(57345), '…', 16) "
+                    "FROM transcript_chunks WHERE transcript_chunks MATCH ? AND rowid = ?",
+                    (match, rowid)
+                ).fetchone()
+                results.append({
+                    "ticket_id": ticket_id,
+                    "score": -score,
+                    "snippet": self._highlight(snippet[0]) if snippet else ""
+                })
+        
+        return results, len(rows) > limit
+    
+    def _highlight(self, snippet: str) -> str:
+        # Transkript-Inhalt escapen, erst danach die Treffer-Markierungen als <mark> einsetzen
+        return html.escape(snippet).replace("\ue000", "<mark>").replace("\ue001", "</mark>")
+    
+    def close(self) -> None:
+        """Schließt die Index-Datenbank"""
+        with self._lock:
+            self._conn.close()
+    
+    def _begin(self, guild_id: str, ticket_id: str) -> None:
+        # Ein erneut archiviertes Ticket ersetzt den alten Index-Eintrag
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM transcript_chunks WHERE guild_id = ? AND ticket_id = ?",
+                (guild_id, ticket_id)
+            )
+    
+    def _index_chunk(self, guild_id: str, ticket_id: str, chunk: int, content: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO transcript_chunks (content, guild_id, ticket_id, chunk) VALUES (?, ?, ?, ?)",
+                (content, guild_id, ticket_id, chunk)
+            )
+    
+    def _finish(self, guild_id: str, ticket_id: str, path: str, line_count: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO transcripts (guild_id, ticket_id, path, line_count, archived_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (guild_id, ticket_id) DO UPDATE SET "
+                "path = excluded.path, line_count = excluded.line_count, archived_at = excluded.archived_at",
+                (guild_id, ticket_id, path, line_count, datetime.datetime.now().isoformat())
+            )
+
+class ArchivedTranscriptWriter(TranscriptWriter):
+    """
+    TranscriptWriter, der jeden geschriebenen Block im selben Thread-Aufruf in den Volltextindex aufnimmt
+    """
+    def __init__(self, archive: TranscriptArchive, guild_id: str, ticket_id: str, chunk_lines: int = 500):
+        super().__init__(archive.path_for(guild_id, ticket_id), compress=True, chunk_lines=chunk_lines)
+        self.archive = archive
+        self.guild_id = guild_id
+        self.ticket_id = ticket_id
+        self._chunk = 0
+    
+    async def open(self) -> None:
+        await asyncio.to_thread(self._open_and_reset)
+    
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        data = "\n".join(self._buffer) + "\n"
+        self._buffer = []
+        chunk = self._chunk
+        self._chunk += 1
+        await asyncio.to_thread(self._write_and_index, chunk, data)
+    
+    async def close(self) -> None:
+        if self._file is None:
+            return
+        await super().close()
+        await asyncio.to_thread(self.archive._finish, self.guild_id, self.ticket_id, self.file_path, self.line_count)
+    
+    def _open_and_reset(self) -> None:
+        self._open()
+        self.archive._begin(self.guild_id, self.ticket_id)
+    
+    def _write_and_index(self, chunk: int, data: str) -> None:
+        self._file.write(data)
+        self.archive._index_chunk(self.guild_id, self.ticket_id, chunk, data)
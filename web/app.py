@@ -1,9 +1,21 @@
 import os
-from flask import Flask, redirect, url_for, render_template, request, jsonify, session
+import time
+import hmac
+import json
+import concurrent.futures
+from flask import Flask, redirect, url_for, render_template, request, jsonify, session, g, Response
 from typing import Dict, Any
 
 from web.auth import setup_oauth
 from utils.logger import Logger
+from utils.metrics import REGISTRY, render_families
+from utils.pubsub import PubSub
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds",
+    "Antwortzeit des Web-Interfaces pro Route",
+    labelnames=("route", "method", "status")
+)
 
 def create_app(bot_instance):
     """Erstellt die Flask-App für das Web-Interface"""
@@ -20,6 +32,42 @@ def create_app(bot_instance):
     # Konfiguriere Discord OAuth2
     discord_oauth = setup_oauth(app)
     
+    def apply_on_bot(write, guild_id: str, *args):
+        """Führt eine Änderung über den Bot aus (auf dessen Loop) und meldet Erfolg oder Fehler als JSON"""
+        try:
+            write(guild_id, *args)
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        except concurrent.futures.TimeoutError:
+            return jsonify({"error": "Der Bot hat nicht rechtzeitig geantwortet"}), 504
+        except Exception as e:
+            logger.error(f"Änderung an Server {guild_id} fehlgeschlagen: {e}")
+            return jsonify({"error": str(e)}), 500
+        
+        return jsonify({"success": True})
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+    
+    @app.after_request
+    def record_request_latency(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            # Routen-Muster statt konkreter URL, damit Server-IDs keine eigenen Zeitreihen erzeugen
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, method=request.method, status=response.status_code)
+        return response
+    
+    @app.route("/metrics")
+    def metrics():
+        # Optional per Bearer-Token geschützt (METRICS_TOKEN), da Server-IDs enthalten sind
+        token = os.getenv("METRICS_TOKEN")
+        if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        # Im Cluster liefern die Worker ihre Metriken mit dem Label worker zu
+        return Response(render_families(bot_instance.collect_metrics()), mimetype="text/plain; version=0.0.4; charset=utf-8")
+    
     @app.route("/")
     def home():
         if not discord_oauth.authorized:
@@ -57,22 +105,15 @@ def create_app(bot_instance):
     @discord_oauth.requires_authorization
     def guild_settings(guild_id):
         user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
         
         # Prüfe, ob der Benutzer Berechtigungen für diesen Server hat
-        has_permission = False
-        guild_name = ""
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                    guild_name = guild.name
-                break
-        
-        if not has_permission:
+        managed_guild = discord_oauth.get_managed_guild(guild_id)
+        if not managed_guild:
             return redirect(url_for("dashboard"))
+        guild_name = managed_guild.name
         
-        guild_config = bot_instance.config_manager.get_guild_config(guild_id)
+        # Unveränderlicher Snapshot, ohne Sperre und ohne die Tickets
+        guild_config = bot_instance.config_manager.get_guild_settings(guild_id)
         
         return render_template(
             "guild_settings.html", 
@@ -85,222 +126,221 @@ def create_app(bot_instance):
     @app.route("/api/guild/<guild_id>/categories", methods=["POST"])
     @discord_oauth.requires_authorization
     def update_categories(guild_id):
-        user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
-        
-        # Prüfe Berechtigungen
-        has_permission = False
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                break
-        
-        if not has_permission:
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
             return jsonify({"error": "Unauthorized"}), 403
         
         # Aktualisiere Kategorien
         categories = request.json.get("categories", [])
-        bot_instance.config_manager.update_guild_categories(guild_id, categories)
-        
-        return jsonify({"success": True})
+        return apply_on_bot(bot_instance.update_guild_categories, guild_id, categories)
     
     @app.route("/api/guild/<guild_id>/admin-roles", methods=["POST"])
     @discord_oauth.requires_authorization
     def update_admin_roles(guild_id):
-        user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
-        
-        # Prüfe Berechtigungen
-        has_permission = False
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                break
-        
-        if not has_permission:
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
             return jsonify({"error": "Unauthorized"}), 403
         
         # Aktualisiere Admin-Rollen
         admin_roles = request.json.get("admin_roles", [])
-        bot_instance.config_manager.update_guild_admin_roles(guild_id, admin_roles)
-        
-        return jsonify({"success": True})
+        return apply_on_bot(bot_instance.update_guild_admin_roles, guild_id, admin_roles)
     
     @app.route("/api/guild/<guild_id>/log-channel", methods=["POST"])
     @discord_oauth.requires_authorization
     def update_log_channel(guild_id):
-        user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
-        
-        # Prüfe Berechtigungen
-        has_permission = False
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                break
-        
-        if not has_permission:
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
             return jsonify({"error": "Unauthorized"}), 403
         
         # Aktualisiere Log-Kanal
         channel_id = request.json.get("channel_id")
-        bot_instance.config_manager.set_log_channel(guild_id, channel_id)
+        return apply_on_bot(bot_instance.set_log_channel, guild_id, channel_id)
+    
+    @app.route("/api/guild/<guild_id>/idle-close", methods=["POST"])
+    @discord_oauth.requires_authorization
+    def update_idle_close(guild_id):
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
+            return jsonify({"error": "Unauthorized"}), 403
         
-        return jsonify({"success": True})
+        try:
+            hours = int((request.json or {}).get("hours") or 0)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid hours"}), 400
+        if not 0 <= hours <= 8760:
+            return jsonify({"error": "Invalid hours"}), 400
+        
+        # Speichern und offene Tickets auf dem Bot-Loop neu einplanen
+        return apply_on_bot(bot_instance.set_idle_close_hours, guild_id, hours)
     
     @app.route("/api/guild/<guild_id>/channels", methods=["GET"])
     @discord_oauth.requires_authorization
     def get_guild_channels(guild_id):
-        user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
-        
-        # Prüfe Berechtigungen
-        has_permission = False
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                break
-        
-        if not has_permission:
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
             return jsonify({"error": "Unauthorized"}), 403
         
-        # Hole Guild-Objekt vom Bot
-        guild = bot_instance.bot.get_guild(int(guild_id))
-        if not guild:
+        # Text-Kanäle aus dem Cache des Bots (bzw. des zuständigen Workers)
+        channels = bot_instance.get_guild_channels(guild_id)
+        if channels is None:
             return jsonify({"error": "Guild not found"}), 404
         
-        # Sammle alle Text-Kanäle
-        channels = []
-        for channel in guild.text_channels:
-            channels.append({
-                "id": str(channel.id),
-                "name": channel.name,
-                "category": channel.category.name if channel.category else "Keine Kategorie"
-            })
-        
         return jsonify({"channels": channels})
     
     @app.route("/api/guild/<guild_id>/roles", methods=["GET"])
     @discord_oauth.requires_authorization
     def get_guild_roles(guild_id):
-        user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
-        
-        # Prüfe Berechtigungen
-        has_permission = False
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                break
-        
-        if not has_permission:
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
             return jsonify({"error": "Unauthorized"}), 403
         
-        # Hole Guild-Objekt vom Bot
-        guild = bot_instance.bot.get_guild(int(guild_id))
-        if not guild:
+        # Rollen aus dem Cache des Bots (bzw. des zuständigen Workers)
+        roles = bot_instance.get_guild_roles(guild_id)
+        if roles is None:
             return jsonify({"error": "Guild not found"}), 404
         
-        # Sammle alle Rollen (außer @everyone)
-        roles = []
-        for role in guild.roles:
-            if role.name != "@everyone":
-                roles.append({
-                    "id": str(role.id),
-                    "name": role.name,
-                    "color": role.color.value
-                })
-        
         return jsonify({"roles": roles})
     
     @app.route("/api/guild/<guild_id>/tickets", methods=["GET"])
     @discord_oauth.requires_authorization
     def get_guild_tickets(guild_id):
-        user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
+            return jsonify({"error": "Unauthorized"}), 403
         
-        # Prüfe Berechtigungen
-        has_permission = False
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                break
+        # Filter, Sortierung und Paginierung aus den Query-Parametern
+        cursor = request.args.get("cursor")
+        if cursor and not cursor.isdigit():
+            return jsonify({"error": "Invalid cursor"}), 400
+        
+        try:
+            limit = min(max(int(request.args.get("limit", 50)), 1), 200)
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+        
+        tickets, next_cursor = bot_instance.config_manager.query_tickets(
+            guild_id,
+            status=request.args.get("status") or None,
+            category=request.args.get("category") or None,
+            user_id=request.args.get("user_id") or None,
+            created_from=request.args.get("from") or None,
+            created_to=request.args.get("to") or None,
+            descending=request.args.get("sort", "desc") != "asc",
+            cursor=cursor,
+            limit=limit
+        )
+        
+        # Kompakte Antwort: nur die Felder, die die Tabelle anzeigt
+        fields = ("id", "category", "user_id", "status", "created_at", "closed_at")
         
-        if not has_permission:
+        # Bereits bekannte Benutzernamen direkt mitliefern (ohne REST-Aufruf)
+        usernames = bot_instance.cached_usernames(
+            guild_id, list({ticket["user_id"] for ticket in tickets})
+        )
+        
+        return jsonify({
+            "tickets": [{field: ticket.get(field) for field in fields} for ticket in tickets],
+            "usernames": usernames,
+            "next_cursor": next_cursor
+        })
+    
+    @app.route("/api/guild/<guild_id>/tickets/stream", methods=["GET"])
+    @discord_oauth.requires_authorization
+    def stream_guild_tickets(guild_id):
+        # Prüfe Berechtigungen einmal beim Verbindungsaufbau (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
             return jsonify({"error": "Unauthorized"}), 403
         
-        # Hole Tickets aus Config
-        guild_config = bot_instance.config_manager.get_guild_config(guild_id)
-        tickets = guild_config.get("tickets", {})
+        # Die Ereignisse entstehen im Prozess des Bots; im Cluster-Modus läuft der Bot in anderen Prozessen
+        ticket_events = getattr(bot_instance.config_manager, "ticket_events", None)
+        if not isinstance(ticket_events, PubSub):
+            return jsonify({"error": "Live-Updates sind nicht verfügbar"}), 501
+        
+        # Nach einem Verbindungsabbruch sendet der Browser die zuletzt erhaltene ID mit
+        last_event_id = request.headers.get("Last-Event-ID", "")
+        last_id = int(last_event_id) if last_event_id.isdigit() else None
+        
+        # Jeder Stream hält einen Thread des Web-Servers; ohne freien Platz ablehnen, statt normale Anfragen auszuhungern
+        stream_slots = app.extensions.get("stream_slots")
+        if stream_slots is not None and not stream_slots.acquire(blocking=False):
+            return jsonify({"error": "Zu viele Live-Verbindungen"}), 503
+        
+        def generate():
+            # Erst beim Senden abonnieren, damit nie gestartete Antworten kein Abonnement zurücklassen
+            with ticket_events.subscribe(guild_id, last_id) as subscription:
+                yield "retry: 5000\n\n"
+                while True:
+                    events = subscription.wait(timeout=15.0)
+                    if events is None:
+                        # Ereignisse verpasst: Tabelle im Browser neu laden
+                        yield "event: resync\ndata: {}\n\n"
+                    elif not events:
+                        # Kommentar als Keep-Alive; erkennt zugleich geschlossene Verbindungen
+                        yield ": keep-alive\n\n"
+                    else:
+                        yield "".join(
+                            f"id: {event_id}\nevent: ticket\ndata: {json.dumps(ticket)}\n\n"
+                            for event_id, ticket in events
+                        )
+        
+        response = Response(generate(), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            # Kein Puffern durch einen Reverse-Proxy (nginx)
+            "X-Accel-Buffering": "no"
+        })
+        if stream_slots is not None:
+            # close() ruft der Server immer auf, auch wenn der Stream nie gesendet wurde
+            response.call_on_close(stream_slots.release)
+        return response
+    
+    @app.route("/api/guild/<guild_id>/users", methods=["POST"])
+    @discord_oauth.requires_authorization
+    def resolve_users(guild_id):
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
+            return jsonify({"error": "Unauthorized"}), 403
+        
+        user_ids = [str(user_id) for user_id in (request.json or {}).get("user_ids", [])][:1000]
+        
+        # Auflösung auf dem Bot-Loop: Member-Cache zuerst, dann begrenzt per fetch_user;
+        # zurückgestellte IDs fragt der Browser mit einer weiteren Anfrage an
+        usernames, deferred = bot_instance.resolve_usernames(guild_id, user_ids)
         
-        return jsonify({"tickets": tickets})
+        return jsonify({"usernames": usernames, "deferred": deferred})
     
-    @app.route("/api/guild/<guild_id>/ticket-settings", methods=["POST"])
+    @app.route("/api/guild/<guild_id>/transcripts/search", methods=["GET"])
     @discord_oauth.requires_authorization
-    def create_ticket_panel(guild_id):
-        user = discord_oauth.fetch_user()
-        guilds = discord_oauth.fetch_guilds()
+    def search_transcripts(guild_id):
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
+            return jsonify({"error": "Unauthorized"}), 403
         
-        # Prüfe Berechtigungen
-        has_permission = False
-        for guild in guilds:
-            if str(guild.id) == guild_id:
-                if guild.permissions.administrator or guild.permissions.manage_guild:
-                    has_permission = True
-                break
+        query = request.args.get("q", "").strip()
+        try:
+            page = max(int(request.args.get("page", 1)), 1)
+            limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+        except ValueError:
+            return jsonify({"error": "Invalid page or limit"}), 400
+        
+        results, has_more = bot_instance.transcript_archive.search(guild_id, query, page=page, limit=limit)
         
-        if not has_permission:
+        return jsonify({"results": results, "page": page, "has_more": has_more})
+    
+    @app.route("/api/guild/<guild_id>/ticket-settings", methods=["POST"])
+    @discord_oauth.requires_authorization
+    def create_ticket_panel(guild_id):
+        # Prüfe Berechtigungen (aus dem OAuth-Cache)
+        if not discord_oauth.get_managed_guild(guild_id):
             return jsonify({"error": "Unauthorized"}), 403
         
         # Hole Daten aus Request
         data = request.json
         channel_id = data.get("channel_id")
+        if not str(channel_id or "").isdigit():
+            return jsonify({"error": "Invalid channel"}), 400
         
-        # Setze Ticket-Kanal
-        bot_instance.config_manager.set_ticket_channel(guild_id, channel_id)
-        
-        # Erstelle das Panel in Discord (asynchron)
-        async def create_panel():
-            guild = bot_instance.bot.get_guild(int(guild_id))
-            if not guild:
-                return
-            
-            channel = guild.get_channel(int(channel_id))
-            if not channel:
-                return
-            
-            guild_config = bot_instance.config_manager.get_guild_config(guild_id)
-            
-            # Erstelle Ticket-Panel Embed
-            embed = discord.Embed(
-                title="Support Ticket System",
-                description="Klicke auf einen der unten stehenden Buttons, um ein Support-Ticket zu erstellen",
-                color=discord.Color.blue()
-            )
-            
-            # Erstelle Buttons für jede Ticket-Kategorie
-            view = discord.ui.View(timeout=None)
-            
-            for category in guild_config["ticket_categories"]:
-                button = discord.ui.Button(
-                    style=discord.ButtonStyle.primary,
-                    label=category["name"],
-                    custom_id=f"create_ticket:{category['name']}"
-                )
-                view.add_item(button)
-            
-            await channel.send(embed=embed, view=view)
-        
-        # Führe den asynchronen Code aus
-        bot_instance.bot.loop.create_task(create_panel())
-        
-        return jsonify({"success": True})
+        # Erstelle das Panel in Discord und setze danach den Ticket-Kanal
+        return apply_on_bot(bot_instance.create_ticket_panel, guild_id, str(channel_id))
     
     @app.route("/logout")
     def logout():
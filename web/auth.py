@@ -1,4 +1,5 @@
 import os
+import hashlib
 import requests
 from functools import wraps
 from flask import session, redirect, request, url_for
@@ -6,7 +7,8 @@ from urllib.parse import urlencode
 from dataclasses import dataclass
 from typing import List, Optional
 
-DISCORD_API = "https://discord.com/api"
+from web.discord_http import DiscordHTTPClient, DISCORD_API
+from utils.cache import TTLCache
 
 @dataclass
 class DiscordUser:
@@ -56,6 +58,15 @@ class DiscordOAuth2:
         self.token_url = f"{DISCORD_API}/oauth2/token"
         self.authorized = False
         
+        # Gemeinsamer HTTP-Client mit Connection-Pool und Rate-Limit-Behandlung
+        self.http = DiscordHTTPClient()
+        
+        # Kurzlebiger Cache für Benutzer und Server-Liste pro Token,
+        # damit nicht jede Dashboard-Anfrage zwei Discord-Aufrufe auslöst
+        cache_ttl = float(os.getenv("OAUTH_CACHE_TTL", 60))
+        self._user_cache = TTLCache(maxsize=4096, ttl=cache_ttl)
+        self._guilds_cache = TTLCache(maxsize=4096, ttl=cache_ttl)
+        
         @app.before_request
         def check_authorization():
             self.authorized = "discord_token" in session
@@ -86,7 +97,12 @@ class DiscordOAuth2:
             "scope": self.scope
         }
         
-        response = requests.post(self.token_url, data=data)
+        # Der Code ist nur einmal gültig: nach einem 5xx nicht wiederholen, sonst verdeckt invalid_grant den Fehler
+        try:
+            response = self.http.post("/oauth2/token", data=data, retry=False)
+        except requests.RequestException:
+            return False
+        
         if response.status_code == 200:
             token_data = response.json()
             session["discord_token"] = token_data
@@ -97,6 +113,7 @@ class DiscordOAuth2:
     def logout(self):
         """Beendet die Sitzung"""
         if "discord_token" in session:
+            self.invalidate_cache(session["discord_token"].get("access_token"))
             del session["discord_token"]
         self.authorized = False
     
@@ -118,7 +135,12 @@ class DiscordOAuth2:
                     "refresh_token": refresh_token
                 }
                 
-                response = requests.post(self.token_url, data=data)
+                # Discord tauscht den Refresh-Token dabei aus: ebenfalls nicht wiederholen
+                try:
+                    response = self.http.post("/oauth2/token", data=data, retry=False)
+                except requests.RequestException:
+                    return None
+                
                 if response.status_code == 200:
                     token_data = response.json()
                     token_data["expires_at"] = time.time() + token_data["expires_in"]
@@ -131,33 +153,61 @@ class DiscordOAuth2:
         
         return token_data.get("access_token")
     
+    def invalidate_cache(self, token: Optional[str] = None) -> None:
+        """Verwirft gecachte Benutzer- und Server-Daten eines Tokens"""
+        if token:
+            cache_key = self._cache_key(token)
+            self._user_cache.delete(cache_key)
+            self._guilds_cache.delete(cache_key)
+    
+    def _cache_key(self, token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
     def fetch_user(self) -> Optional[DiscordUser]:
-        """Holt Benutzerinformationen von Discord"""
+        """Holt Benutzerinformationen von Discord (mit Cache)"""
         token = self.get_token()
         if not token:
             return None
         
+        cache_key = self._cache_key(token)
+        user = self._user_cache.get(cache_key)
+        if user is not None:
+            return user
+        
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{DISCORD_API}/users/@me", headers=headers)
+        try:
+            response = self.http.get("/users/@me", headers=headers)
+        except requests.RequestException:
+            return None
         
         if response.status_code == 200:
             data = response.json()
-            return DiscordUser(
+            user = DiscordUser(
                 id=data["id"],
                 username=data["username"],
                 discriminator=data.get("discriminator", "0"),
                 avatar=data.get("avatar")
             )
+            self._user_cache.set(cache_key, user)
+            return user
         return None
     
     def fetch_guilds(self) -> List[DiscordGuild]:
-        """Holt die Server des Benutzers von Discord"""
+        """Holt die Server des Benutzers von Discord (mit Cache)"""
         token = self.get_token()
         if not token:
             return []
         
+        cache_key = self._cache_key(token)
+        guilds = self._guilds_cache.get(cache_key)
+        if guilds is not None:
+            return guilds
+        
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{DISCORD_API}/users/@me/guilds", headers=headers)
+        try:
+            response = self.http.get("/users/@me/guilds", headers=headers)
+        except requests.RequestException:
+            return []
         
         if response.status_code == 200:
             guilds = []
@@ -169,9 +219,19 @@ class DiscordOAuth2:
                     owner=guild_data.get("owner", False),
                     permissions=DiscordGuildPermissions(int(guild_data.get("permissions", 0)))
                 ))
+            self._guilds_cache.set(cache_key, guilds)
             return guilds
         return []
     
+    def get_managed_guild(self, guild_id: str) -> Optional[DiscordGuild]:
+        """Gibt den Server zurück, wenn der Benutzer ihn verwalten darf (Administrator oder Server verwalten)"""
+        for guild in self.fetch_guilds():
+            if str(guild.id) == guild_id:
+                if guild.permissions.administrator or guild.permissions.manage_guild:
+                    return guild
+                return None
+        return None
+    
     def requires_authorization(self, f):
         """Decorator für Routen, die Autorisierung erfordern"""
         @wraps(f)
@@ -0,0 +1,187 @@
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, Tuple
+
+from utils.cache import TTLCache
+from utils.metrics import REGISTRY
+
+# Über DISCORD_API z.B. auf einen lokalen Fake-Server für Lasttests umstellbar
+DISCORD_API = (os.getenv("DISCORD_API") or "https://discord.com/api").rstrip("/")
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "discord_oauth_requests_total",
+    "Ausgehende Discord-REST-Aufrufe des Web-Interfaces",
+    labelnames=("route", "status")
+)
+RATE_LIMITED_TOTAL = REGISTRY.counter(
+    "discord_oauth_rate_limited_total",
+    "Rate-Limit-Treffer (429) und vorab abgewartete Buckets des Web-Interfaces",
+    labelnames=("route", "kind")
+)
+CONNECTIONS = REGISTRY.gauge(
+    "discord_oauth_connections",
+    "Vom Web-Interface geöffnete und per Keep-Alive wiederverwendete Verbindungen zur Discord-API",
+    labelnames=("kind",)
+)
+
+class RateLimitBucket:
+    """
+    Zustand eines Discord-Rate-Limit-Buckets
+    """
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+    
+    def delay(self, now: float) -> float:
+        """Wartezeit, bevor die nächste Anfrage in diesem Bucket gesendet werden darf"""
+        if self.remaining is not None and self.remaining <= 0 and self.reset_at > now:
+            return self.reset_at - now
+        return 0.0
+
+class DiscordHTTPClient:
+    """
+    Gemeinsamer HTTP-Client für die Discord-API mit Connection-Pooling (Keep-Alive),
+    Timeouts und Beachtung der Rate-Limit-Header (X-RateLimit-*, Retry-After)
+    """
+    RETRY_STATUS = (500, 502, 503, 504)
+    
+    def __init__(
+        self,
+        base_url: str = DISCORD_API,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 3,
+        max_rate_limit_wait: float = 10.0,
+        max_buckets: int = 10000
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.max_rate_limit_wait = max_rate_limit_wait
+        
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        
+        self._lock = threading.Lock()
+        # (Route, Token) -> Bucket-Hash von Discord; (Bucket-Hash, Token) -> Zustand.
+        # Begrenzt und mit Ablauf, da jeder OAuth-Benutzer eigene Einträge erzeugt
+        self._bucket_keys = TTLCache(maxsize=max_buckets, ttl=3600.0)
+        self._buckets = TTLCache(maxsize=max_buckets, ttl=60.0)
+        self._global_reset_at = 0.0
+    
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+    
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+    
+    def request(self, method: str, path: str, retry: bool = True, **kwargs) -> requests.Response:
+        """
+        Sendet eine Anfrage und wiederholt sie bei 429 bzw. 5xx mit passender Wartezeit. Mit retry=False
+        (nicht idempotente Aufrufe) nur bei 429, da Discord die Anfrage dann nicht verarbeitet hat.
+        """
+        route = f"{method} {path}"
+        headers = kwargs.get("headers") or {}
+        bucket_key = (route, headers.get("Authorization", ""))
+        kwargs.setdefault("timeout", self.timeout)
+        
+        attempt = 0
+        while True:
+            self._wait_for_bucket(route, bucket_key)
+            
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            REQUESTS_TOTAL.inc(route=route, status=response.status_code)
+            self._update_bucket(bucket_key, response)
+            self._export_connection_stats()
+            
+            if response.status_code == 429:
+                retry_after = self._retry_after(response)
+                RATE_LIMITED_TOTAL.inc(route=route, kind="global" if self._is_global(response) else "bucket")
+                if attempt >= self.max_retries or retry_after > self.max_rate_limit_wait:
+                    return response
+                time.sleep(retry_after)
+            elif retry and response.status_code in self.RETRY_STATUS and attempt < self.max_retries:
+                time.sleep(0.5 * (2 ** attempt))
+            else:
+                return response
+            
+            attempt += 1
+    
+    def connection_stats(self) -> Dict[str, int]:
+        """Gibt Anzahl der geöffneten Verbindungen und wiederverwendeten Verbindungen zurück"""
+        connections = 0
+        requests_sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        return {
+            "connections": connections,
+            "requests": requests_sent,
+            "reused": max(requests_sent - connections, 0)
+        }
+    
+    def _export_connection_stats(self) -> None:
+        stats = self.connection_stats()
+        CONNECTIONS.set(stats["connections"], kind="opened")
+        CONNECTIONS.set(stats["reused"], kind="reused")
+    
+    def _wait_for_bucket(self, route: str, bucket_key: Tuple[str, str]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = max(self._global_reset_at - now, 0.0)
+            bucket = self._buckets.get((self._bucket_keys.get(bucket_key), bucket_key[1]))
+            if bucket is not None:
+                delay = max(delay, bucket.delay(now))
+                # Anfrage vorab einplanen, damit parallele Threads den Bucket nicht überziehen
+                if bucket.remaining is not None:
+                    bucket.remaining -= 1
+        
+        if delay > 0:
+            RATE_LIMITED_TOTAL.inc(route=route, kind="preemptive")
+            time.sleep(min(delay, self.max_rate_limit_wait))
+    
+    def _update_bucket(self, bucket_key: Tuple[str, str], response: requests.Response) -> None:
+        headers = response.headers
+        now = time.monotonic()
+        
+        with self._lock:
+            if response.status_code == 429 and self._is_global(response):
+                self._global_reset_at = now + self._retry_after(response)
+            
+            bucket_hash = headers.get("X-RateLimit-Bucket")
+            if not bucket_hash:
+                return
+            
+            self._bucket_keys.set(bucket_key, bucket_hash)
+            key = (bucket_hash, bucket_key[1])
+            bucket = self._buckets.get(key) or RateLimitBucket()
+            try:
+                bucket.remaining = int(headers.get("X-RateLimit-Remaining", 1))
+                bucket.reset_at = now + float(headers.get("X-RateLimit-Reset-After", 0))
+            except ValueError:
+                pass
+            # Nach dem Reset ist der Zustand bedeutungslos und wird verworfen
+            self._buckets.set(key, bucket, ttl=max(bucket.reset_at - now, 0.0) + 1.0)
+    
+    def _is_global(self, response: requests.Response) -> bool:
+        return response.headers.get("X-RateLimit-Global", "").lower() == "true" or \
+            response.headers.get("X-RateLimit-Scope") == "global"
+    
+    def _retry_after(self, response: requests.Response) -> float:
+        try:
+            return float(response.json().get("retry_after"))
+        except (ValueError, TypeError, AttributeError):
+            pass
+        try:
+            return float(response.headers.get("Retry-After", 1))
+        except ValueError:
+            return 1.0
@@ -0,0 +1,195 @@
+import os
+import threading
+from typing import Optional
+
+from werkzeug.serving import make_server
+from werkzeug.wsgi import ClosingIterator
+
+from utils.logger import Logger
+from utils.metrics import REGISTRY
+
+IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight",
+    "Laufende Anfragen an das Web-Interface (ohne Event-Streams)"
+)
+
+class DrainMiddleware:
+    """
+    Zählt laufende Anfragen und lehnt beim Herunterfahren neue mit 503 ab.
+    Event-Streams (SSE) zählen nicht mit; der Browser verbindet sich nach dem Neustart selbst wieder.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.draining = threading.Event()
+        self._active = 0
+        self._idle = threading.Condition()
+    
+    def __call__(self, environ, start_response):
+        if self.draining.is_set():
+            start_response("503 Service Unavailable", [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Retry-After", "5"),
+                ("Connection", "close")
+            ])
+            return [b"Server wird neu gestartet"]
+        
+        self._begin()
+        finished = threading.Event()
+        
+        def done():
+            if not finished.is_set():
+                finished.set()
+                self._end()
+        
+        def tracking_start_response(status, headers, exc_info=None):
+            # Streams laufen unbegrenzt und würden das Herunterfahren blockieren
+            if any(name.lower() == "content-type" and value.startswith("text/event-stream") for name, value in headers):
+                done()
+            return start_response(status, headers, exc_info)
+        
+        try:
+            return ClosingIterator(self.app(environ, tracking_start_response), done)
+        except BaseException:
+            done()
+            raise
+    
+    def wait_idle(self, timeout: float) -> bool:
+        """Wartet, bis keine Anfrage mehr läuft; False bei Timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._active == 0, timeout)
+    
+    def _begin(self):
+        with self._idle:
+            self._active += 1
+            IN_FLIGHT.set(self._active)
+    
+    def _end(self):
+        with self._idle:
+            self._active -= 1
+            IN_FLIGHT.set(self._active)
+            if self._active == 0:
+                self._idle.notify_all()
+
+class WebServer:
+    """
+    Betreibt das Web-Interface in einem Hintergrund-Thread: mit waitress (Thread-Pool, Keep-Alive,
+    Verbindungslimit) oder dem Entwicklungsserver von Werkzeug; stop() lässt laufende Anfragen auslaufen.
+    Event-Streams belegen ihren Thread für die ganze Verbindung: Sie bekommen eigene, begrenzte Threads
+    zusätzlich zum Pool für normale Anfragen (Plätze über app.extensions["stream_slots"])
+    """
+    def __init__(
+        self,
+        app,
+        host: str = "localhost",
+        port: int = 5000,
+        backend: str = "auto",
+        threads: int = 8,
+        max_streams: int = 16,
+        connection_limit: int = 100,
+        channel_timeout: int = 120
+    ):
+        self.logger = Logger("web_server")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.threads = threads
+        self.max_streams = max_streams
+        self.connection_limit = connection_limit
+        self.channel_timeout = channel_timeout
+        self.backend = self._select_backend(backend)
+        
+        self.middleware = DrainMiddleware(app.wsgi_app)
+        app.wsgi_app = self.middleware
+        app.extensions["stream_slots"] = threading.BoundedSemaphore(max_streams)
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def _select_backend(self, backend: str) -> str:
+        if backend not in ("auto", "waitress", "werkzeug"):
+            raise ValueError(f"Unbekannter Web-Server: {backend}")
+        if backend == "werkzeug":
+            return backend
+        
+        try:
+            import waitress
+            return "waitress"
+        except ImportError:
+            if backend == "waitress":
+                raise
+            self.logger.warning("waitress ist nicht installiert, verwende den Entwicklungsserver von Werkzeug")
+            return "werkzeug"
+    
+    def start(self) -> None:
+        """Bindet den Port und startet den Server in einem Hintergrund-Thread"""
+        if self.backend == "waitress":
+            from waitress import create_server
+            self._server = create_server(
+                self.app,
+                host=self.host,
+                port=self.port,
+                # Streams können nie mehr als max_streams Threads belegen, der Rest bleibt für normale Anfragen
+                threads=self.threads + self.max_streams,
+                connection_limit=self.connection_limit,
+                channel_timeout=self.channel_timeout,
+                ident="ticket-bot"
+            )
+        else:
+            # Ein Thread pro Anfrage, ohne Begrenzung; nur für Entwicklung gedacht
+            self._server = make_server(self.host, self.port, self.app, threaded=True)
+        
+        self._thread = threading.Thread(target=self._serve, name="web-server", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Web-Interface ({self.backend}) läuft auf http://{self.host}:{self.port}")
+    
+    def _serve(self) -> None:
+        if self.backend == "waitress":
+            self._server.run()
+        else:
+            self._server.serve_forever()
+    
+    def stop(self, timeout: float = 10.0) -> None:
+        """Nimmt keine neuen Verbindungen mehr an, wartet auf laufende Anfragen und beendet den Server"""
+        if self._server is None:
+            return
+        
+        self.middleware.draining.set()
+        if self.backend == "waitress":
+            from waitress import wasyncore
+            # Änderungen an den Verbindungen nur im Thread des Servers (über den Trigger)
+            self._server.trigger.pull_trigger(lambda: wasyncore.dispatcher.close(self._server))
+        else:
+            self._server.shutdown()
+        
+        if not self.middleware.wait_idle(timeout):
+            self.logger.warning(f"Web-Interface: Anfragen nach {timeout} Sekunden noch nicht abgeschlossen, beende trotzdem")
+        
+        if self.backend == "waitress":
+            from waitress import wasyncore
+            self._server.trigger.pull_trigger(lambda: wasyncore.close_all(self._server._map))
+            self._server.task_dispatcher.shutdown(timeout=timeout)
+        else:
+            self._server.server_close()
+        
+        self._thread.join(timeout)
+        self._server = None
+        self.logger.info("Web-Interface beendet")
+
+def create_web_server(app) -> WebServer:
+    """Erstellt den Web-Server mit den Einstellungen aus der Umgebung"""
+    backend = os.getenv("WEB_SERVER", "auto")
+    # Im Debug-Modus Fehlerseiten von Werkzeug statt waitress
+    if os.getenv("FLASK_DEBUG", "False").lower() == "true":
+        app.debug = True
+        if backend == "auto":
+            backend = "werkzeug"
+    
+    return WebServer(
+        app,
+        host=os.getenv("FLASK_HOST", "localhost"),
+        port=int(os.getenv("FLASK_PORT", 5000)),
+        backend=backend,
+        threads=int(os.getenv("WEB_THREADS", 8)),
+        max_streams=int(os.getenv("WEB_MAX_STREAMS", 16)),
+        connection_limit=int(os.getenv("WEB_CONNECTION_LIMIT", 100)),
+        channel_timeout=int(os.getenv("WEB_CHANNEL_TIMEOUT", 120))
+    )
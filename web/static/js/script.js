@@ -27,8 +27,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Lade Rollen-Liste
     loadRoles();
     
-    // Lade Tickets
-    loadTickets();
+    // Live-Updates der Tickets abonnieren, dann die erste Seite laden
+    connectTicketStream(guildId);
+    loadTickets(true);
     
     // Lade Kategorien
     loadCategories();
@@ -39,6 +40,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Event-Listener für Ticket-Panel erstellen
     document.getElementById('create-ticket-panel').addEventListener('click', createTicketPanel);
     
+    // Event-Listener für automatisches Schließen inaktiver Tickets
+    document.getElementById('save-idle-close').addEventListener('click', saveIdleClose);
+    
     // Event-Listener für Kategorien hinzufügen
     document.getElementById('add-category').addEventListener('click', addCategory);
     
@@ -48,8 +52,26 @@ document.addEventListener('DOMContentLoaded', function() {
     // Event-Listener für Rollen speichern
     document.getElementById('save-roles').addEventListener('click', saveRoles);
     
-    // Event-Listener für Ticket-Filter
-    document.getElementById('ticket-status-filter').addEventListener('change', filterTickets);
+    // Event-Listener für Ticket-Filter (lädt die Liste serverseitig gefiltert neu)
+    ['ticket-status-filter', 'ticket-category-filter', 'ticket-from-filter', 'ticket-to-filter', 'ticket-sort'].forEach(id => {
+        document.getElementById(id).addEventListener('change', () => loadTickets(true));
+    });
+    document.getElementById('ticket-user-filter').addEventListener('change', () => loadTickets(true));
+    
+    // Endloses Scrollen: nächste Seite laden, sobald das Tabellenende sichtbar wird
+    const ticketsObserver = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadTickets();
+        }
+    });
+    ticketsObserver.observe(document.getElementById('tickets-sentinel'));
+    
+    // Event-Listener für die Transkript-Suche
+    document.getElementById('transcript-search-btn').addEventListener('click', () => searchTranscripts(true));
+    document.getElementById('transcript-query').addEventListener('keydown', event => {
+        if (event.key === 'Enter') searchTranscripts(true);
+    });
+    document.getElementById('transcript-more').addEventListener('click', () => searchTranscripts(false));
     
     // Modal schließen
     const modalCloseButtons = document.querySelectorAll('.modal .close');
@@ -172,81 +194,294 @@ async function loadRoles() {
     }
 }
 
-// Lade Ticket-Daten
-async function loadTickets() {
+// Zustand der Ticket-Liste (Cursor-Paginierung)
+const ticketState = {
+    cursor: null,
+    loading: false,
+    done: false,
+    generation: 0
+};
+
+// Baue Query-Parameter aus den Filtern
+function buildTicketQuery() {
+    const params = new URLSearchParams();
+    const status = document.getElementById('ticket-status-filter').value;
+    const category = document.getElementById('ticket-category-filter').value;
+    const userId = document.getElementById('ticket-user-filter').value.trim();
+    const from = document.getElementById('ticket-from-filter').value;
+    const to = document.getElementById('ticket-to-filter').value;
+    
+    if (status !== 'all') params.set('status', status);
+    if (category) params.set('category', category);
+    if (userId) params.set('user_id', userId);
+    if (from) params.set('from', from);
+    if (to) params.set('to', to);
+    params.set('sort', document.getElementById('ticket-sort').value);
+    params.set('limit', 50);
+    if (ticketState.cursor) params.set('cursor', ticketState.cursor);
+    
+    return params.toString();
+}
+
+// Lade Ticket-Daten (nächste Seite oder bei reset die erste Seite)
+async function loadTickets(reset = false) {
     const guildId = window.location.pathname.split('/').pop();
+    const ticketsList = document.getElementById('tickets-list');
+    
+    if (reset) {
+        ticketState.cursor = null;
+        ticketState.done = false;
+        ticketState.loading = false;
+        ticketState.generation++;
+        ticketsList.innerHTML = '';
+    }
+    
+    if (ticketState.loading || ticketState.done) return;
+    ticketState.loading = true;
+    const generation = ticketState.generation;
     
     try {
-        const response = await fetch(`/api/guild/${guildId}/tickets`);
+        const response = await fetch(`/api/guild/${guildId}/tickets?${buildTicketQuery()}`);
         const data = await response.json();
         
-        const ticketsList = document.getElementById('tickets-list');
-        ticketsList.innerHTML = '';
+        // Filter wurden inzwischen geändert
+        if (generation !== ticketState.generation) return;
         
-        // Sortiere nach ID (neuste zuerst)
-        const sortedTickets = Object.entries(data.tickets).sort((a, b) => {
-            return parseInt(b[0]) - parseInt(a[0]);
+        data.tickets.forEach(ticket => {
+            ticketsList.appendChild(createTicketRow(ticket));
         });
         
-        sortedTickets.forEach(([ticketId, ticket]) => {
-            const row = document.createElement('tr');
-            
-            // Formatiere Daten
-            const createdAt = new Date(ticket.created_at).toLocaleString('de-DE');
-            const closedAt = ticket.closed_at ? new Date(ticket.closed_at).toLocaleString('de-DE') : '-';
-            
-            row.innerHTML = `
-                <td>${ticketId}</td>
-                <td>${ticket.category}</td>
-                <td class="user-id" data-user-id="${ticket.user_id}">Lädt...</td>
-                <td><span class="status-badge ${ticket.status}">${ticket.status === 'open' ? 'Offen' : 'Geschlossen'}</span></td>
-                <td>${createdAt}</td>
-                <td>${closedAt}</td>
-            `;
-            
-            row.dataset.status = ticket.status;
-            ticketsList.appendChild(row);
-            
-            // Lade Benutzername asynchron
-            fetchUserInfo(ticket.user_id, row.querySelector('.user-id'));
-        });
+        // Namen aus der Antwort setzen, fehlende mit einer einzigen Batch-Anfrage nachladen
+        const usernames = data.usernames || {};
+        const missing = [...new Set(data.tickets.map(ticket => ticket.user_id))].filter(id => !(id in usernames));
+        applyUsernames(usernames);
+        if (missing.length > 0) {
+            resolveUsernames(guildId, missing);
+        }
         
-        // Initial filtern
-        filterTickets();
+        ticketState.cursor = data.next_cursor;
+        ticketState.done = !data.next_cursor;
     } catch (error) {
         console.error('Fehler beim Laden der Tickets:', error);
+    } finally {
+        if (generation === ticketState.generation) {
+            ticketState.loading = false;
+            
+            // Füllt die erste Seite den Bildschirm nicht, sofort weiterladen
+            const sentinel = document.getElementById('tickets-sentinel');
+            if (!ticketState.done && sentinel.offsetParent !== null && sentinel.getBoundingClientRect().top < window.innerHeight) {
+                loadTickets();
+            }
+        }
+    }
+}
+
+// Bereits aufgelöste Benutzernamen (user_id -> Name) für neue und aktualisierte Zeilen
+const knownUsernames = {};
+
+// Erstelle eine Zeile der Ticket-Tabelle
+function createTicketRow(ticket) {
+    const row = document.createElement('tr');
+    row.dataset.ticketId = ticket.id;
+    renderTicketRow(row, ticket);
+    return row;
+}
+
+// Setze die Zellen einer Ticket-Zeile
+function renderTicketRow(row, ticket) {
+    // Formatiere Daten
+    const createdAt = new Date(ticket.created_at).toLocaleString('de-DE');
+    const closedAt = ticket.closed_at ? new Date(ticket.closed_at).toLocaleString('de-DE') : '-';
+    
+    // Kategorie und Benutzername stammen von Benutzern: nur als Text einsetzen
+    const cell = text => {
+        const td = document.createElement('td');
+        td.textContent = text;
+        return td;
+    };
+    
+    const userCell = cell(knownUsernames[ticket.user_id] || 'Lädt...');
+    userCell.className = 'user-id';
+    userCell.dataset.userId = ticket.user_id;
+    
+    const statusCell = document.createElement('td');
+    const badge = document.createElement('span');
+    badge.className = `status-badge ${ticket.status === 'open' ? 'open' : 'closed'}`;
+    badge.textContent = ticket.status === 'open' ? 'Offen' : 'Geschlossen';
+    statusCell.appendChild(badge);
+    
+    row.replaceChildren(cell(ticket.id), cell(ticket.category), userCell, statusCell, cell(createdAt), cell(closedAt));
+    row.dataset.status = ticket.status;
+}
+
+// Prüfe ein einzelnes Ticket gegen die Filter (wie die API)
+function ticketMatchesFilters(ticket) {
+    const status = document.getElementById('ticket-status-filter').value;
+    const category = document.getElementById('ticket-category-filter').value;
+    const userId = document.getElementById('ticket-user-filter').value.trim();
+    const from = document.getElementById('ticket-from-filter').value;
+    const to = document.getElementById('ticket-to-filter').value;
+    const createdAt = ticket.created_at || '';
+    
+    if (status !== 'all' && ticket.status !== status) return false;
+    if (category && ticket.category !== category) return false;
+    if (userId && ticket.user_id !== userId) return false;
+    if (from && createdAt < from) return false;
+    if (to && createdAt.slice(0, to.length) > to) return false;
+    return true;
+}
+
+// Abonniere neue und geänderte Tickets (Server-Sent Events); der Browser verbindet sich selbst neu.
+// Lehnt der Server ab, wird mit wachsendem Abstand (retryDelay) ein neuer Versuch gestartet.
+function connectTicketStream(guildId, retryDelay = 0) {
+    if (!window.EventSource) return;
+    
+    const url = `/api/guild/${guildId}/tickets/stream`;
+    const source = new EventSource(url);
+    source.addEventListener('ticket', event => applyTicketUpdate(guildId, JSON.parse(event.data)));
+    // Ereignisse verpasst (z.B. lange getrennt): Liste komplett neu laden
+    source.addEventListener('resync', () => loadTickets(true));
+    source.onopen = () => {
+        // Neue Verbindung nach einer Ablehnung: Änderungen seit dem Abbruch nachladen (nur einmal)
+        if (retryDelay) {
+            retryDelay = 0;
+            loadTickets(true);
+        }
+    };
+    source.onerror = async () => {
+        if (source.readyState !== EventSource.CLOSED) return;
+        
+        // EventSource verrät den Status nicht; eine HEAD-Anfrage zeigt, ob sich ein neuer Versuch lohnt
+        let status = 0;
+        try {
+            status = (await fetch(url, { method: 'HEAD' })).status;
+        } catch (error) {
+            // Netzwerkfehler: wie eine vorübergehende Ablehnung behandeln
+        }
+        if (status === 501 || status === 401 || status === 403) {
+            console.warn('Live-Updates der Tickets sind nicht verfügbar');
+            return;
+        }
+        
+        const delay = Math.min(Math.max(retryDelay * 2, 5000), 300000);
+        setTimeout(() => connectTicketStream(guildId, delay), delay);
+    };
+}
+
+// Übernimm ein neues oder geändertes Ticket in die Tabelle, ohne sie neu aufzubauen
+function applyTicketUpdate(guildId, ticket) {
+    const ticketsList = document.getElementById('tickets-list');
+    const row = ticketsList.querySelector(`tr[data-ticket-id="${ticket.id}"]`);
+    
+    if (!ticketMatchesFilters(ticket)) {
+        if (row) row.remove();
+        return;
+    }
+    
+    if (row) {
+        renderTicketRow(row, ticket);
+        return;
+    }
+    
+    // Nach Ticket-ID einsortieren; hinter der letzten geladenen Zeile nur, wenn die Liste vollständig ist
+    const descending = document.getElementById('ticket-sort').value !== 'asc';
+    const id = Number(ticket.id);
+    const next = [...ticketsList.rows].find(other => descending ? Number(other.dataset.ticketId) < id : Number(other.dataset.ticketId) > id);
+    if (!next && !ticketState.done) return;
+    
+    ticketsList.insertBefore(createTicketRow(ticket), next || null);
+    if (!(ticket.user_id in knownUsernames)) {
+        resolveUsernames(guildId, [ticket.user_id]);
     }
 }
 
-// Lade Benutzerinformationen
-async function fetchUserInfo(userId, element) {
+// Lade Benutzernamen für mehrere Benutzer mit einer Anfrage; vom Server zurückgestellte Benutzer folgen in weiteren Anfragen
+async function resolveUsernames(guildId, userIds) {
+    let usernames = {};
+    let deferred = [];
     try {
-        const response = await fetch(`/api/user/${userId}`);
+        const response = await fetch(`/api/guild/${guildId}/users`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ user_ids: userIds }),
+        });
         if (response.ok) {
             const data = await response.json();
-            element.textContent = data.username;
-        } else {
-            element.textContent = userId;
+            usernames = data.usernames;
+            deferred = data.deferred || [];
         }
     } catch (error) {
-        element.textContent = userId;
+        console.error('Fehler beim Laden der Benutzernamen:', error);
+    }
+    
+    // Nicht auflösbare Benutzer zeigen ihre ID; zurückgestellte behalten "Lädt..."
+    const pending = new Set(deferred);
+    userIds.forEach(userId => {
+        if (!(userId in usernames) && !pending.has(userId)) {
+            usernames[userId] = userId;
+        }
+    });
+    applyUsernames(usernames);
+    
+    // Nur weiterfragen, solange jede Anfrage Fortschritt bringt
+    if (deferred.length > 0 && deferred.length < userIds.length) {
+        await resolveUsernames(guildId, deferred);
     }
 }
 
-// Filter Tickets nach Status
-function filterTickets() {
-    const filter = document.getElementById('ticket-status-filter').value;
-    const rows = document.querySelectorAll('#tickets-list tr');
-    
-    rows.forEach(row => {
-        if (filter === 'all' || row.dataset.status === filter) {
-            row.style.display = '';
-        } else {
-            row.style.display = 'none';
+// Setze Benutzernamen in alle passenden Tabellenzellen
+function applyUsernames(usernames) {
+    Object.assign(knownUsernames, usernames);
+    document.querySelectorAll('#tickets-list .user-id').forEach(element => {
+        const name = usernames[element.dataset.userId];
+        if (name) {
+            element.textContent = name;
         }
     });
 }
 
+// Aktuelle Seite der Transkript-Suche
+let transcriptPage = 1;
+
+// Durchsuche Transkripte (reset = neue Suche ab Seite 1)
+async function searchTranscripts(reset) {
+    const guildId = window.location.pathname.split('/').pop();
+    const query = document.getElementById('transcript-query').value.trim();
+    const resultsList = document.getElementById('transcript-results');
+    const moreButton = document.getElementById('transcript-more');
+    
+    if (reset) {
+        transcriptPage = 1;
+        resultsList.innerHTML = '';
+    }
+    if (!query) return;
+    
+    try {
+        const params = new URLSearchParams({ q: query, page: transcriptPage });
+        const response = await fetch(`/api/guild/${guildId}/transcripts/search?${params}`);
+        const data = await response.json();
+        
+        if (reset && data.results.length === 0) {
+            resultsList.innerHTML = '<li>Keine Treffer</li>';
+        }
+        
+        data.results.forEach(result => {
+            const item = document.createElement('li');
+            // Snippet ist serverseitig escaped und enthält nur <mark>-Markierungen
+            item.innerHTML = `<strong>Ticket #${result.ticket_id}</strong><div class="transcript-snippet">${result.snippet}</div>`;
+            resultsList.appendChild(item);
+        });
+        
+        transcriptPage++;
+        moreButton.style.display = data.has_more ? '' : 'none';
+    } catch (error) {
+        console.error('Fehler bei der Transkript-Suche:', error);
+        showNotification('Fehler bei der Transkript-Suche', 'error');
+    }
+}
+
 // Lade Ticket-Kategorien
 function loadCategories() {
     const serverHeader = document.querySelector('.server-header');
@@ -398,7 +633,7 @@ async function saveLogChannel() {
         if (response.ok) {
             showNotification('Log-Kanal erfolgreich gespeichert!', 'success');
         } else {
-            showNotification('Fehler beim Speichern des Log-Kanals', 'error');
+            showNotification(await responseError(response, 'Fehler beim Speichern des Log-Kanals'), 'error');
         }
     } catch (error) {
         console.error('Fehler:', error);
@@ -406,6 +641,31 @@ async function saveLogChannel() {
     }
 }
 
+// Speichere Zeitlimit für inaktive Tickets
+async function saveIdleClose() {
+    const guildId = window.location.pathname.split('/').pop();
+    const hours = parseInt(document.getElementById('idle-close-hours').value, 10) || 0;
+    
+    try {
+        const response = await fetch(`/api/guild/${guildId}/idle-close`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ hours: hours }),
+        });
+        
+        if (response.ok) {
+            showNotification('Zeitlimit erfolgreich gespeichert!', 'success');
+        } else {
+            showNotification(await responseError(response, 'Fehler beim Speichern des Zeitlimits'), 'error');
+        }
+    } catch (error) {
+        console.error('Fehler:', error);
+        showNotification('Fehler beim Speichern des Zeitlimits', 'error');
+    }
+}
+
 // Erstelle Ticket-Panel
 async function createTicketPanel() {
     const guildId = window.location.pathname.split('/').pop();
@@ -428,7 +688,7 @@ async function createTicketPanel() {
         if (response.ok) {
             showNotification('Ticket-Panel erfolgreich erstellt!', 'success');
         } else {
-            showNotification('Fehler beim Erstellen des Ticket-Panels', 'error');
+            showNotification(await responseError(response, 'Fehler beim Erstellen des Ticket-Panels'), 'error');
         }
     } catch (error) {
         console.error('Fehler:', error);
@@ -470,7 +730,7 @@ async function saveCategories() {
         if (response.ok) {
             showNotification('Kategorien erfolgreich gespeichert!', 'success');
         } else {
-            showNotification('Fehler beim Speichern der Kategorien', 'error');
+            showNotification(await responseError(response, 'Fehler beim Speichern der Kategorien'), 'error');
         }
     } catch (error) {
         console.error('Fehler:', error);
@@ -497,7 +757,7 @@ async function saveRoles() {
         if (response.ok) {
             showNotification('Rollen erfolgreich gespeichert!', 'success');
         } else {
-            showNotification('Fehler beim Speichern der Rollen', 'error');
+            showNotification(await responseError(response, 'Fehler beim Speichern der Rollen'), 'error');
         }
     } catch (error) {
         console.error('Fehler:', error);
@@ -505,6 +765,16 @@ async function saveRoles() {
     }
 }
 
+// Fehlermeldung einer Antwort (z.B. vom Bot gemeldet) an den allgemeinen Text anhängen
+async function responseError(response, message) {
+    try {
+        const data = await response.json();
+        return data.error ? `${message}: ${data.error}` : message;
+    } catch (error) {
+        return message;
+    }
+}
+
 // Zeige Benachrichtigung
 function showNotification(message, type = 'info') {
     // Prüfe, ob bereits eine Benachrichtigung existiert